@@ -0,0 +1,115 @@
+"""Offline stand-in for gassist_text.TextAssistant.
+
+FakeTextAssistant sleeps instead of talking to Google: `connect_latency`
+when the channel is opened, and `latency` plus up to `jitter` seconds per
+assist() call, failing a `failure_rate` fraction of calls with UNAVAILABLE.
+install() swaps it in for TextAssistant inside ghome.assistant, and can also
+make OAuth token refreshes sleep for `refresh_latency` instead of calling
+the token endpoint.
+
+Subprocesses pick up the same configuration from the GHOME_FAKE_ASSISTANT
+environment variable (JSON keyword arguments for install()) when started
+through ``python -m benchmarks.fake_cli``.
+"""
+
+import json
+import os
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from unittest import mock
+
+import grpc
+
+CONFIG_ENV = "GHOME_FAKE_ASSISTANT"
+
+
+@dataclass
+class FakeConfig:
+    """Latency and failure injection settings for the fake assistant."""
+
+    latency: float = 0.05
+    jitter: float = 0.0
+    failure_rate: float = 0.0
+    connect_latency: float = 0.0
+    refresh_latency: float = 0.0
+
+    def to_env(self) -> dict[str, str]:
+        """Return environment variables passing this config to a subprocess."""
+        return {CONFIG_ENV: json.dumps(asdict(self))}
+
+
+class FakeUnavailable(grpc.RpcError):
+    """Injected failure, shaped like a dropped gRPC channel."""
+
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return "injected failure"
+
+
+class FakeChannel:
+    """Channel that accepts connectivity subscriptions and never changes state."""
+
+    def subscribe(self, callback, try_to_connect=False):
+        pass
+
+    def unsubscribe(self, callback):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeTextAssistant:
+    """Drop-in replacement for TextAssistant with programmable latency."""
+
+    config = FakeConfig()
+
+    def __init__(self, credentials, *args, **kwargs):
+        self.deadline = kwargs.get("deadline_sec", 185)
+        self.channel = FakeChannel()
+        time.sleep(self.config.connect_latency)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        pass
+
+    def assist(self, text_query):
+        time.sleep(self.config.latency + random.uniform(0, self.config.jitter))
+        if random.random() < self.config.failure_rate:
+            raise FakeUnavailable()
+        return f"ok: {text_query}", None, b""
+
+
+def _fake_refresh(credentials, request):
+    """Stand in for Credentials.refresh: sleep, then issue a new token."""
+    time.sleep(FakeTextAssistant.config.refresh_latency)
+    credentials.token = "fake-token"
+    credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+
+def install(config: FakeConfig | None = None) -> list:
+    """Replace TextAssistant and token refresh with fakes. Returns the patchers."""
+    FakeTextAssistant.config = config or FakeConfig()
+    patchers = [
+        mock.patch("ghome.assistant.TextAssistant", FakeTextAssistant),
+        mock.patch("google.oauth2.credentials.Credentials.refresh", _fake_refresh),
+    ]
+    for patcher in patchers:
+        patcher.start()
+    return patchers
+
+
+def install_from_env() -> None:
+    """Install the fakes configured in GHOME_FAKE_ASSISTANT, if it is set."""
+    raw = os.environ.get(CONFIG_ENV)
+    if raw:
+        install(FakeConfig(**json.loads(raw)))
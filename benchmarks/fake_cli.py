@@ -0,0 +1,19 @@
+"""Run the ghome CLI, with the fake assistant if one is configured.
+
+    GHOME_FAKE_ASSISTANT='{"latency": 0.05}' python -m benchmarks.fake_cli broadcast hi
+
+Without GHOME_FAKE_ASSISTANT this imports nothing beyond what `ghome` itself
+does, so it also measures the real cold start of commands like --help.
+"""
+
+import os
+
+if __name__ == "__main__":
+    if os.environ.get("GHOME_FAKE_ASSISTANT"):
+        from benchmarks.fake_assistant import install_from_env
+
+        install_from_env()
+
+    from ghome.cli import main
+
+    main(prog_name="ghome")
@@ -0,0 +1,242 @@
+"""Offline performance benchmarks for ghome.
+
+Measures CLI cold-start time per subcommand, one-shot and single-message
+latency, and interactive, batch and parallel throughput against the fake
+assistant in benchmarks/fake_assistant.py. Results are written as JSON and
+can be compared against a saved baseline:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline results.json --max-regression 0.2
+
+Every run uses a throwaway HOME with pre-made credentials, so nothing
+touches the network or the real config directory.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.fake_assistant import FakeConfig, install
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# name -> (arguments, whether the command talks to the assistant)
+COLD_START_COMMANDS = {
+    "help": (["--help"], False),
+    "auth_status": (["auth", "status"], False),
+    "auth_logout": (["auth", "logout"], False),
+    "broadcast": (["broadcast", "Benchmark message"], True),
+    "command": (["command", "what time is it"], True),
+}
+
+
+def write_credentials(home: Path, expired: bool = False) -> None:
+    """Write credentials.json under home, valid for an hour unless expired."""
+    config_dir = home / ".config" / "ghome"
+    config_dir.mkdir(parents=True, exist_ok=True)
+    expiry = datetime.utcnow() + (timedelta(minutes=-1) if expired else timedelta(hours=1))
+    (config_dir / "credentials.json").write_text(json.dumps({
+        "token": "fake-token",
+        "refresh_token": "fake-refresh",
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "client_id": "fake-client",
+        "client_secret": "fake-secret",
+        "expiry": expiry.isoformat(),
+    }))
+    (config_dir / "client_secret.json").write_text("{}")
+
+
+def summarize(samples: list[float]) -> dict:
+    """Return summary statistics, in seconds, for a list of samples."""
+    ordered = sorted(samples)
+    return {
+        "median": statistics.median(ordered),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "samples": len(ordered),
+    }
+
+
+def bench_cold_start(home: Path, config: FakeConfig, repeat: int) -> dict:
+    """Time fresh `ghome` processes for each subcommand."""
+    base_env = {**os.environ, "HOME": str(home), "PYTHONPATH": str(REPO_ROOT)}
+    results = {}
+    for name, (args, uses_assistant) in COLD_START_COMMANDS.items():
+        # Only commands that reach the assistant load the fake, so the others
+        # measure exactly what a real `ghome` process imports.
+        env = {**base_env, **config.to_env()} if uses_assistant else base_env
+        samples = []
+        for _ in range(repeat):
+            write_credentials(home)
+            started = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.fake_cli", *args],
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=False,
+            )
+            samples.append(time.perf_counter() - started)
+        results[name] = summarize(samples)
+    return results
+
+
+def bench_one_shot(home: Path, repeat: int) -> dict:
+    """Time `ghome broadcast` in-process from expired credentials to response."""
+    from click.testing import CliRunner
+
+    from ghome.cli import main
+
+    runner = CliRunner()
+    samples = []
+    for _ in range(repeat):
+        write_credentials(home, expired=True)
+        started = time.perf_counter()
+        runner.invoke(main, ["broadcast", "Benchmark message"])
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def bench_single_message(repeat: int) -> dict:
+    """Time broadcast_message, which opens and closes a session per call."""
+    from ghome.assistant import broadcast_message
+    from ghome.auth import load_credentials
+
+    credentials = load_credentials()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        broadcast_message("Benchmark message", credentials)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def _throughput(args: list[str], messages: int, input_suffix: str = "") -> dict:
+    """Run the CLI in-process over `messages` input lines; return messages/sec."""
+    from click.testing import CliRunner
+
+    from ghome.cli import main
+
+    lines = "".join(f"what is item {i}\n" for i in range(messages))
+    started = time.perf_counter()
+    result = CliRunner().invoke(main, args, input=lines + input_suffix)
+    elapsed = time.perf_counter() - started
+    return {
+        "messages": messages,
+        "seconds": elapsed,
+        "messages_per_second": messages / elapsed,
+        "exit_code": result.exit_code,
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Run every benchmark and return the results document."""
+    config = FakeConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        connect_latency=args.connect_latency,
+        refresh_latency=args.refresh_latency,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        os.environ["HOME"] = str(home)
+        write_credentials(home)
+        install(config)
+
+        results = {
+            "cold_start": bench_cold_start(home, config, args.repeat),
+            "one_shot": bench_one_shot(home, args.repeat),
+            "single_message": bench_single_message(args.repeat),
+            "interactive": _throughput(["command", "--interactive"], args.messages, "quit\n"),
+            "batch": _throughput(["command", "--batch", "-"], args.messages),
+            "parallel": _throughput(
+                ["command", "--batch", "-", "--parallel", str(args.parallel)], args.messages
+            ),
+        }
+
+    return {
+        "meta": {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fake": vars(config),
+            "repeat": args.repeat,
+            "messages": args.messages,
+            "parallel": args.parallel,
+        },
+        "results": results,
+    }
+
+
+def _metrics(results: dict, prefix: str = "") -> dict[str, tuple[float, bool]]:
+    """Flatten results into {name: (value, higher_is_better)}."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and "median" in value:
+            flat[f"{name}.median"] = (value["median"], False)
+        elif isinstance(value, dict) and "messages_per_second" in value:
+            flat[f"{name}.messages_per_second"] = (value["messages_per_second"], True)
+        elif isinstance(value, dict):
+            flat.update(_metrics(value, f"{name}."))
+    return flat
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Print each metric against the baseline; return the names that regressed."""
+    now, before = _metrics(current["results"]), _metrics(baseline["results"])
+    regressions = []
+    for name, (value, higher_is_better) in now.items():
+        if name not in before:
+            continue
+        old = before[name][0]
+        change = (value - old) / old if old else 0.0
+        worse = -change if higher_is_better else change
+        flag = "  REGRESSION" if worse > max_regression else ""
+        print(f"{name:<45} {old:10.4f} -> {value:10.4f} ({change:+.1%}){flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, help="Write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="Compare against this results JSON")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Relative slowdown that counts as a regression (default 0.2)")
+    parser.add_argument("--repeat", type=int, default=10, help="Samples per latency benchmark")
+    parser.add_argument("--messages", type=int, default=100, help="Messages per throughput benchmark")
+    parser.add_argument("--parallel", type=int, default=8, help="Workers for the parallel benchmark")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake assist() latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Extra random latency in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of calls that fail")
+    parser.add_argument("--connect-latency", type=float, default=0.1, help="Fake channel setup time")
+    parser.add_argument("--refresh-latency", type=float, default=0.1, help="Fake token refresh time")
+    args = parser.parse_args()
+
+    document = run(args)
+    print(json.dumps(document["results"], indent=2))
+
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2) + "\n")
+
+    if args.baseline:
+        regressions = compare(document, json.loads(args.baseline.read_text()), args.max_regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
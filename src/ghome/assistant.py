@@ -1,56 +1,875 @@
 """Google Assistant interaction."""
 
+import time
+
+from ghome import timing
+
+# Importing this module pulls in gassist_text, grpc and protobuf; the time it
+# takes is recorded as the "import" stage at the bottom of the module.
+_import_started = time.monotonic()
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
 import google.oauth2.credentials
-from gassist_text import TextAssistant
+import grpc
+from gassist_text import TextAssistant, TextAssistantAsync
+from google.assistant.embedded.v1alpha2 import embedded_assistant_pb2_grpc
+
+from ghome.auth import load_credentials
+from ghome.cache import ResponseCache
+from ghome.messages import (
+    MAX_MESSAGE_LENGTH,
+    BroadcastError,
+    CommandError,
+    broadcast_command,
+    validate_command,
+)
+from ghome.ratelimit import AdaptiveConcurrency, TokenBucket
+from ghome.retry import CircuitBreaker, RetryPolicy, RetryStats, call_with_retry
 
+__all__ = [
+    "AssistantPool",
+    "AssistantSession",
+    "AsyncAssistantSession",
+    "CommandResult",
+    "PoolTimeoutError",
+    "ProfileResult",
+    "QuotaExceededError",
+    "Reply",
+    "async_broadcast_message",
+    "async_send_command",
+    "broadcast_message",
+    "send_command",
+    "send_commands",
+    "send_to_profiles",
+    # Defined in ghome.messages and still importable from here.
+    "MAX_MESSAGE_LENGTH",
+    "BroadcastError",
+    "CommandError",
+]
 
-class BroadcastError(Exception):
-    """Raised when broadcast fails."""
+class QuotaExceededError(Exception):
+    """Raised when the Assistant API rejects a request for exceeding quota."""
     pass
 
 
-class CommandError(Exception):
-    """Raised when a command fails."""
+class PoolTimeoutError(Exception):
+    """Raised when no pooled session becomes free before the checkout timeout."""
     pass
 
 
-MAX_MESSAGE_LENGTH = 200
+# Point sessions at another Assistant endpoint, such as a local stand-in
+# server (see ghome.standin). Set GHOME_ASSISTANT_INSECURE=1 for plaintext.
+ENDPOINT_ENV = "GHOME_ASSISTANT_ENDPOINT"
+INSECURE_ENV = "GHOME_ASSISTANT_INSECURE"
+
+# Status codes meaning the channel went away underneath an open session.
+# The request is retried on a fresh channel.
+RECONNECT_STATUS_CODES = frozenset({grpc.StatusCode.UNAVAILABLE})
+
+# Status codes worth retrying with backoff. DEADLINE_EXCEEDED is left out:
+# the request may already have been acted on, and resending a broadcast
+# would announce it twice.
+RETRY_STATUS_CODES = frozenset({
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.ABORTED,
+})
+
+# Status codes meaning the backend is down rather than busy. Only these
+# count towards opening the circuit breaker; a quota error means the
+# backend is up, and the concurrency controller backs off instead. An
+# endpoint silently dropping traffic shows up as DEADLINE_EXCEEDED, which
+# counts although it isn't retried.
+DOWN_STATUS_CODES = frozenset({
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+})
+
+# Status codes meaning the backend is overloaded or over quota. Concurrency
+# controllers back off when they see them.
+OVERLOAD_STATUS_CODES = frozenset({
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.UNAVAILABLE,
+})
+
+# Channel states after which a watched session is no longer alive.
+DEAD_CHANNEL_STATES = frozenset({
+    grpc.ChannelConnectivity.TRANSIENT_FAILURE,
+    grpc.ChannelConnectivity.SHUTDOWN,
+})
+
+
+def _status_code(error: BaseException) -> grpc.StatusCode | None:
+    """Return the gRPC status code of an error, or None if it has none."""
+    code = getattr(error, "code", None)
+    return code() if isinstance(error, grpc.RpcError) and callable(code) else None
+
+
+def _is_reconnectable(error: grpc.RpcError) -> bool:
+    """Return True if the error means the channel dropped."""
+    return _status_code(error) in RECONNECT_STATUS_CODES
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Return True if the request may be retried after the error."""
+    return _status_code(error) in RETRY_STATUS_CODES
+
+
+def _is_backend_down(error: Exception) -> bool:
+    """Return True if the error means the backend is down or unreachable."""
+    if isinstance(error, OSError):
+        return True  # Connection failures outside gRPC
+    return _status_code(error) in DOWN_STATUS_CODES
+
+
+def _is_overloaded(error: BaseException) -> bool:
+    """Return True if the error means the backend is overloaded or over quota."""
+    return _status_code(error) in OVERLOAD_STATUS_CODES
+
+
+def _open_text_assistant(
+    credentials: google.oauth2.credentials.Credentials,
+    endpoint: str | None,
+    insecure: bool,
+) -> TextAssistant:
+    """Create a TextAssistant for an endpoint, or for Google's if None."""
+    if endpoint is None:
+        return TextAssistant(credentials)
+
+    assistant = TextAssistant(credentials, api_endpoint=endpoint)
+    if insecure:
+        # TextAssistant always opens an authorized TLS channel. Swap in a
+        # plaintext one; channels connect lazily, so nothing was sent yet.
+        assistant.channel.close()
+        assistant.channel = grpc.insecure_channel(endpoint)
+        assistant.assistant = embedded_assistant_pb2_grpc.EmbeddedAssistantStub(assistant.channel)
+    return assistant
+
+
+@dataclass
+class Reply:
+    """A response along with the parts of the Assistant's answer broadcast() and send() drop."""
+
+    response: str
+    html: bytes | None = None
+    audio: bytes = b""
+    # Requests made for it, counting retries; 0 if answered from the cache.
+    attempts: int = 0
+    cached: bool = False
+
+
+class AssistantSession:
+    """Long-lived connection to Google Assistant.
+
+    The TextAssistant and its gRPC channel are opened on first use and kept
+    until the session is closed, so only the first message pays for channel
+    and TLS setup. With a cache, send() answers cacheable commands from it.
+
+    Requests failing with a retryable status are retried according to the
+    retry policy, on a fresh channel if the old one dropped. The circuit
+    breaker, which sessions may share, fails requests fast while the
+    backend is down; retry_stats counts attempts and retries.
+
+    Every attempt first takes a token from the optional rate limiter and a
+    slot from the optional concurrency controller, which it releases with
+    whether the backend reported overload.
+
+    The session talks to Google unless given an endpoint ("host:port"), or
+    one is set in GHOME_ASSISTANT_ENDPOINT; insecure endpoints use a
+    plaintext channel.
+
+    With watch_channel, the session follows its channel's connectivity
+    state so is_alive() can tell a failed channel without a request. This
+    costs a gRPC polling thread per channel, so only long-lived sessions
+    opt in.
+    """
+
+    def __init__(
+        self,
+        credentials: google.oauth2.credentials.Credentials,
+        cache: ResponseCache | None = None,
+        rate_limiter: TokenBucket | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+        retry_policy: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        endpoint: str | None = None,
+        insecure: bool = False,
+        watch_channel: bool = False,
+    ):
+        if endpoint is None and os.environ.get(ENDPOINT_ENV):
+            endpoint = os.environ[ENDPOINT_ENV]
+            insecure = os.environ.get(INSECURE_ENV, "") not in ("", "0")
+
+        self._credentials = credentials
+        self.endpoint = endpoint
+        self.insecure = insecure
+        self._stack: ExitStack | None = None
+        self._assistant: TextAssistant | None = None
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.retry_stats = RetryStats()
+        self.watch_channel = watch_channel
+        self._channel_state: grpc.ChannelConnectivity | None = None
+        self._ready: grpc.Future | None = None
+
+    def __enter__(self) -> "AssistantSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _connect(self, try_to_connect: bool = False) -> TextAssistant:
+        """Return the open assistant, opening it if needed."""
+        if self._assistant is None:
+            stack = ExitStack()
+            with timing.stage("channel_setup"):
+                self._assistant = stack.enter_context(
+                    _open_text_assistant(self._credentials, self.endpoint, self.insecure)
+                )
+            if self.watch_channel:
+                channel = self._assistant.channel
+                channel.subscribe(self._on_channel_state, try_to_connect=try_to_connect)
+                stack.callback(channel.unsubscribe, self._on_channel_state)
+            self._stack = stack
+        return self._assistant
+
+    def _on_channel_state(self, state: grpc.ChannelConnectivity) -> None:
+        self._channel_state = state
+
+    def is_alive(self) -> bool:
+        """Return False if the watched channel has failed. Makes no request."""
+        return self._channel_state not in DEAD_CHANNEL_STATES
+
+    def warm_up(self) -> None:
+        """Open the channel and start connecting it without waiting.
+
+        TCP and TLS setup then proceed in the background, and the first
+        request finds the channel ready or part of the way there. Calling
+        it again reconnects a channel that has gone idle.
+        """
+        if self.watch_channel and self._assistant is None:
+            # Let the channel watch start the connection. A second subscriber
+            # leaves gRPC's poller trying to connect, which races close().
+            self._connect(try_to_connect=True)
+            return
+        assistant = self._connect()
+        if self._ready is not None and not self._ready.done():
+            return
+        if self._ready is None:
+            self._stack.callback(self._cancel_ready)
+        self._ready = grpc.channel_ready_future(assistant.channel)
+
+    def _cancel_ready(self) -> None:
+        ready, self._ready = self._ready, None
+        if ready is not None:
+            ready.cancel()
+
+    def new_conversation(self) -> None:
+        """Forget the conversation so far, so the next request stands alone.
+
+        Sessions shared between unrelated callers call this before each
+        request; otherwise "turn it off" is read in the context of whatever
+        another caller said last.
+        """
+        if self._assistant is not None:
+            self._assistant.conversation_state = None
+            self._assistant.is_new_conversation = True
+
+    def close(self) -> None:
+        """Close the underlying channel. The session reopens it on next use."""
+        stack, self._stack, self._assistant = self._stack, None, None
+        self._channel_state = None
+        if stack is not None:
+            stack.close()
+
+    def assist(self, text: str) -> tuple[str, bytes | None, bytes]:
+        """Send raw text to the Assistant and return (text, html, audio)."""
+        try:
+            return call_with_retry(
+                lambda remaining: self._assist_once(text, remaining),
+                _is_retryable,
+                self.retry_policy,
+                self.breaker,
+                self.retry_stats,
+                on_retry=self._reconnect_if_dropped,
+                is_backend_down=_is_backend_down,
+            )
+        except grpc.RpcError as e:
+            if _status_code(e) == grpc.StatusCode.RESOURCE_EXHAUSTED:
+                raise QuotaExceededError("Assistant API quota exceeded") from e
+            raise
+
+    def _reconnect_if_dropped(self, error: Exception) -> None:
+        """Close the channel if the error means it dropped, so it is reopened."""
+        if _is_reconnectable(error):
+            self.close()
+
+    def _assist_once(self, text: str, remaining: float | None) -> tuple[str, bytes | None, bytes]:
+        """Make one paced request on the current channel."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        assistant = self._connect()
+        if remaining is not None:
+            # Bound this attempt by what is left of the call's deadline.
+            assistant.deadline = max(remaining, 0.001)
+
+        if self.concurrency is None:
+            with timing.stage("assist"):
+                return assistant.assist(text)
+
+        ticket = self.concurrency.acquire()
+        overloaded = False
+        try:
+            with timing.stage("assist"):
+                return assistant.assist(text)
+        except Exception as e:
+            overloaded = _is_overloaded(e)
+            raise
+        finally:
+            self.concurrency.release(overloaded, ticket)
+
+    def broadcast(self, message: str) -> str:
+        """Broadcast a message to all Google Home devices."""
+        return self.request("broadcast", message).response
+
+    def send(self, command: str) -> str:
+        """Send any command to Google Assistant."""
+        return self.request("command", command).response
+
+    def request(self, action: str, text: str) -> Reply:
+        """Broadcast or send text and return the response with its details.
+
+        On failure, retry_stats.last_attempts still counts the attempts made.
+        """
+        self.retry_stats.last_attempts = 0
+        if action == "broadcast":
+            response_text, html, audio = self.assist(broadcast_command(text))
+            return Reply(response_text or "Broadcast sent", html, audio, self.retry_stats.last_attempts)
+
+        command = validate_command(text)
+        if self.cache is not None:
+            cached = self.cache.get(command)
+            if cached is not None:
+                return Reply(cached, cached=True)
+
+        response_text, html, audio = self.assist(command)
+        reply = Reply(response_text or "Command sent", html, audio, self.retry_stats.last_attempts)
+
+        if self.cache is not None:
+            self.cache.put(command, reply.response)
+        return reply
+
+    def await_credentials(self, credentials_ready: concurrent.futures.Future | None) -> None:
+        """Warm up the channel while the credentials finish refreshing."""
+        if credentials_ready is not None:
+            self.warm_up()
+            with timing.stage("await_credentials"):
+                credentials_ready.result()
 
 
 def broadcast_message(
     message: str,
     credentials: google.oauth2.credentials.Credentials,
+    rate_limiter: TokenBucket | None = None,
+    credentials_ready: concurrent.futures.Future | None = None,
 ) -> str:
-    """Broadcast a message to all Google Home devices."""
-    message = message.strip()
+    """Broadcast a message to all Google Home devices.
 
-    if not message:
-        raise BroadcastError("Message cannot be empty")
+    If the credentials are still being refreshed, pass the refresh's future
+    as credentials_ready: the channel is then opened while it runs. The
+    message is validated before either.
+    """
+    broadcast_command(message)
+    with AssistantSession(credentials, rate_limiter=rate_limiter) as session:
+        session.await_credentials(credentials_ready)
+        return session.broadcast(message)
 
-    if len(message) > MAX_MESSAGE_LENGTH:
-        raise BroadcastError(
-            f"Message exceeds maximum length of {MAX_MESSAGE_LENGTH} characters"
-        )
 
-    command = f"broadcast {message}"
+def send_command(
+    command: str,
+    credentials: google.oauth2.credentials.Credentials,
+    cache: ResponseCache | None = None,
+    rate_limiter: TokenBucket | None = None,
+    credentials_ready: concurrent.futures.Future | None = None,
+) -> str:
+    """Send any command to Google Assistant.
 
-    with TextAssistant(credentials) as assistant:
-        response_text, _, _ = assistant.assist(command)
+    credentials_ready works as for broadcast_message().
+    """
+    validate_command(command)
+    with AssistantSession(credentials, cache, rate_limiter) as session:
+        session.await_credentials(credentials_ready)
+        return session.send(command)
 
-    return response_text or "Broadcast sent"
 
+# Seconds between AssistantPool's passes over its idle sessions.
+REAP_INTERVAL = 30.0
 
-def send_command(
+
+class AssistantPool:
+    """Pool of warm sessions for long-running processes.
+
+    checkout() hands out an idle session, opening a new one while fewer
+    than max_size exist and otherwise waiting for one to be checked in.
+    Idle sessions beyond min_size are closed after idle_timeout seconds,
+    and every session is recycled after max_lifetime seconds so channels
+    and their state don't grow without bound. A session whose channel has
+    failed is discarded at checkout rather than handed out.
+
+    The pool keeps min_size sessions with their channels connecting from
+    the start. Every reap_interval seconds a background thread applies the
+    timeouts to idle sessions and replaces recycled ones, so an idle pool
+    doesn't hold on to channels until the next request.
+
+    Keyword arguments other than the pool's own are passed to each
+    AssistantSession, so pooled sessions can share a rate limiter, breaker
+    or endpoint.
+    """
+
+    def __init__(
+        self,
+        credentials: google.oauth2.credentials.Credentials,
+        min_size: int = 1,
+        max_size: int = 4,
+        idle_timeout: float = 300.0,
+        max_lifetime: float = 3600.0,
+        reap_interval: float | None = REAP_INTERVAL,
+        **session_options,
+    ):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self._credentials = credentials
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.reap_interval = reap_interval
+        self.last_error: Exception | None = None
+        self._session_options = session_options
+        # Most recently used last, so checkout reuses warm sessions and the
+        # oldest idle ones are left to time out.
+        self._idle: list[tuple[AssistantSession, float]] = []
+        self._created_at: dict[AssistantSession, float] = {}
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "created": 0,
+            "checkouts": 0,
+            "wait_time": 0.0,
+            "max_wait": 0.0,
+            "evicted_idle": 0,
+            "evicted_lifetime": 0,
+            "evicted_dead": 0,
+        }
+        self._add_warm([self._new_session() for _ in range(min_size)])
+
+        self._stopping = threading.Event()
+        self._reaper: threading.Thread | None = None
+        if reap_interval is not None:
+            self._reaper = threading.Thread(target=self._run_reaper, name="ghome-pool-reaper", daemon=True)
+            self._reaper.start()
+
+    def __enter__(self) -> "AssistantPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._created_at)
+
+    def _new_session(self) -> AssistantSession:
+        """Create a session and count it towards the pool size. Call under the lock."""
+        session = AssistantSession(self._credentials, watch_channel=True, **self._session_options)
+        self._created_at[session] = time.monotonic()
+        self._stats["created"] += 1
+        return session
+
+    def _add_warm(self, sessions: list[AssistantSession]) -> None:
+        """Start new sessions connecting, then make them available."""
+        for session in sessions:
+            try:
+                session.warm_up()
+            except Exception as e:
+                # It connects on first use instead.
+                self.last_error = e
+        with self._cond:
+            if self._closed:
+                for session in sessions:
+                    del self._created_at[session]
+            else:
+                now = time.monotonic()
+                self._idle[:0] = [(session, now) for session in sessions]
+                self._cond.notify(len(sessions))
+                return
+        for session in sessions:
+            session.close()
+
+    def reap(self) -> None:
+        """Close idle sessions past their timeouts and top the pool up to min_size."""
+        doomed: list[AssistantSession] = []
+        with self._cond:
+            if self._closed:
+                return
+            self._evict_idle(time.monotonic(), doomed)
+            fresh = [self._new_session() for _ in range(self.min_size - len(self._created_at))]
+        for session in doomed:
+            session.close()
+        self._add_warm(fresh)
+
+    def _run_reaper(self) -> None:
+        while not self._stopping.wait(self.reap_interval):
+            try:
+                self.reap()
+            except Exception as e:
+                # The next checkout opens a session itself.
+                self.last_error = e
+
+    def _expired(self, session: AssistantSession, now: float) -> bool:
+        return now - self._created_at[session] >= self.max_lifetime
+
+    def _discard(self, session: AssistantSession, reason: str, doomed: list) -> None:
+        """Remove a session from the pool; the caller closes `doomed` outside the lock."""
+        del self._created_at[session]
+        self._stats[f"evicted_{reason}"] += 1
+        doomed.append(session)
+
+    def _evict_idle(self, now: float, doomed: list) -> None:
+        """Drop idle sessions past their idle timeout or lifetime. Call under the lock."""
+        kept = []
+        for session, last_used in self._idle:
+            if self._expired(session, now):
+                self._discard(session, "lifetime", doomed)
+            elif now - last_used >= self.idle_timeout and len(self._created_at) > self.min_size:
+                self._discard(session, "idle", doomed)
+            else:
+                kept.append((session, last_used))
+        self._idle = kept
+
+    def checkout(self, timeout: float | None = None) -> AssistantSession:
+        """Return a session for exclusive use until it is checked back in.
+
+        Raises PoolTimeoutError if none is free within timeout seconds.
+        """
+        started = time.monotonic()
+        doomed: list[AssistantSession] = []
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Pool is closed")
+                    now = time.monotonic()
+                    self._evict_idle(now, doomed)
+                    while self._idle:
+                        session, _ = self._idle.pop()
+                        if session.is_alive():
+                            return self._checked_out(session, started)
+                        self._discard(session, "dead", doomed)
+                    if len(self._created_at) < self.max_size:
+                        return self._checked_out(self._new_session(), started)
+
+                    remaining = None if timeout is None else timeout - (now - started)
+                    if remaining is not None and remaining <= 0:
+                        raise PoolTimeoutError(f"No session free after {timeout:.1f}s")
+                    self._cond.wait(remaining)
+        finally:
+            for session in doomed:
+                session.close()
+
+    def _checked_out(self, session: AssistantSession, started: float) -> AssistantSession:
+        waited = time.monotonic() - started
+        self._stats["checkouts"] += 1
+        self._stats["wait_time"] += waited
+        self._stats["max_wait"] = max(self._stats["max_wait"], waited)
+        return session
+
+    def checkin(self, session: AssistantSession) -> None:
+        """Return a checked-out session to the pool."""
+        doomed: list[AssistantSession] = []
+        with self._cond:
+            now = time.monotonic()
+            if self._closed:
+                self._created_at.pop(session, None)
+                doomed.append(session)
+            elif self._expired(session, now):
+                self._discard(session, "lifetime", doomed)
+            else:
+                self._idle.append((session, now))
+            self._cond.notify()
+        for session in doomed:
+            session.close()
+
+    @contextmanager
+    def session(self, timeout: float | None = None) -> Iterator[AssistantSession]:
+        """Check out a session for the duration of a with block."""
+        session = self.checkout(timeout)
+        try:
+            yield session
+        finally:
+            self.checkin(session)
+
+    def stats(self) -> dict:
+        """Return the pool's size, usage and eviction counters."""
+        with self._cond:
+            size = len(self._created_at)
+            return {
+                "size": size,
+                "idle": len(self._idle),
+                "in_use": size - len(self._idle),
+                **self._stats,
+            }
+
+    def close(self) -> None:
+        """Close idle sessions; checked-out ones are closed when checked in."""
+        reaper, self._reaper = self._reaper, None
+        if reaper is not None:
+            self._stopping.set()
+            reaper.join()
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            for session, _ in idle:
+                del self._created_at[session]
+            self._cond.notify_all()
+        for session, _ in idle:
+            session.close()
+
+
+class AsyncAssistantSession:
+    """Asyncio counterpart of AssistantSession.
+
+    Built on TextAssistantAsync, whose grpc.aio channel multiplexes
+    concurrent requests, so many calls can be in flight on one session
+    without a thread each. Calls take an optional timeout in seconds, which
+    defaults to the session's; cancelling the awaiting task cancels the RPC.
+
+    Unlike AssistantSession, it has no rate limiter, concurrency controller,
+    retries or circuit breaker, and always talks to Google, ignoring
+    GHOME_ASSISTANT_ENDPOINT. Callers pace their own requests, for example
+    with an asyncio.Semaphore.
+    """
+
+    def __init__(
+        self,
+        credentials: google.oauth2.credentials.Credentials,
+        timeout: float | None = None,
+    ):
+        self._credentials = credentials
+        self._assistant: TextAssistantAsync | None = None
+        self.timeout = timeout
+
+    async def __aenter__(self) -> "AsyncAssistantSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _connect(self) -> TextAssistantAsync:
+        """Return the assistant, creating it if needed.
+
+        TextAssistantAsync opens its channel on first use, bound to the
+        running event loop.
+        """
+        if self._assistant is None:
+            self._assistant = TextAssistantAsync(self._credentials)
+        return self._assistant
+
+    async def close(self) -> None:
+        """Close the underlying channel. The session reopens it on next use."""
+        assistant, self._assistant = self._assistant, None
+        if assistant is not None:
+            await assistant.close()
+
+    async def assist(
+        self, text: str, timeout: float | None = None
+    ) -> tuple[str, bytes | None, bytes]:
+        """Send raw text to the Assistant and return (text, html, audio)."""
+        timeout = self.timeout if timeout is None else timeout
+        assistant = self._connect()
+        try:
+            return await asyncio.wait_for(assistant.assist(text), timeout)
+        except grpc.RpcError as e:
+            if not _is_reconnectable(e):
+                raise
+        # Concurrent calls that failed on the same dropped channel share
+        # whichever replacement the first of them opened.
+        if self._assistant is assistant:
+            await self.close()
+        return await asyncio.wait_for(self._connect().assist(text), timeout)
+
+    async def broadcast(self, message: str, timeout: float | None = None) -> str:
+        """Broadcast a message to all Google Home devices."""
+        response_text, _, _ = await self.assist(broadcast_command(message), timeout)
+        return response_text or "Broadcast sent"
+
+    async def send(self, command: str, timeout: float | None = None) -> str:
+        """Send any command to Google Assistant."""
+        response_text, _, _ = await self.assist(validate_command(command), timeout)
+        return response_text or "Command sent"
+
+
+async def async_broadcast_message(
+    message: str,
+    credentials: google.oauth2.credentials.Credentials,
+    timeout: float | None = None,
+) -> str:
+    """Broadcast a message to all Google Home devices."""
+    async with AsyncAssistantSession(credentials) as session:
+        return await session.broadcast(message, timeout)
+
+
+async def async_send_command(
     command: str,
     credentials: google.oauth2.credentials.Credentials,
+    timeout: float | None = None,
 ) -> str:
     """Send any command to Google Assistant."""
-    command = command.strip()
+    async with AsyncAssistantSession(credentials) as session:
+        return await session.send(command, timeout)
+
+
+@dataclass
+class CommandResult:
+    """Outcome of one command sent by send_commands."""
+
+    index: int
+    command: str
+    response: str | None = None
+    error: Exception | None = None
+    reply: Reply | None = None
+    attempts: int = 0
+    # Seconds from the start of the send to its response or failure.
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the command succeeded."""
+        return self.error is None
+
+
+def send_commands(
+    commands: Iterable[str],
+    credentials: google.oauth2.credentials.Credentials,
+    max_workers: int = 4,
+    as_completed: bool = False,
+    cache: ResponseCache | None = None,
+    rate_limiter: TokenBucket | None = None,
+) -> Iterator[CommandResult]:
+    """Send independent commands over up to max_workers sessions in parallel.
+
+    Each worker thread holds its own session for the whole run. Results are
+    yielded in input order, or as each command finishes if as_completed is
+    True. A failed command is reported through its result's error and does
+    not affect the others. Closing the iterator early cancels any commands
+    that have not started.
+
+    The sessions share the optional cache and rate limiter, one circuit
+    breaker, and an AIMD concurrency controller that starts at max_workers
+    requests in flight and backs off while the backend reports overload.
+    """
+    concurrency = AdaptiveConcurrency(initial=max_workers, maximum=max_workers)
+    breaker = CircuitBreaker()
+    local = threading.local()
+    sessions: list[AssistantSession] = []
+    sessions_lock = threading.Lock()
+
+    def run(index: int, command: str) -> CommandResult:
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = AssistantSession(
+                credentials, cache, rate_limiter, concurrency, breaker=breaker
+            )
+            with sessions_lock:
+                sessions.append(session)
+        started = time.monotonic()
+        try:
+            reply = session.request("command", command)
+        except Exception as e:
+            return CommandResult(
+                index, command, error=e,
+                attempts=session.retry_stats.last_attempts, elapsed=time.monotonic() - started,
+            )
+        return CommandResult(
+            index, command, response=reply.response, reply=reply,
+            attempts=reply.attempts, elapsed=time.monotonic() - started,
+        )
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [executor.submit(run, i, c) for i, c in enumerate(commands)]
+        if as_completed:
+            futures = concurrent.futures.as_completed(futures)
+        for future in futures:
+            yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        for session in sessions:
+            session.close()
+
+
+@dataclass
+class ProfileResult:
+    """Outcome of one profile's send in send_to_profiles."""
+
+    profile: str
+    response: str | None = None
+    error: Exception | None = None
+    # Seconds from loading the profile's credentials to its response.
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the send succeeded."""
+        return self.error is None
+
+
+def send_to_profiles(
+    action: str,
+    text: str,
+    profiles: Iterable[str],
+    rate_limiters: dict[str, TokenBucket] | None = None,
+) -> list[ProfileResult]:
+    """Send one broadcast or command to every profile's account concurrently.
+
+    Each profile loads, and if needed refreshes, its own credentials and
+    opens its own session on a thread of its own, so the whole fan-out
+    takes about as long as the slowest account. Results are returned in
+    the order of profiles; a failure in one doesn't affect the others.
+    """
+    validate = broadcast_command if action == "broadcast" else validate_command
+    validate(text)
+    profiles = list(profiles)
+    rate_limiters = rate_limiters or {}
+
+    def run(profile: str) -> ProfileResult:
+        started = time.monotonic()
+        try:
+            credentials = load_credentials(profile=profile)
+            with AssistantSession(credentials, rate_limiter=rate_limiters.get(profile)) as session:
+                if action == "broadcast":
+                    response = session.broadcast(text)
+                else:
+                    response = session.send(text)
+        except Exception as e:
+            return ProfileResult(profile, error=e, elapsed=time.monotonic() - started)
+        return ProfileResult(profile, response, elapsed=time.monotonic() - started)
 
-    if not command:
-        raise CommandError("Command cannot be empty")
+    if not profiles:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(profiles)) as executor:
+        return list(executor.map(run, profiles))
 
-    with TextAssistant(credentials) as assistant:
-        response_text, _, _ = assistant.assist(command)
 
-    return response_text or "Command sent"
+timing.record("import", time.monotonic() - _import_started)
@@ -1,14 +1,30 @@
-"""OAuth credential management."""
+"""OAuth credential management.
+
+The Google auth libraries are imported inside the functions that use them:
+this module is imported by every CLI command, and commands such as
+``ghome auth status`` never need them.
+"""
+
+from __future__ import annotations
 
 import json
 import os
 import shutil
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import google.oauth2.credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
+from ghome import timing
+from ghome.config import (
+    get_client_secret_path,
+    get_credentials_lock_path,
+    get_credentials_path,
+)
+from ghome.storage import file_lock, write_private_json
 
-from ghome.config import get_config_dir, get_client_secret_path, get_credentials_path
+if TYPE_CHECKING:
+    import google.oauth2.credentials
 
 SCOPES = ["https://www.googleapis.com/auth/assistant-sdk-prototype"]
 
@@ -23,9 +39,178 @@ class ClientSecretNotFoundError(Exception):
     pass
 
 
-def load_credentials() -> google.oauth2.credentials.Credentials:
-    """Load OAuth credentials from the credentials file."""
-    creds_path = get_credentials_path()
+def load_credentials(
+    refresh: bool = True, profile: str | None = None
+) -> google.oauth2.credentials.Credentials:
+    """Load a profile's OAuth credentials, refreshing the access token if it has expired.
+
+    With refresh=False the file is only read, and the caller is expected to
+    run refresh_if_needed(), for example on another thread.
+    """
+    with timing.stage("load_credentials"):
+        credentials = _read_credentials(profile)
+
+    if refresh:
+        refresh_if_needed(credentials, profile)
+    return credentials
+
+
+def refresh_if_needed(credentials: google.oauth2.credentials.Credentials, profile: str | None = None) -> None:
+    """Refresh an expired access token in place, saving the new one."""
+    import google.auth.exceptions
+
+    if not _needs_refresh(credentials):
+        return
+
+    try:
+        with timing.stage("token_refresh"):
+            _adopt(credentials, refresh_credentials(profile=profile))
+    except google.auth.exceptions.TransportError:
+        # Offline: leave the refresh to the first request, which reports
+        # the network failure the same way any other request does.
+        pass
+    except google.auth.exceptions.RefreshError:
+        raise CredentialsNotFoundError(
+            "Credentials were revoked or expired. Run 'ghome auth login' to re-authenticate."
+        )
+
+
+def _adopt(credentials: google.oauth2.credentials.Credentials, fresh: google.oauth2.credentials.Credentials) -> None:
+    """Copy a refreshed token into credentials that sessions already hold."""
+    credentials.token = fresh.token
+    credentials.expiry = fresh.expiry
+
+
+def refresh_credentials(
+    margin: float = 0.0, profile: str | None = None
+) -> google.oauth2.credentials.Credentials:
+    """Refresh the stored access token and write it back to disk.
+
+    The token is refreshed if it has expired or expires within `margin`
+    seconds. Runs under the credentials lock and re-reads the file once the
+    lock is held, so concurrent processes that all see an expiring token
+    make a single request to the token endpoint and share its result.
+    """
+    import google.auth.transport.requests
+
+    with file_lock(get_credentials_lock_path(profile)):
+        credentials = _read_credentials(profile)
+        if _needs_refresh(credentials, margin):
+            credentials.refresh(google.auth.transport.requests.Request())
+            save_credentials(credentials, profile)
+        return credentials
+
+
+def _needs_refresh(credentials: google.oauth2.credentials.Credentials, margin: float = 0.0) -> bool:
+    """Return True if the access token is missing, expired, expiring within margin seconds, or of unknown age."""
+    if not credentials.refresh_token:
+        return False
+    if credentials.expiry is None or not credentials.valid:
+        return True
+    return margin > 0 and _seconds_until(credentials.expiry) < margin
+
+
+def _seconds_until(expiry: datetime) -> float:
+    """Return the seconds until a naive UTC expiry, as google-auth stores it."""
+    return (expiry - datetime.now(timezone.utc).replace(tzinfo=None)).total_seconds()
+
+
+class CredentialsManager:
+    """Refresh an access token from a background thread before it expires.
+
+    Sessions authorize each request with the Credentials object they were
+    given, refreshing it in-line once it is close to expiry. The manager
+    refreshes `refresh_margin` seconds ahead of expiry instead, through
+    refresh_credentials() so the new token is saved and shared with other
+    processes, and updates the shared object in place, so requests never
+    wait on the token endpoint. Failed refreshes are retried with
+    exponential backoff.
+
+        with CredentialsManager(load_credentials()) as manager:
+            session = AssistantSession(manager.credentials)
+    """
+
+    def __init__(
+        self,
+        credentials: google.oauth2.credentials.Credentials,
+        refresh_margin: float = 600.0,
+        min_backoff: float = 5.0,
+        max_backoff: float = 300.0,
+        profile: str | None = None,
+    ):
+        self.credentials = credentials
+        self.profile = profile
+        self.refresh_margin = refresh_margin
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error: Exception | None = None
+        self._consecutive_failures = 0
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> CredentialsManager:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start the refresh thread."""
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="ghome-token-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the refresh thread, waiting for a refresh in progress."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            thread.join()
+
+    def refresh(self) -> None:
+        """Refresh now and copy the new token into the shared credentials."""
+        with timing.stage("token_refresh"):
+            _adopt(self.credentials, refresh_credentials(self.refresh_margin, self.profile))
+        self.refreshes += 1
+
+    def next_refresh_delay(self) -> float | None:
+        """Return the seconds until the next refresh is due, or None if never."""
+        if not self.credentials.refresh_token:
+            return None
+        if self.credentials.expiry is None:
+            return 0.0
+        return max(0.0, _seconds_until(self.credentials.expiry) - self.refresh_margin)
+
+    def _run(self) -> None:
+        delay = self.next_refresh_delay()
+        while not self._stopping.wait(delay):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Revoked credentials fail the same way; keep trying slowly in
+                # case the user logs in again, and let requests report it.
+                self.failures += 1
+                self.last_error = e
+                self._consecutive_failures += 1
+                delay = min(self.max_backoff, self.min_backoff * 2 ** (self._consecutive_failures - 1))
+            else:
+                self._consecutive_failures = 0
+                # A token issued with less lifetime than the margin is due
+                # again at once; don't hammer the token endpoint for it.
+                delay = self.next_refresh_delay()
+                if delay is not None:
+                    delay = max(delay, self.min_backoff)
+
+
+def _read_credentials(profile: str | None = None) -> google.oauth2.credentials.Credentials:
+    """Read OAuth credentials from a profile's credentials file."""
+    import google.oauth2.credentials
+
+    creds_path = get_credentials_path(profile)
 
     if not creds_path.exists():
         raise CredentialsNotFoundError(
@@ -40,31 +225,34 @@ def load_credentials() -> google.oauth2.credentials.Credentials:
             f"Credentials file is invalid JSON. Run 'ghome auth login' to re-authenticate."
         )
 
+    expiry = creds_data.get("expiry")
+
     return google.oauth2.credentials.Credentials(
         token=creds_data.get("token"),
         refresh_token=creds_data.get("refresh_token"),
         token_uri=creds_data.get("token_uri"),
         client_id=creds_data.get("client_id"),
         client_secret=creds_data.get("client_secret"),
+        expiry=datetime.fromisoformat(expiry) if expiry else None,
     )
 
 
-def init_client_secret(source_path: Path) -> None:
-    """Copy client secret file to config directory."""
+def init_client_secret(source_path: Path, profile: str | None = None) -> None:
+    """Copy client secret file to a profile's directory."""
     if not source_path.exists():
         raise ClientSecretNotFoundError(f"File not found: {source_path}")
 
-    config_dir = get_config_dir()
-    config_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
-
-    dest_path = get_client_secret_path()
+    dest_path = get_client_secret_path(profile)
+    dest_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
     shutil.copy(source_path, dest_path)
     os.chmod(dest_path, 0o600)  # Owner read/write only
 
 
-def run_oauth_flow() -> google.oauth2.credentials.Credentials:
+def run_oauth_flow(profile: str | None = None) -> google.oauth2.credentials.Credentials:
     """Run OAuth flow and save credentials."""
-    client_secret_path = get_client_secret_path()
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
+    client_secret_path = get_client_secret_path(profile)
 
     if not client_secret_path.exists():
         raise ClientSecretNotFoundError(
@@ -77,25 +265,21 @@ def run_oauth_flow() -> google.oauth2.credentials.Credentials:
     )
 
     credentials = flow.run_local_server(port=0)
-    save_credentials(credentials)
+    save_credentials(credentials, profile)
     return credentials
 
 
-def save_credentials(credentials: google.oauth2.credentials.Credentials) -> None:
-    """Save credentials to file."""
-    config_dir = get_config_dir()
-    config_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
-
-    creds_path = get_credentials_path()
+def save_credentials(credentials: google.oauth2.credentials.Credentials, profile: str | None = None) -> None:
+    """Save credentials to a profile's credentials file."""
+    creds_path = get_credentials_path(profile)
     creds_data = {
         "token": credentials.token,
         "refresh_token": credentials.refresh_token,
         "token_uri": credentials.token_uri,
         "client_id": credentials.client_id,
         "client_secret": credentials.client_secret,
+        # google-auth keeps expiry as a naive UTC datetime.
+        "expiry": credentials.expiry.isoformat() if credentials.expiry else None,
     }
 
-    with open(creds_path, "w") as f:
-        json.dump(creds_data, f)
-
-    os.chmod(creds_path, 0o600)  # Owner read/write only
+    write_private_json(creds_path, creds_data)  # Owner read/write only
@@ -0,0 +1,124 @@
+"""Load generator for measuring assist throughput and latency."""
+
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+
+from ghome.assistant import AssistantSession
+from ghome.retry import RetryPolicy
+
+
+class BenchError(Exception):
+    """Raised when a benchmark session can't be set up."""
+    pass
+
+
+@dataclass
+class BenchReport:
+    """Outcome of a benchmark run."""
+
+    sessions: int
+    commands: int
+    elapsed: float
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def completed(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        """Successful commands per second."""
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Return the p-th percentile latency (nearest rank), or 0.0 if none completed."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(math.ceil(p / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+    def format(self) -> str:
+        total = self.sessions * self.commands
+        lines = [
+            f"Sessions:   {self.sessions}",
+            f"Commands:   {self.completed}/{total} succeeded, {self.errors} failed",
+            f"Elapsed:    {self.elapsed:.2f}s",
+            f"Throughput: {self.throughput:.1f} commands/s",
+        ]
+        for p in (50, 95, 99):
+            lines.append(f"p{p}:        {self.percentile(p) * 1000:.1f}ms")
+        return "\n".join(lines)
+
+
+def run_bench(
+    credentials,
+    sessions: int,
+    commands: int,
+    text: str,
+    endpoint: str | None = None,
+    insecure: bool = False,
+) -> BenchReport:
+    """Open `sessions` concurrent sessions and send `commands` commands over each.
+
+    Retries are disabled so that every failure the backend returns is counted
+    rather than hidden behind a slower success. Raises BenchError if a
+    session fails to open its channel.
+    """
+    latencies: list[float] = []
+    errors = 0
+    setup_error: Exception | None = None
+    lock = threading.Lock()
+    start = threading.Barrier(sessions + 1)
+
+    def worker():
+        nonlocal errors, setup_error
+        session = AssistantSession(
+            credentials,
+            endpoint=endpoint,
+            insecure=insecure,
+            retry_policy=RetryPolicy(max_attempts=1),
+        )
+        with session:
+            # Connect before the clock starts so setup cost isn't counted.
+            try:
+                session.warm_up()
+            except Exception as e:
+                with lock:
+                    setup_error = setup_error or e
+                start.abort()
+                return
+            try:
+                start.wait()
+            except threading.BrokenBarrierError:
+                return  # Another session failed to set up
+            for _ in range(commands):
+                started = time.monotonic()
+                try:
+                    session.assist(text)
+                except Exception:
+                    with lock:
+                        errors += 1
+                else:
+                    elapsed = time.monotonic() - started
+                    with lock:
+                        latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(sessions)]
+    for thread in threads:
+        thread.start()
+    try:
+        start.wait()
+    except threading.BrokenBarrierError:
+        for thread in threads:
+            thread.join()
+        raise BenchError(f"Session setup failed: {setup_error}") from setup_error
+    started = time.monotonic()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    return BenchReport(sessions, commands, elapsed, latencies, errors)
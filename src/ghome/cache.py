@@ -0,0 +1,154 @@
+"""Response cache for read-only Assistant queries.
+
+Only commands matching an allow-list of patterns are cached, so actions
+("turn off the lights") and broadcasts always reach the Assistant. Entries
+expire after a TTL and the cache holds at most max_entries, evicting the
+least recently used. With a path, entries are also kept in a JSON file so
+short-lived CLI processes share hits.
+"""
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable
+
+from ghome.storage import file_lock, write_private_json
+
+# Informational questions whose answers are safe to reuse for a few seconds.
+DEFAULT_CACHEABLE_PATTERNS = (
+    r"^(?:what|what's|which|who|when|where|how)\b",
+    r"^(?:is|are)\b",
+)
+
+# Never cached, whatever the allow-list says.
+_NEVER_CACHEABLE = re.compile(r"^broadcast\b")
+
+
+def normalize_command(command: str) -> str:
+    """Return the cache key for a command: lowercase, single-spaced, unpunctuated."""
+    return " ".join(command.lower().split()).rstrip("?.! ")
+
+
+class ResponseCache:
+    """TTL and LRU bounded cache of Assistant responses, keyed on command text."""
+
+    def __init__(
+        self,
+        ttl: float = 30.0,
+        max_entries: int = 256,
+        path: Path | None = None,
+        patterns: Iterable[str] = DEFAULT_CACHEABLE_PATTERNS,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self._patterns = [re.compile(p, re.IGNORECASE) for p in patterns]
+        # key -> (expires_at, response), least recently used first. Expiry
+        # uses wall-clock time so it stays meaningful across processes.
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def is_cacheable(self, command: str) -> bool:
+        """Return True if the command's response may be cached."""
+        key = normalize_command(command)
+        if _NEVER_CACHEABLE.match(key):
+            return False
+        return any(p.search(key) for p in self._patterns)
+
+    def get(self, command: str) -> str | None:
+        """Return the cached response for a command, or None.
+
+        Commands that aren't cacheable return None without counting a miss.
+        """
+        if not self.is_cacheable(command):
+            return None
+
+        key = normalize_command(command)
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None and self.path is not None:
+                self._merge(self._read_file())
+                entry = self._lookup(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return entry[1]
+
+    def put(self, command: str, response: str) -> None:
+        """Cache a response. Responses to non-cacheable commands are ignored."""
+        if not self.is_cacheable(command):
+            return
+
+        key = normalize_command(command)
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, response)
+            self._entries.move_to_end(key)
+            self._evict()
+
+            if self.path is not None:
+                with file_lock(self.path.with_suffix(".lock")):
+                    self._merge(self._read_file())
+                    self._entries.move_to_end(key)
+                    self._evict()
+                    write_private_json(self.path, dict(self._entries))
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current number of entries."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def _lookup(self, key: str) -> tuple[float, str] | None:
+        """Return a live entry and mark it recently used, dropping it if expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _merge(self, entries: dict) -> None:
+        """Add entries from the shared file that are newer than ours."""
+        for key, (expires_at, response) in entries.items():
+            current = self._entries.get(key)
+            if current is None or current[0] < expires_at:
+                self._entries[key] = (expires_at, response)
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the least recently used beyond the bound."""
+        now = time.time()
+        for key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_file(self) -> dict:
+        """Return the entries stored in the shared file, or none if unreadable."""
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if not isinstance(entries, dict):
+            return {}  # Valid JSON but not a cache; treat it as corrupt
+        return {key: entry for key, entry in entries.items() if _is_entry(entry)}
+
+
+def _is_entry(entry) -> bool:
+    """Return True if a value read from the shared file is an (expires_at, response) pair."""
+    return (
+        isinstance(entry, list)
+        and len(entry) == 2
+        and isinstance(entry[0], (int, float))
+        and isinstance(entry[1], str)
+    )
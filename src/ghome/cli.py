@@ -1,27 +1,117 @@
-"""Command-line interface for Google Home CLI."""
+"""Command-line interface for Google Home CLI.
 
+ghome.assistant pulls in gassist_text, grpc and protobuf, so it is imported
+inside the commands that send messages rather than at module load.
+"""
+
+import concurrent.futures
+import functools
+import os
 import sys
+import time
+from contextlib import nullcontext
+from datetime import datetime
 from pathlib import Path
 
 import click
 
-from ghome import __version__
+from ghome import __version__, timing
 from ghome.auth import (
+    CredentialsManager,
     init_client_secret,
     run_oauth_flow,
     load_credentials,
+    refresh_if_needed,
     ClientSecretNotFoundError,
     CredentialsNotFoundError,
 )
-from ghome.assistant import broadcast_message, BroadcastError, send_command, CommandError
-from ghome.config import get_client_secret_path, get_credentials_path
+from ghome.cache import DEFAULT_CACHEABLE_PATTERNS, ResponseCache
+from ghome.coalesce import BroadcastCoalescer, BroadcastMerger, merge_stream
+from ghome.config import (
+    PROFILE_ENV,
+    InvalidProfileError,
+    get_active_profile,
+    get_cache_path,
+    get_client_secret_path,
+    get_coalesce_state_path,
+    get_credentials_path,
+    get_outbox_path,
+    get_rate_limit_state_path,
+    get_routines_dir,
+    get_schedule_lock_path,
+    get_schedule_path,
+    get_scheduler_lock_path,
+    get_socket_path,
+    list_profiles,
+    set_active_profile,
+)
+from ghome.daemon import DaemonError, DaemonUnavailable, run_daemon, send_request
+from ghome.messages import MAX_MESSAGE_LENGTH, BroadcastError, CommandError, broadcast_command, validate_command
+from ghome.outbox import STATUSES, Outbox, drain, session_sender
+from ghome.output import OUTPUT_FORMATS, format_ndjson, request_record
+from ghome.ratelimit import TokenBucket
+from ghome.routine import RoutineError, RunReport, find_routine, load_routine, pool_step_runner, run_routine
+from ghome.schedule import WARM_UP_LEAD, Firing, Scheduler, ScheduleError, ScheduleStore, parse_time
+from ghome.sendqueue import SendQueue, SendResult
 
 
 @click.group()
 @click.version_option(version=__version__)
-def main():
+@click.option(
+    "--cprofile",
+    "cprofile_path",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    metavar="FILE",
+    help="Run the command under cProfile and write the stats to FILE",
+)
+@click.pass_context
+def main(ctx, cprofile_path: Path | None):
     """Google Home CLI - Control Google Home devices from the command line."""
-    pass
+    if cprofile_path is not None:
+        _profile_until_close(ctx, cprofile_path)
+    set_active_profile(None)
+    timings_file = os.environ.get(timing.TIMINGS_FILE_ENV)
+    if timings_file:
+        hook = timing.json_lines_hook(Path(timings_file), ctx.invoked_subcommand)
+        timing.add_hook(hook)
+        ctx.call_on_close(lambda: timing.remove_hook(hook))
+
+
+def _profile_until_close(ctx, path: Path):
+    """Profile the rest of the command, writing pstats to path when it ends.
+
+    Only the main thread is profiled; background sends and refreshes show
+    up as time spent waiting on them.
+    """
+    import cProfile
+
+    profiler = cProfile.Profile()
+
+    def write_stats():
+        profiler.disable()
+        profiler.dump_stats(path)
+        click.echo(f"Profile written to {path}; view it with: python -m pstats {path}", err=True)
+
+    ctx.call_on_close(write_stats)
+    profiler.enable()
+
+
+def _use_profile(ctx, param, value):
+    """Make config paths default to the chosen profile."""
+    try:
+        set_active_profile(value)
+    except InvalidProfileError as e:
+        raise click.BadParameter(str(e), ctx=ctx, param=param)
+
+
+profile_option = click.option(
+    "--profile",
+    metavar="NAME",
+    is_eager=True,
+    expose_value=False,
+    callback=_use_profile,
+    help="Use the named account profile (default: $GHOME_PROFILE or 'default')",
+)
 
 
 @main.group()
@@ -31,6 +121,7 @@ def auth():
 
 
 @auth.command("init")
+@profile_option
 @click.argument("client_secret_path", type=click.Path(exists=True, path_type=Path))
 def auth_init(client_secret_path: Path):
     """Initialize with client secret file from Google Cloud Console."""
@@ -43,6 +134,7 @@ def auth_init(client_secret_path: Path):
 
 
 @auth.command("login")
+@profile_option
 def auth_login():
     """Complete OAuth flow to authorize access."""
     try:
@@ -58,6 +150,7 @@ def auth_login():
 
 
 @auth.command("status")
+@profile_option
 def auth_status():
     """Show current authentication status."""
     client_secret = get_client_secret_path()
@@ -74,10 +167,26 @@ def auth_status():
         return
 
     click.echo("Status: Authenticated")
+    click.echo(f"Profile: {get_active_profile()}")
     click.echo(f"Credentials: {credentials}")
 
 
+@auth.command("profiles")
+def auth_profiles():
+    """List account profiles and whether each is logged in."""
+    profiles = list_profiles()
+    if not profiles:
+        click.echo("No profiles configured.")
+        click.echo("Run 'ghome auth init <path> --profile NAME' to set one up.")
+        return
+
+    for profile in profiles:
+        logged_in = get_credentials_path(profile).exists()
+        click.echo(f"{profile}: {'authenticated' if logged_in else 'not logged in'}")
+
+
 @auth.command("logout")
+@profile_option
 def auth_logout():
     """Clear stored credentials."""
     creds_path = get_credentials_path()
@@ -89,33 +198,283 @@ def auth_logout():
         click.echo("No credentials to clear.")
 
 
+batch_option = click.option(
+    "--batch",
+    type=click.File("r"),
+    help="Send one message per line of FILE ('-' for stdin) over one session",
+)
+on_error_option = click.option(
+    "--on-error",
+    type=click.Choice(["continue", "abort"]),
+    default="continue",
+    show_default=True,
+    help="Whether a failed line in --batch mode stops the rest",
+)
+
+
+def _print_timings_on_close(ctx, param, value):
+    """Record stage timings and print them to stderr when the command ends."""
+    if value:
+        timing.enable()
+        ctx.call_on_close(_print_timings)
+
+
+def _print_timings():
+    """Print the recorded stage timings to stderr."""
+    if timing.records():
+        click.echo(timing.format_records(), err=True)
+
+
+timings_option = click.option(
+    "--timings",
+    is_flag=True,
+    is_eager=True,
+    expose_value=False,
+    callback=_print_timings_on_close,
+    help="Print how long each stage took",
+)
+all_profiles_option = click.option(
+    "--all-profiles",
+    is_flag=True,
+    help="Send the message to every profile's account at once",
+)
+rate_option = click.option(
+    "--rate",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Send at most N requests per second, shared by all ghome processes",
+)
+output_option = click.option(
+    "--output",
+    type=click.Choice(OUTPUT_FORMATS),
+    default="text",
+    show_default=True,
+    help="'ndjson' prints each request's outcome as a JSON line as it completes",
+)
+no_daemon_option = click.option(
+    "--no-daemon",
+    is_flag=True,
+    help="Send directly even if a daemon is running",
+)
+
+
+def _rate_limiter(rate: float | None, profile: str | None = None) -> TokenBucket | None:
+    """Return the cross-process rate limiter for --rate, if one was requested."""
+    if rate is None:
+        return None
+    return TokenBucket(rate, state_path=get_rate_limit_state_path(profile))
+
+
+def _failure_message(error: Exception, action: str) -> str:
+    """Describe a failed send without the backend's error details."""
+    from ghome.assistant import QuotaExceededError
+    from ghome.retry import CircuitOpenError
+
+    if isinstance(error, QuotaExceededError):
+        return "Assistant API quota exceeded. Try again later or lower --rate."
+    if isinstance(error, CircuitOpenError):
+        return str(error)
+    return f"Failed to send {action}. Use --verbose for details."
+
+
+SUPPRESSED_MESSAGE = "Duplicate broadcast suppressed."
+
+
 @main.command()
 @click.argument("message", required=False)
 @click.option("-i", "--interactive", is_flag=True, help="Interactive shell mode")
+@batch_option
+@on_error_option
+@click.option(
+    "--coalesce-window",
+    type=click.FloatRange(min=0),
+    default=0,
+    help="Skip messages identical to one sent in the last SECONDS",
+)
+@click.option(
+    "--merge",
+    is_flag=True,
+    help="In --batch mode, merge messages queued within the coalesce window",
+)
+@click.option(
+    "--queue",
+    "--async",
+    "queue",
+    is_flag=True,
+    help="Queue the message for the daemon or 'ghome outbox drain' and return at once",
+)
+@profile_option
+@all_profiles_option
+@rate_option
+@output_option
+@no_daemon_option
+@timings_option
 @click.option("-v", "--verbose", is_flag=True, help="Show debug output")
-def broadcast(message: str | None, interactive: bool, verbose: bool):
+def broadcast(
+    message: str | None,
+    interactive: bool,
+    batch,
+    on_error: str,
+    coalesce_window: float,
+    merge: bool,
+    queue: bool,
+    all_profiles: bool,
+    rate: float | None,
+    output: str,
+    no_daemon: bool,
+    verbose: bool,
+):
     """Broadcast a message to all Google Home devices."""
-    try:
-        credentials = load_credentials()
-    except CredentialsNotFoundError:
-        click.echo("Error: Not authenticated.", err=True)
-        click.echo("Run 'ghome auth login' first.", err=True)
-        sys.exit(1)
+    ndjson = output == "ndjson"
+    if ndjson and (interactive or queue or all_profiles):
+        click.echo("Error: --output ndjson can't be used with --interactive, --queue or --all-profiles.", err=True)
+        sys.exit(2)
+    if merge and not coalesce_window:
+        click.echo("Error: --merge requires --coalesce-window.", err=True)
+        sys.exit(2)
+    if queue and (interactive or batch or not message):
+        click.echo("Error: --queue takes a single message.", err=True)
+        sys.exit(2)
+    if all_profiles:
+        if interactive or batch or queue or coalesce_window or not message:
+            click.echo("Error: --all-profiles takes a single message and no --queue or --coalesce-window.", err=True)
+            sys.exit(2)
+        _send_to_all_profiles("broadcast", message, verbose, rate)
+        return
+
+    coalescer = None
+    if coalesce_window:
+        coalescer = BroadcastCoalescer(coalesce_window, get_coalesce_state_path())
+    rate_limiter = _rate_limiter(rate)
+
+    if message and not interactive and not batch and ndjson:
+        _send_single_ndjson(
+            "broadcast", message, coalescer=coalescer, rate_limiter=rate_limiter, use_daemon=not no_daemon
+        )
+        return
+
+    if message and not interactive and not batch:
+        _validate_or_exit(broadcast_command, message)
+        with coalescer.claim(message) if coalescer else nullcontext(True) as fresh:
+            if not fresh:
+                click.echo(SUPPRESSED_MESSAGE)
+            elif queue:
+                item_id = Outbox(get_outbox_path()).enqueue(message)
+                click.echo(f"Queued broadcast #{item_id}")
+            elif no_daemon or not _forward_to_daemon("broadcast", message, verbose):
+                _send_single_broadcast(message, verbose, rate_limiter)
+        return
+
+    credentials = _load_credentials_or_exit()
 
     if interactive:
-        _run_interactive_mode(credentials, verbose)
-    elif message:
-        _send_single_broadcast(message, credentials, verbose)
+        _run_interactive_mode(credentials, verbose, coalescer, rate_limiter)
+    elif batch:
+        _run_batch(
+            batch,
+            "broadcast",
+            credentials,
+            on_error,
+            verbose,
+            coalescer=coalescer,
+            merge=merge,
+            rate_limiter=rate_limiter,
+            ndjson=ndjson,
+        )
     else:
-        click.echo("Error: Message required. Use --interactive for shell mode.", err=True)
+        click.echo("Error: Message required. Use --interactive for shell mode or --batch FILE.", err=True)
         sys.exit(2)
 
 
-def _send_single_broadcast(message: str, credentials, verbose: bool):
+def _load_credentials_or_exit(refresh: bool = True):
+    """Load credentials, exiting with status 1 if not logged in."""
+    try:
+        return load_credentials(refresh)
+    except CredentialsNotFoundError:
+        _exit_not_authenticated()
+
+
+def _exit_not_authenticated():
+    click.echo("Error: Not authenticated.", err=True)
+    click.echo("Run 'ghome auth login' first.", err=True)
+    sys.exit(1)
+
+
+def _validate_or_exit(validate, text: str):
+    """Check a message or command before any other work, exiting with status 2 if invalid."""
+    try:
+        validate(text)
+    except (BroadcastError, CommandError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(2)
+
+
+def _load_credentials_in_background():
+    """Read credentials, refreshing the token on another thread if needed.
+
+    Returns the credentials and a future for the refresh, so that one-shot
+    commands can import the assistant and open its channel meanwhile.
+    """
+    credentials = _load_credentials_or_exit(refresh=False)
+    return credentials, _refresh_in_background(credentials)
+
+
+def _refresh_in_background(credentials) -> concurrent.futures.Future:
+    """Start refreshing the token if needed, returning the refresh's future."""
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    ready = executor.submit(refresh_if_needed, credentials)
+    executor.shutdown(wait=False)
+    return ready
+
+
+def _skip_duplicates(send, coalescer: BroadcastCoalescer, suppressed=SUPPRESSED_MESSAGE):
+    """Wrap a broadcast function so duplicates within the window aren't sent.
+
+    A duplicate returns `suppressed` instead of the function's response.
+    """
+
+    def send_once(message: str):
+        with coalescer.claim(message) as fresh:
+            return send(message) if fresh else suppressed
+
+    return send_once
+
+
+def _forward_to_daemon(action: str, text: str, verbose: bool, cache=None) -> bool:
+    """Send through a running daemon. Return False if no daemon is running.
+
+    With a cache, the response is cached as if the command was sent directly.
+    """
+    if not get_socket_path().exists():
+        return False
+
+    try:
+        with timing.stage("daemon_request"):
+            response = send_request(action, text)
+        click.echo(response)
+        if cache is not None:
+            cache.put(text, response)
+    except DaemonUnavailable:
+        return False
+    except DaemonError as e:
+        if e.kind in ("validation", "quota") or verbose:
+            click.echo(f"Error: {e}", err=True)
+        else:
+            click.echo(f"Error: Failed to send {action}. Use --verbose for details.", err=True)
+        sys.exit(2)
+
+    return True
+
+
+def _send_single_broadcast(message: str, verbose: bool, rate_limiter=None):
     """Send a single broadcast message."""
+    credentials, ready = _load_credentials_in_background()
+    from ghome.assistant import broadcast_message
+
     try:
-        response = broadcast_message(message, credentials)
+        response = broadcast_message(message, credentials, rate_limiter, credentials_ready=ready)
         click.echo(response)
+    except CredentialsNotFoundError:
+        _exit_not_authenticated()
     except BroadcastError as e:
         click.echo(f"Error: {e}", err=True)
         sys.exit(2)
@@ -123,66 +482,329 @@ def _send_single_broadcast(message: str, credentials, verbose: bool):
         if verbose:
             click.echo(f"Error: {e}", err=True)
         else:
-            click.echo("Error: Failed to send broadcast. Use --verbose for details.", err=True)
+            click.echo(f"Error: {_failure_message(e, 'broadcast')}", err=True)
         sys.exit(2)
 
 
-def _run_interactive_mode(credentials, verbose: bool):
-    """Run interactive broadcast shell."""
-    click.echo("Interactive mode. Type 'quit' to exit.")
+def _emit(record: dict):
+    """Print one --output ndjson record; click.echo flushes it at once."""
+    click.echo(format_ndjson(record))
 
-    while True:
-        try:
-            message = click.prompt(">", prompt_suffix=" ")
-        except (EOFError, KeyboardInterrupt):
-            click.echo("\nExiting.")
-            break
 
-        if message.lower() in ("quit", "exit", "q"):
-            break
+def _send_single_ndjson(
+    action: str, text: str, cache=None, coalescer=None, rate_limiter=None, use_daemon: bool = True
+):
+    """Send one message the way the text output path does, printing a JSON record.
 
-        if not message.strip():
-            continue
+    Exits with status 1 if not logged in and 2 if the request failed.
+    """
+    started = time.monotonic()
+
+    def finish(**fields):
+        record = request_record(action, text, latency=time.monotonic() - started, **fields)
+        _emit(record)
+        if not record["ok"]:
+            sys.exit(1 if record["error"] == "auth" else 2)
+
+    try:
+        (broadcast_command if action == "broadcast" else validate_command)(text)
+    except (BroadcastError, CommandError) as e:
+        finish(error=e)
+
+    with coalescer.claim(text) if coalescer else nullcontext(True) as fresh:
+        if not fresh:
+            finish(response=SUPPRESSED_MESSAGE, source="coalesced")
+            return
+
+        cached = cache.get(text) if cache is not None else None
+        if cached is not None:
+            finish(response=cached, source="cache")
+            return
+
+        if use_daemon and get_socket_path().exists():
+            try:
+                with timing.stage("daemon_request"):
+                    response = send_request(action, text)
+            except DaemonUnavailable:
+                pass
+            except DaemonError as e:
+                finish(error=e, source="daemon", attempts=None)
+            else:
+                if cache is not None:
+                    cache.put(text, response)
+                finish(response=response, source="daemon", attempts=None)
+                return
 
         try:
-            response = broadcast_message(message, credentials)
-            click.echo(response)
-        except BroadcastError as e:
-            click.echo(f"Error: {e}", err=True)
-        except Exception as e:
-            if verbose:
-                click.echo(f"Error: {e}", err=True)
+            credentials = load_credentials(refresh=False)
+        except CredentialsNotFoundError as e:
+            finish(error=e)
+        ready = _refresh_in_background(credentials)
+        from ghome.assistant import AssistantSession
+
+        with AssistantSession(credentials, cache, rate_limiter) as session:
+            try:
+                session.await_credentials(ready)
+                reply = session.request(action, text)
+            except Exception as e:
+                finish(error=e, attempts=session.retry_stats.last_attempts)
             else:
-                click.echo("Error: Failed to send. Use --verbose for details.", err=True)
+                finish(reply=reply)
+
+
+def _run_batch(
+    lines,
+    action: str,
+    credentials,
+    on_error: str,
+    verbose: bool,
+    cache=None,
+    coalescer: BroadcastCoalescer | None = None,
+    merge: bool = False,
+    rate_limiter: TokenBucket | None = None,
+    ndjson: bool = False,
+):
+    """Send each non-blank line over one session, printing one result per line.
+
+    Responses go to stdout and failures to stderr, each tagged with its line
+    number, or with ndjson every outcome is a JSON record on stdout. Exits
+    with status 2 if any line failed. Broadcasts can skip duplicates
+    through a coalescer and be merged within its window.
+    """
+    from ghome.assistant import AssistantSession
+
+    failures = 0
+    numbered = ((n, line) for n, line in enumerate(lines, start=1) if line.strip())
+    if merge:
+        numbered = merge_stream(numbered, BroadcastMerger(coalescer.window, MAX_MESSAGE_LENGTH))
+
+    with AssistantSession(credentials, cache, rate_limiter) as session:
+        if ndjson:
+            send = functools.partial(session.request, action)
+        else:
+            send = session.broadcast if action == "broadcast" else session.send
+        if coalescer is not None:
+            send = _skip_duplicates(send, coalescer, None if ndjson else SUPPRESSED_MESSAGE)
+
+        for line_number, line in numbered:
+            started = time.monotonic()
+            try:
+                result = send(line)
+            except Exception as e:
+                failures += 1
+                if ndjson:
+                    _emit(request_record(
+                        action, line, error=e, attempts=session.retry_stats.last_attempts,
+                        latency=time.monotonic() - started, line=line_number,
+                    ))
+                else:
+                    _echo_line_error(line_number, e, action, verbose)
+                if on_error == "abort":
+                    break
+                continue
+
+            if not ndjson:
+                click.echo(result)
+            elif result is None:
+                _emit(request_record(
+                    action, line, response=SUPPRESSED_MESSAGE, source="coalesced",
+                    latency=time.monotonic() - started, line=line_number,
+                ))
+            else:
+                _emit(request_record(
+                    action, line, reply=result, latency=time.monotonic() - started, line=line_number,
+                ))
+
+    if failures:
+        sys.exit(2)
+
+
+def _run_parallel_batch(
+    lines,
+    credentials,
+    max_workers: int,
+    on_error: str,
+    verbose: bool,
+    cache=None,
+    rate_limiter=None,
+    ndjson: bool = False,
+):
+    """Send the non-blank lines as commands over parallel sessions.
+
+    Results print in input order, or with ndjson as JSON records as each
+    command completes. Exits with status 2 if any line failed.
+    """
+    from contextlib import closing
+
+    from ghome.assistant import send_commands
+
+    numbered = [(n, line) for n, line in enumerate(lines, start=1) if line.strip()]
+    results = send_commands(
+        [line for _, line in numbered],
+        credentials,
+        max_workers=max_workers,
+        as_completed=ndjson,
+        cache=cache,
+        rate_limiter=rate_limiter,
+    )
+    failures = 0
+
+    with closing(results):
+        for result in results:
+            if ndjson:
+                _emit(request_record(
+                    "command", result.command, reply=result.reply, error=result.error,
+                    attempts=result.attempts, latency=result.elapsed, line=numbered[result.index][0],
+                ))
+            if result.ok:
+                if not ndjson:
+                    click.echo(result.response)
+                continue
+
+            failures += 1
+            if not ndjson:
+                _echo_line_error(numbered[result.index][0], result.error, "command", verbose)
+            if on_error == "abort":
+                break
+
+    if failures:
+        sys.exit(2)
+
+
+def _echo_line_error(line_number: int, error: Exception, action: str, verbose: bool):
+    """Report a failed batch line on stderr."""
+    if isinstance(error, (BroadcastError, CommandError)) or verbose:
+        click.echo(f"Error: line {line_number}: {error}", err=True)
+    else:
+        click.echo(f"Error: line {line_number}: {_failure_message(error, action)}", err=True)
+
+
+def _run_interactive_mode(
+    credentials,
+    verbose: bool,
+    coalescer: BroadcastCoalescer | None = None,
+    rate_limiter: TokenBucket | None = None,
+):
+    """Run interactive broadcast shell."""
+    from ghome.assistant import AssistantSession
+
+    click.echo("Interactive mode. Type 'quit' to exit.")
+
+    with CredentialsManager(credentials), AssistantSession(credentials, rate_limiter=rate_limiter) as session:
+        send = session.broadcast
+        if coalescer is not None:
+            send = _skip_duplicates(send, coalescer)
+
+        _run_shell(send, broadcast_command, "broadcast", verbose)
 
 
 @main.command("command")
 @click.argument("text", required=False)
 @click.option("-i", "--interactive", is_flag=True, help="Interactive shell mode")
+@batch_option
+@on_error_option
+@click.option(
+    "--parallel",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Send --batch lines over up to N sessions concurrently",
+)
+@click.option("--cache", "use_cache", is_flag=True, help="Reuse recent answers to informational queries")
+@click.option("--cache-ttl", type=click.FloatRange(min=0, min_open=True), default=30.0, show_default=True, help="Seconds a cached answer stays fresh")
+@click.option(
+    "--cache-pattern",
+    "cache_patterns",
+    multiple=True,
+    help="Regex for cacheable commands (repeatable; replaces the defaults)",
+)
+@profile_option
+@all_profiles_option
+@rate_option
+@output_option
+@no_daemon_option
+@timings_option
 @click.option("-v", "--verbose", is_flag=True, help="Show debug output")
-def command_cmd(text: str | None, interactive: bool, verbose: bool):
+def command_cmd(
+    text: str | None,
+    interactive: bool,
+    batch,
+    on_error: str,
+    parallel: int,
+    use_cache: bool,
+    cache_ttl: float,
+    cache_patterns: tuple[str, ...],
+    all_profiles: bool,
+    rate: float | None,
+    output: str,
+    no_daemon: bool,
+    verbose: bool,
+):
     """Send any command to Google Assistant."""
-    try:
-        credentials = load_credentials()
-    except CredentialsNotFoundError:
-        click.echo("Error: Not authenticated.", err=True)
-        click.echo("Run 'ghome auth login' first.", err=True)
-        sys.exit(1)
+    ndjson = output == "ndjson"
+    if ndjson and (interactive or all_profiles):
+        click.echo("Error: --output ndjson can't be used with --interactive or --all-profiles.", err=True)
+        sys.exit(2)
+    if all_profiles:
+        if interactive or batch or use_cache or not text:
+            click.echo("Error: --all-profiles takes a single command and no --cache.", err=True)
+            sys.exit(2)
+        _send_to_all_profiles("command", text, verbose, rate)
+        return
+
+    cache = None
+    if use_cache:
+        cache = ResponseCache(
+            ttl=cache_ttl,
+            path=get_cache_path(),
+            patterns=cache_patterns or DEFAULT_CACHEABLE_PATTERNS,
+        )
+
+    if text and not interactive and not batch and ndjson:
+        _send_single_ndjson(
+            "command", text, cache=cache, rate_limiter=_rate_limiter(rate), use_daemon=not no_daemon
+        )
+        return
+
+    if text and not interactive and not batch:
+        _validate_or_exit(validate_command, text)
+        cached = cache.get(text) if cache is not None else None
+        if cached is not None:
+            click.echo(cached)
+            return
+
+        if not no_daemon and _forward_to_daemon("command", text, verbose, cache):
+            return
+
+    rate_limiter = _rate_limiter(rate)
+
+    if text and not interactive and not batch:
+        _send_single_command(text, verbose, cache, rate_limiter)
+        return
+
+    credentials = _load_credentials_or_exit()
 
     if interactive:
-        _run_command_interactive_mode(credentials, verbose)
-    elif text:
-        _send_single_command(text, credentials, verbose)
+        _run_command_interactive_mode(credentials, verbose, cache, rate_limiter)
+    elif batch and parallel > 1:
+        _run_parallel_batch(batch, credentials, parallel, on_error, verbose, cache, rate_limiter, ndjson)
+    elif batch:
+        _run_batch(batch, "command", credentials, on_error, verbose, cache, rate_limiter=rate_limiter, ndjson=ndjson)
     else:
-        click.echo("Error: Command text required. Use --interactive for shell mode.", err=True)
+        click.echo("Error: Command text required. Use --interactive for shell mode or --batch FILE.", err=True)
         sys.exit(2)
 
 
-def _send_single_command(text: str, credentials, verbose: bool):
+def _send_single_command(text: str, verbose: bool, cache=None, rate_limiter=None):
     """Send a single command."""
+    credentials, ready = _load_credentials_in_background()
+    from ghome.assistant import send_command
+
     try:
-        response = send_command(text, credentials)
+        response = send_command(text, credentials, cache, rate_limiter, credentials_ready=ready)
         click.echo(response)
+    except CredentialsNotFoundError:
+        _exit_not_authenticated()
     except CommandError as e:
         click.echo(f"Error: {e}", err=True)
         sys.exit(2)
@@ -190,34 +812,539 @@ def _send_single_command(text: str, credentials, verbose: bool):
         if verbose:
             click.echo(f"Error: {e}", err=True)
         else:
-            click.echo("Error: Failed to send command. Use --verbose for details.", err=True)
+            click.echo(f"Error: {_failure_message(e, 'command')}", err=True)
         sys.exit(2)
 
 
-def _run_command_interactive_mode(credentials, verbose: bool):
+def _send_to_all_profiles(action: str, text: str, verbose: bool, rate: float | None):
+    """Send one message to every profile at once and report each result."""
+    _validate_or_exit(broadcast_command if action == "broadcast" else validate_command, text)
+
+    profiles = list_profiles()
+    if not profiles:
+        click.echo("Error: No profiles configured.", err=True)
+        sys.exit(1)
+
+    from ghome.assistant import send_to_profiles
+
+    rate_limiters = {profile: _rate_limiter(rate, profile) for profile in profiles} if rate else None
+    results = send_to_profiles(action, text, profiles, rate_limiters)
+
+    for result in results:
+        prefix = f"[{result.profile}]"
+        timing_note = f"({result.elapsed:.2f}s)"
+        if result.ok:
+            click.echo(f"{prefix} {result.response} {timing_note}")
+        elif isinstance(result.error, CredentialsNotFoundError):
+            click.echo(f"{prefix} Error: Not authenticated. {timing_note}", err=True)
+        elif verbose:
+            click.echo(f"{prefix} Error: {result.error} {timing_note}", err=True)
+        else:
+            click.echo(f"{prefix} Error: {_failure_message(result.error, action)} {timing_note}", err=True)
+
+    if not all(result.ok for result in results):
+        sys.exit(2)
+
+
+def _run_command_interactive_mode(credentials, verbose: bool, cache=None, rate_limiter=None):
     """Run interactive command shell."""
+    from ghome.assistant import AssistantSession
+
     click.echo("Interactive mode. Type 'quit' to exit.")
 
-    while True:
-        try:
-            text = click.prompt(">", prompt_suffix=" ")
-        except (EOFError, KeyboardInterrupt):
-            click.echo("\nExiting.")
-            break
+    with CredentialsManager(credentials), AssistantSession(credentials, cache, rate_limiter) as session:
+        _run_shell(session.send, validate_command, "command", verbose)
 
-        if text.lower() in ("quit", "exit", "q"):
-            break
 
-        if not text.strip():
-            continue
+def _run_shell(send, validate, action: str, verbose: bool):
+    """Prompt for lines and send them in the background until the user quits.
+
+    Responses print as they arrive, tagged with the line's sequence number.
+    Invalid lines are reported at once and never queued. On exit, pending
+    sends are drained; Ctrl-C while draining cancels those not yet started.
+    """
+
+    def report(result: SendResult):
+        prefix = f"[{result.seq}]"
+        if result.cancelled:
+            click.echo(f"{prefix} Cancelled.", err=True)
+        elif result.error is None:
+            click.echo(f"{prefix} {result.response}")
+        elif verbose or isinstance(result.error, (BroadcastError, CommandError)):
+            click.echo(f"{prefix} Error: {result.error}", err=True)
+        else:
+            click.echo(f"{prefix} Error: {_failure_message(result.error, action)}", err=True)
+
+    sends = SendQueue(send, report)
+    cancel = False
+    try:
+        while True:
+            try:
+                text = click.prompt(">", prompt_suffix=" ")
+            except (EOFError, KeyboardInterrupt, click.Abort):
+                # click.prompt turns both EOF and Ctrl-C into Abort.
+                click.echo("\nExiting.")
+                break
+
+            if text.lower() in ("quit", "exit", "q"):
+                break
+
+            if not text.strip():
+                continue
+
+            try:
+                validate(text)
+            except (BroadcastError, CommandError) as e:
+                click.echo(f"Error: {e}", err=True)
+                continue
+
+            if sends.full():
+                click.echo(f"Waiting for the Assistant: {sends.pending} messages pending.", err=True)
+            try:
+                sends.submit(text)
+            except KeyboardInterrupt:
+                click.echo("\nExiting.")
+                cancel = True
+                break
+
+        if not cancel and sends.pending:
+            click.echo(f"Waiting for {sends.pending} pending messages. Press Ctrl-C to cancel them.", err=True)
+            try:
+                sends.drain()
+            except KeyboardInterrupt:
+                cancel = True
+    finally:
+        sends.close(cancel=cancel)
+
+
+@main.command()
+@profile_option
+@rate_option
+def daemon(rate: float | None):
+    """Keep a warm session open and serve broadcast/command requests."""
+    credentials = _load_credentials_or_exit()
+
+    click.echo(f"Starting daemon on {get_socket_path()}")
+    try:
+        run_daemon(
+            credentials,
+            rate_limiter=_rate_limiter(rate),
+            notify=lambda message: click.echo(message, err=True),
+        )
+    except OSError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+
+@main.group()
+def outbox():
+    """Inspect and send broadcasts queued with --queue."""
+    pass
+
+
+@outbox.command("status")
+@profile_option
+@click.option("--status", "status_filter", type=click.Choice(STATUSES), help="Only list items in this state")
+@click.option("-n", "--limit", type=click.IntRange(min=0), default=10, show_default=True, help="Items to list")
+def outbox_status(status_filter: str | None, limit: int):
+    """Show queued, sent and failed broadcasts."""
+    queue = Outbox(get_outbox_path())
+    counts = queue.counts()
+    click.echo(", ".join(f"{counts[status]} {status}" for status in STATUSES))
+
+    for item in queue.items(status_filter, limit):
+        line = f"#{item.id} {item.status} ({item.attempts} attempts): {item.text}"
+        if item.last_error and item.status != "sent":
+            line += f" [{item.last_error}]"
+        click.echo(line)
+
+
+@outbox.command("drain")
+@profile_option
+@click.option("--batch-size", type=click.IntRange(min=1), default=20, show_default=True, help="Items claimed at a time")
+@click.option(
+    "--max-attempts",
+    type=click.IntRange(min=1),
+    default=5,
+    show_default=True,
+    help="Attempts before an item is marked failed",
+)
+@rate_option
+def outbox_drain(batch_size: int, max_attempts: int, rate: float | None):
+    """Send queued broadcasts that are due, over one session."""
+    queue = Outbox(get_outbox_path())
+    counts = queue.counts()
+    if not counts["pending"] and not counts["sending"]:
+        click.echo("Outbox is empty.")
+        return
+
+    credentials = _load_credentials_or_exit()
+    from ghome.assistant import AssistantSession
+
+    with AssistantSession(credentials, rate_limiter=_rate_limiter(rate)) as session:
+        result = drain(queue, session_sender(session), batch_size, max_attempts)
+
+    click.echo(f"Sent {result.sent}, will retry {result.retried}, failed {result.failed}.")
+    if result.failed:
+        sys.exit(2)
+
+
+@main.group()
+def schedule():
+    """Run broadcasts and commands at set times."""
+    pass
+
+
+def _schedule_store() -> ScheduleStore:
+    return ScheduleStore(get_schedule_path(), get_schedule_lock_path())
+
+
+def _format_time(timestamp: float | None) -> str:
+    if timestamp is None:
+        return "never"
+    return f"{datetime.fromtimestamp(timestamp):%Y-%m-%d %H:%M}"
+
+
+@schedule.command("add")
+@profile_option
+@click.argument("text")
+@click.option("--at", "at_text", metavar="TIME", help="Run once, at HH:MM or YYYY-MM-DD HH:MM")
+@click.option("--cron", metavar="EXPR", help='Run on a cron schedule, e.g. "55 9 * * 1-5"')
+@click.option("--command", "as_command", is_flag=True, help="Send TEXT as a command rather than a broadcast")
+def schedule_add(text: str, at_text: str | None, cron: str | None, as_command: bool):
+    """Schedule a broadcast or command."""
+    if (at_text is None) == (cron is None):
+        click.echo("Error: Give exactly one of --at or --cron.", err=True)
+        sys.exit(2)
+
+    try:
+        at = parse_time(at_text) if at_text is not None else None
+        job = _schedule_store().add(text, "command" if as_command else "broadcast", cron=cron, at=at)
+    except (ScheduleError, BroadcastError, CommandError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(2)
+
+    click.echo(f"Scheduled #{job.id}, next run {_format_time(job.next_run(time.time()))}.")
+
+
+@schedule.command("list")
+@profile_option
+def schedule_list():
+    """List scheduled jobs, soonest first."""
+    try:
+        jobs = _schedule_store().jobs()
+    except ScheduleError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    if not jobs:
+        click.echo("No jobs scheduled.")
+        return
+
+    now = time.time()
+    upcoming = sorted(((job.next_run(now), job) for job in jobs), key=lambda pair: pair[0] or float("inf"))
+    for next_run, job in upcoming:
+        click.echo(f"#{job.id} {job.action} {job.describe()}, next {_format_time(next_run)}: {job.text}")
+
+
+@schedule.command("remove")
+@profile_option
+@click.argument("job_id", type=int)
+def schedule_remove(job_id: int):
+    """Remove a scheduled job."""
+    try:
+        removed = _schedule_store().remove(job_id)
+    except ScheduleError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    if not removed:
+        click.echo(f"Error: No job #{job_id}.", err=True)
+        sys.exit(1)
+    click.echo(f"Removed #{job_id}.")
 
+
+@schedule.command("run")
+@profile_option
+@click.option(
+    "--warm-up",
+    type=click.FloatRange(min=0),
+    default=WARM_UP_LEAD,
+    show_default=True,
+    help="Seconds before each job to connect to the Assistant",
+)
+@rate_option
+@click.option("-v", "--verbose", is_flag=True, help="Show debug output")
+def schedule_run(warm_up: float, rate: float | None, verbose: bool):
+    """Run scheduled jobs in the foreground until interrupted.
+
+    A running 'ghome daemon' already runs the schedule.
+    """
+    credentials = _load_credentials_or_exit()
+    from ghome.assistant import AssistantSession
+
+    def report(firing: Firing):
+        prefix = f"#{firing.job.id}"
+        if firing.missed:
+            click.echo(f"{prefix} Missed: was due {_format_time(firing.due)}.", err=True)
+        elif firing.error is None:
+            click.echo(f"{prefix} {firing.response} (+{firing.lateness * 1000:.0f}ms)")
+        elif verbose or isinstance(firing.error, (BroadcastError, CommandError)):
+            click.echo(f"{prefix} Error: {firing.error}", err=True)
+        else:
+            click.echo(f"{prefix} Error: {_failure_message(firing.error, firing.job.action)}", err=True)
+
+    with CredentialsManager(credentials), AssistantSession(credentials, rate_limiter=_rate_limiter(rate)) as session:
+        scheduler = Scheduler(
+            _schedule_store(),
+            session_sender(session),
+            get_scheduler_lock_path(),
+            warm_up=session.warm_up,
+            report=report,
+            warm_up_lead=warm_up,
+        )
         try:
-            response = send_command(text, credentials)
-            click.echo(response)
-        except CommandError as e:
+            scheduler.start()
+        except OSError as e:
             click.echo(f"Error: {e}", err=True)
-        except Exception as e:
-            if verbose:
-                click.echo(f"Error: {e}", err=True)
-            else:
-                click.echo("Error: Failed to send. Use --verbose for details.", err=True)
+            sys.exit(1)
+
+        click.echo("Running schedule. Press Ctrl-C to stop.")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            scheduler.stop()
+
+
+@main.command("run")
+@profile_option
+@click.argument("routine_name", metavar="ROUTINE")
+@click.option(
+    "--max-parallel",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Most steps, and sessions, in flight at once",
+)
+@rate_option
+@click.option("-v", "--verbose", is_flag=True, help="Show debug output")
+def run_routine_command(routine_name: str, max_parallel: int, rate: float | None, verbose: bool):
+    """Run a routine file, sending independent steps concurrently.
+
+    ROUTINE is a TOML or YAML file, or the name of one in the profile's
+    routines directory.
+    """
+    try:
+        routine = load_routine(find_routine(routine_name, get_routines_dir()))
+    except RoutineError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(2)
+
+    credentials = _load_credentials_or_exit()
+    from ghome.assistant import AssistantPool
+
+    pool = AssistantPool(
+        credentials,
+        min_size=0,
+        max_size=min(max_parallel, len(routine.steps)),
+        rate_limiter=_rate_limiter(rate),
+    )
+    try:
+        report = run_routine(routine, pool_step_runner(pool), max_parallel)
+    finally:
+        pool.close()
+
+    _print_run_report(report, verbose)
+    if not report.ok:
+        sys.exit(2)
+
+
+def _print_run_report(report: RunReport, verbose: bool):
+    """Print each step's timing and outcome, then the critical path."""
+    width = max(len(name) for name in report.results)
+    for name, result in report.results.items():
+        label = name.ljust(width)
+        if result.blocked_by is not None:
+            click.echo(f"{label}  skipped, {result.blocked_by} failed", err=True)
+            continue
+        timing_note = f"{result.start:6.2f}s -{result.end:6.2f}s  {result.elapsed:5.2f}s"
+        if result.ok:
+            click.echo(f"{label}  {timing_note}  {result.response}")
+        elif verbose or isinstance(result.error, (BroadcastError, CommandError)):
+            click.echo(f"{label}  {timing_note}  Error: {result.error}", err=True)
+        else:
+            click.echo(f"{label}  {timing_note}  Error: {_failure_message(result.error, result.step.action)}", err=True)
+
+    total = sum(result.elapsed for result in report.results.values())
+    click.echo(f"{report.routine.name}: {report.elapsed:.2f}s ({total:.2f}s if run one after another)")
+    if report.critical_path:
+        click.echo(f"Critical path: {' -> '.join(report.critical_path)}")
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address to listen on")
+@click.option("--port", type=int, default=8080, show_default=True, help="Port to listen on")
+@click.option("--pool-size", type=click.IntRange(min=1), default=4, show_default=True, help="Most sessions to open")
+@click.option("--pool-min", type=click.IntRange(min=0), default=1, show_default=True, help="Sessions kept open when idle")
+@click.option(
+    "--max-queue",
+    type=click.IntRange(min=0),
+    default=16,
+    show_default=True,
+    help="Requests that may wait for a session before answering 429",
+)
+@profile_option
+@rate_option
+def serve(host: str, port: int, pool_size: int, pool_min: int, max_queue: int, rate: float | None):
+    """Serve broadcast/command requests over HTTP."""
+    from ghome.gateway import run_gateway
+
+    credentials = _load_credentials_or_exit()
+
+    def announce(address):
+        click.echo(f"Serving on http://{address[0]}:{address[1]}")
+
+    try:
+        run_gateway(
+            credentials,
+            host=host,
+            port=port,
+            pool_size=pool_size,
+            pool_min=pool_min,
+            max_queue=max_queue,
+            rate_limiter=_rate_limiter(rate),
+            ready=announce,
+        )
+    except OSError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+
+@main.command()
+@click.option("--sessions", type=click.IntRange(min=1), default=4, show_default=True, help="Concurrent sessions")
+@click.option("--commands", type=click.IntRange(min=1), default=25, show_default=True, help="Commands per session")
+@click.option("--text", default="what time is it", show_default=True, help="Command to send")
+@click.option("--endpoint", metavar="HOST:PORT", help="Assistant API endpoint to load")
+@click.option("--insecure", is_flag=True, help="Use a plaintext channel to --endpoint")
+@click.option("--local", is_flag=True, help="Load an in-process stand-in server instead")
+@click.option("--latency", type=float, default=0.05, show_default=True, help="Stand-in latency in seconds (--local)")
+@click.option("--error-rate", type=click.FloatRange(0, 1), default=0.0, help="Stand-in error fraction (--local)")
+def bench(
+    sessions: int,
+    commands: int,
+    text: str,
+    endpoint: str | None,
+    insecure: bool,
+    local: bool,
+    latency: float,
+    error_rate: float,
+):
+    """Measure throughput and latency over concurrent sessions."""
+    from ghome.bench import BenchError, run_bench
+
+    if local and endpoint:
+        click.echo("Error: --local and --endpoint are mutually exclusive", err=True)
+        sys.exit(2)
+
+    server = None
+    if local:
+        from ghome.standin import StandinAssistant, start_server
+
+        server, port = start_server(StandinAssistant(latency=latency, error_rate=error_rate))
+        endpoint, insecure = f"localhost:{port}", True
+
+    if endpoint and insecure:
+        import google.oauth2.credentials
+
+        credentials = google.oauth2.credentials.Credentials(token="standin")
+    else:
+        credentials = _load_credentials_or_exit()
+
+    try:
+        report = run_bench(credentials, sessions, commands, text, endpoint=endpoint, insecure=insecure)
+    except BenchError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    finally:
+        if server is not None:
+            server.stop(None)
+    click.echo(report.format())
+
+
+@main.command()
+@click.option("--port", type=int, default=50051, show_default=True, help="Port to listen on")
+@click.option("--latency", type=float, default=0.05, show_default=True, help="Seconds to wait before answering")
+@click.option("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+@click.option("--error-rate", type=click.FloatRange(0, 1), default=0.0, help="Fraction of requests to fail")
+def standin(port: int, latency: float, jitter: float, error_rate: float):
+    """Run a local stand-in for the Assistant API, for load testing."""
+    from ghome.standin import StandinAssistant, start_server
+
+    try:
+        server, port = start_server(
+            StandinAssistant(latency=latency, jitter=jitter, error_rate=error_rate), port=port
+        )
+    except RuntimeError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    click.echo(f"Stand-in listening on localhost:{port}")
+    click.echo(f"Use GHOME_ASSISTANT_ENDPOINT=localhost:{port} GHOME_ASSISTANT_INSECURE=1")
+    try:
+        server.wait_for_termination()
+    except KeyboardInterrupt:
+        server.stop(None)
+
+
+@main.group()
+def debug():
+    """Diagnose performance problems."""
+    pass
+
+
+@debug.command("startup")
+@profile_option
+@click.option(
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help="Runs per measurement; the fastest is reported",
+)
+@click.option(
+    "--request",
+    "request_text",
+    default="what time is it",
+    show_default=True,
+    help="Command sent to time the first request",
+)
+@click.option("--no-request", is_flag=True, help="Only measure imports")
+def debug_startup(repeat: int, request_text: str, no_request: bool):
+    """Report import times and the time to a first request.
+
+    Each figure comes from a fresh Python process, so it matches what a
+    one-shot 'ghome command' pays.
+    """
+    from ghome.diagnostics import STARTUP_MODULES, measure_first_request, measure_import, measure_interpreter
+
+    width = max(len(module) for module in STARTUP_MODULES)
+    click.echo(f"{'python startup':<{width}}  {measure_interpreter(repeat) * 1000:8.1f} ms")
+    click.echo("Imports, each in a fresh process with its dependencies:")
+    for module in STARTUP_MODULES:
+        seconds = measure_import(module, repeat)
+        timing_note = "not installed" if seconds is None else f"{seconds * 1000:8.1f} ms"
+        click.echo(f"{module:<{width}}  {timing_note}")
+
+    if no_request:
+        return
+
+    result = measure_first_request(request_text, {PROFILE_ENV: get_active_profile()})
+    click.echo(f"Time to first request ({request_text!r}): {result.total * 1000:.1f} ms")
+    for name, seconds in result.stages:
+        click.echo(f"  {name:<{width}}{seconds * 1000:8.1f} ms")
+    if not result.ok:
+        click.echo(f"Request failed: {result.output}", err=True)
+        sys.exit(2)
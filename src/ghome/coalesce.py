@@ -0,0 +1,182 @@
+"""Broadcast de-duplication and merging.
+
+BroadcastCoalescer collapses identical broadcasts sent within a window into
+one, across processes when given a state file. BroadcastMerger packs
+distinct broadcasts queued close together into fewer, longer ones.
+"""
+
+import json
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from ghome.storage import file_lock, write_private_json
+
+
+def _message_key(message: str) -> str:
+    """Return the key under which identical messages collide."""
+    return " ".join(message.lower().split())
+
+
+class BroadcastCoalescer:
+    """Skip broadcasts identical to one sent within the last `window` seconds."""
+
+    def __init__(self, window: float, state_path: Path | None = None):
+        self.window = window
+        self.state_path = state_path
+        self._sent: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def claim(self, message: str) -> Iterator[bool]:
+        """Claim a message for sending, yielding False if it is a duplicate.
+
+        If the block raises, the claim is released so that a failed send
+        doesn't suppress the retry.
+        """
+        key = _message_key(message)
+        sent_at = time.time()
+        fresh = self._update(lambda sent: _claim(sent, key, sent_at, self.window))
+        try:
+            yield fresh
+        except BaseException:
+            if fresh:
+                self._update(lambda sent: _release(sent, key, sent_at))
+            raise
+
+    def _update(self, change) -> Any:
+        """Apply change to the record of sent messages and return its result."""
+        with self._lock:
+            if self.state_path is None:
+                return change(self._sent)
+
+            with file_lock(self.state_path.with_suffix(".lock")):
+                sent = self._read_state()
+                result = change(sent)
+                write_private_json(self.state_path, sent)
+                return result
+
+    def _read_state(self) -> dict[str, float]:
+        """Return the shared record of sent messages, or none if unreadable."""
+        try:
+            with open(self.state_path, "r") as f:
+                sent = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if not isinstance(sent, dict):
+            return {}  # Valid JSON but not ours; treat it as corrupt
+        return {key: at for key, at in sent.items() if isinstance(at, (int, float))}
+
+
+def _claim(sent: dict[str, float], key: str, now: float, window: float) -> bool:
+    """Record key as sent at now unless it was sent within the window."""
+    for stale in [k for k, at in sent.items() if now - at >= window]:
+        del sent[stale]
+    if key in sent:
+        return False
+    sent[key] = now
+    return True
+
+
+def _release(sent: dict[str, float], key: str, sent_at: float) -> None:
+    """Forget a claim, unless another send has claimed the key since."""
+    if sent.get(key) == sent_at:
+        del sent[key]
+
+
+def _join(first: str, second: str) -> str:
+    """Join two messages into one sentence sequence."""
+    if not first.endswith((".", "!", "?")):
+        first += "."
+    return f"{first} {second}"
+
+
+class BroadcastMerger:
+    """Merge messages queued within `window` seconds of each other.
+
+    Each message is added with a tag (for example its input line number);
+    merged messages come back paired with the tag of their first message.
+    A merged message never exceeds max_length characters, and a message
+    identical to one already pending is dropped.
+    """
+
+    def __init__(self, window: float, max_length: int):
+        self.window = window
+        self.max_length = max_length
+        self._tag: Any = None
+        self._text: str | None = None
+        self._keys: set[str] = set()
+        self._started = 0.0
+
+    def add(self, message: str, tag: Any = None) -> list[tuple[Any, str]]:
+        """Queue a message and return any merged messages that are ready."""
+        message = message.strip()
+        now = time.monotonic()
+        ready = []
+
+        if self._text is not None and now - self._started < self.window:
+            if _message_key(message) in self._keys:
+                return ready
+            merged = _join(self._text, message)
+            if len(merged) <= self.max_length:
+                self._text = merged
+                self._keys.add(_message_key(message))
+                return ready
+
+        ready = self.flush()
+        self._tag, self._text, self._started = tag, message, now
+        self._keys = {_message_key(message)}
+        return ready
+
+    def expires_in(self) -> float | None:
+        """Return the seconds until the pending message's window closes, or None."""
+        if self._text is None:
+            return None
+        return max(0.0, self.window - (time.monotonic() - self._started))
+
+    def flush(self) -> list[tuple[Any, str]]:
+        """Return the pending merged message, if any, and clear it."""
+        if self._text is None:
+            return []
+        ready = [(self._tag, self._text)]
+        self._tag, self._text = None, None
+        return ready
+
+
+_END = object()
+
+
+def merge_stream(items: Iterable[tuple[Any, str]], merger: BroadcastMerger) -> Iterator[tuple[Any, str]]:
+    """Merge (tag, message) pairs, yielding each merged message with its first tag.
+
+    items are read on a background thread, so a pending message is yielded
+    as soon as its window closes, even while the next item is slow to
+    arrive, as with a stream of alerts piped to stdin.
+    """
+    pending: queue.Queue = queue.Queue()
+
+    def read():
+        try:
+            for item in items:
+                pending.put(item)
+        except Exception as e:
+            pending.put(e)
+        pending.put(_END)
+
+    threading.Thread(target=read, name="ghome-merge-reader", daemon=True).start()
+    while True:
+        try:
+            item = pending.get(timeout=merger.expires_in())
+        except queue.Empty:
+            yield from merger.flush()
+            continue
+        if item is _END:
+            break
+        if isinstance(item, Exception):
+            raise item
+        tag, message = item
+        yield from merger.add(message, tag)
+    yield from merger.flush()
@@ -1,18 +1,137 @@
-"""Configuration and path management."""
+"""Configuration and path management.
 
+Each account is a profile with its own directory for credentials and
+per-account state. The default profile lives directly in the config
+directory, as before profiles existed; named profiles live under
+``profiles/NAME``. Paths are for the active profile unless one is given.
+"""
+
+import os
+import re
 from pathlib import Path
 
+PROFILE_ENV = "GHOME_PROFILE"
+DEFAULT_PROFILE = "default"
+
+_PROFILE_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+_active_profile: str | None = None
+
+
+class InvalidProfileError(ValueError):
+    """Raised when a profile name can't be used as a directory name."""
+    pass
+
 
 def get_config_dir() -> Path:
     """Return the config directory path."""
     return Path.home() / ".config" / "ghome"
 
 
-def get_client_secret_path() -> Path:
+def set_active_profile(name: str | None) -> None:
+    """Select the profile paths default to, or None for GHOME_PROFILE / default."""
+    global _active_profile
+    if name is not None:
+        validate_profile_name(name)
+    _active_profile = name
+
+
+def get_active_profile() -> str:
+    """Return the name of the profile paths default to."""
+    return _active_profile or os.environ.get(PROFILE_ENV) or DEFAULT_PROFILE
+
+
+def validate_profile_name(name: str) -> str:
+    """Return name if it is a valid profile name, else raise InvalidProfileError."""
+    if not _PROFILE_NAME.match(name):
+        raise InvalidProfileError(
+            f"Invalid profile name {name!r}: use letters, digits, '.', '-' and '_'"
+        )
+    return name
+
+
+def get_profile_dir(profile: str | None = None) -> Path:
+    """Return the directory holding a profile's files."""
+    profile = validate_profile_name(profile or get_active_profile())
+    if profile == DEFAULT_PROFILE:
+        return get_config_dir()
+    return get_config_dir() / "profiles" / profile
+
+
+def list_profiles() -> list[str]:
+    """Return the profiles that have a client secret or credentials, default first."""
+    profiles = []
+    if _has_account_files(get_config_dir()):
+        profiles.append(DEFAULT_PROFILE)
+    profiles_dir = get_config_dir() / "profiles"
+    if profiles_dir.is_dir():
+        profiles += sorted(
+            path.name
+            for path in profiles_dir.iterdir()
+            if _PROFILE_NAME.match(path.name) and _has_account_files(path)
+        )
+    return profiles
+
+
+def _has_account_files(directory: Path) -> bool:
+    return (directory / "credentials.json").exists() or (directory / "client_secret.json").exists()
+
+
+def get_client_secret_path(profile: str | None = None) -> Path:
     """Return the path to client_secret.json."""
-    return get_config_dir() / "client_secret.json"
+    return get_profile_dir(profile) / "client_secret.json"
 
 
-def get_credentials_path() -> Path:
+def get_credentials_path(profile: str | None = None) -> Path:
     """Return the path to credentials.json."""
-    return get_config_dir() / "credentials.json"
+    return get_profile_dir(profile) / "credentials.json"
+
+
+def get_credentials_lock_path(profile: str | None = None) -> Path:
+    """Return the path to the lock file guarding credentials.json."""
+    return get_profile_dir(profile) / "credentials.lock"
+
+
+def get_socket_path(profile: str | None = None) -> Path:
+    """Return the path to the daemon's Unix socket."""
+    return get_profile_dir(profile) / "daemon.sock"
+
+
+def get_cache_path(profile: str | None = None) -> Path:
+    """Return the path to the shared response cache."""
+    return get_profile_dir(profile) / "responses.json"
+
+
+def get_coalesce_state_path(profile: str | None = None) -> Path:
+    """Return the path to the record of recently sent broadcasts."""
+    return get_profile_dir(profile) / "broadcasts.json"
+
+
+def get_rate_limit_state_path(profile: str | None = None) -> Path:
+    """Return the path to the rate limiter's shared token bucket."""
+    return get_profile_dir(profile) / "ratelimit.json"
+
+
+def get_outbox_path(profile: str | None = None) -> Path:
+    """Return the path to the queue of messages waiting to be sent."""
+    return get_profile_dir(profile) / "outbox.db"
+
+
+def get_schedule_path(profile: str | None = None) -> Path:
+    """Return the path to the scheduled broadcasts and commands."""
+    return get_profile_dir(profile) / "schedule.json"
+
+
+def get_schedule_lock_path(profile: str | None = None) -> Path:
+    """Return the path to the lock file guarding schedule.json."""
+    return get_profile_dir(profile) / "schedule.lock"
+
+
+def get_scheduler_lock_path(profile: str | None = None) -> Path:
+    """Return the path to the lock held by the process running the schedule."""
+    return get_profile_dir(profile) / "scheduler.lock"
+
+
+def get_routines_dir(profile: str | None = None) -> Path:
+    """Return the directory `ghome run` looks up routines by name in."""
+    return get_profile_dir(profile) / "routines"
@@ -0,0 +1,226 @@
+"""Background daemon holding a warm assistant session, and its thin client.
+
+The daemon listens on a Unix socket in the config directory. Each request
+and each reply is one line of JSON:
+
+    {"action": "broadcast", "text": "Dinner is ready"}
+    {"ok": true, "response": "Broadcast sent"}
+    {"ok": false, "error": "validation", "message": "Message cannot be empty"}
+
+The client half of this module only uses the standard library, so
+forwarding a message never imports the Google libraries.
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Callable
+
+from ghome.auth import CredentialsManager
+from ghome.config import (
+    get_outbox_path,
+    get_schedule_lock_path,
+    get_schedule_path,
+    get_scheduler_lock_path,
+    get_socket_path,
+)
+from ghome.messages import BroadcastError, CommandError
+from ghome.outbox import DrainWorker, Outbox
+from ghome.schedule import Scheduler, ScheduleStore
+
+ACTIONS = ("broadcast", "command")
+
+# Longer than the gRPC deadline TextAssistant applies to each request.
+CLIENT_TIMEOUT = 200
+
+
+class DaemonUnavailable(Exception):
+    """Raised when no daemon is listening on the socket."""
+    pass
+
+
+class DaemonError(Exception):
+    """Raised when the daemon reports that a request failed."""
+
+    def __init__(self, kind: str, message: str):
+        super().__init__(message)
+        self.kind = kind
+
+
+def send_request(action: str, text: str, socket_path: Path | None = None) -> str:
+    """Forward one message to the daemon and return the Assistant's response."""
+    path = socket_path or get_socket_path()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CLIENT_TIMEOUT)
+
+    try:
+        sock.connect(str(path))
+    except OSError as e:
+        # A missing or stale socket, no permission, a path too long for
+        # AF_UNIX: nothing was sent, so the caller can send it directly.
+        sock.close()
+        raise DaemonUnavailable(f"No daemon listening on {path}: {e}") from e
+
+    # From here the request may already have been sent, so don't let the
+    # caller fall back and send it a second time.
+    try:
+        with sock:
+            sock.sendall(json.dumps({"action": action, "text": text}).encode() + b"\n")
+            line = sock.makefile("rb").readline()
+    except OSError as e:
+        raise DaemonError("backend", f"Lost connection to the daemon: {e}") from e
+
+    if not line:
+        raise DaemonError("backend", "Daemon closed the connection")
+
+    try:
+        reply = json.loads(line)
+        ok, error, message = reply["ok"], reply.get("error"), reply.get("message")
+        response = reply["response"] if ok else None
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise DaemonError("backend", "Malformed reply from the daemon") from e
+    if not ok:
+        raise DaemonError(error or "backend", message or "Daemon reported an error")
+    return response
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answer each JSON line on a connection until the client hangs up."""
+
+    def handle(self):
+        for line in self.rfile:
+            reply = self.server.dispatch(line)
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+            self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server that sends requests through one assistant session."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, session):
+        _remove_stale_socket(socket_path)
+        super().__init__(str(socket_path), _RequestHandler)
+        os.chmod(socket_path, 0o600)  # Owner read/write only
+        self.socket_path = socket_path
+        self.session = session
+        # TextAssistant carries conversation state, so requests take turns.
+        self._session_lock = threading.Lock()
+
+    def dispatch(self, line: bytes) -> dict:
+        """Run one request line and return the reply to send back."""
+        from ghome.assistant import QuotaExceededError
+
+        try:
+            request = json.loads(line)
+            action, text = request["action"], request["text"]
+        except (ValueError, KeyError, TypeError):
+            return {"ok": False, "error": "protocol", "message": "Malformed request"}
+
+        if action not in ACTIONS:
+            return {"ok": False, "error": "protocol", "message": f"Unknown action: {action}"}
+
+        try:
+            response = self.send(action, text)
+        except (BroadcastError, CommandError) as e:
+            return {"ok": False, "error": "validation", "message": str(e)}
+        except QuotaExceededError as e:
+            return {"ok": False, "error": "quota", "message": str(e)}
+        except Exception as e:
+            return {"ok": False, "error": "backend", "message": str(e)}
+
+        return {"ok": True, "response": response}
+
+    def send(self, action: str, text: str) -> str:
+        """Send a message through the session, waiting for its turn.
+
+        Each request starts a new conversation, since the clients sharing
+        the daemon are unrelated.
+        """
+        with self._session_lock:
+            self.session.new_conversation()
+            if action == "broadcast":
+                return self.session.broadcast(text)
+            return self.session.send(text)
+
+    def warm_up(self) -> None:
+        """Start connecting the session's channel, waiting for its turn."""
+        with self._session_lock:
+            self.session.warm_up()
+
+    def server_close(self):
+        super().server_close()
+        self.session.close()
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(socket_path: Path) -> None:
+    """Remove a socket file left behind by a daemon that is no longer running."""
+    if not socket_path.exists():
+        return
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(socket_path))
+    except ConnectionRefusedError:
+        socket_path.unlink()
+        return
+    finally:
+        probe.close()
+
+    raise OSError(f"A daemon is already listening on {socket_path}")
+
+
+def run_daemon(
+    credentials,
+    socket_path: Path | None = None,
+    rate_limiter=None,
+    outbox_path: Path | None = None,
+    notify: Callable[[str], None] | None = None,
+) -> None:
+    """Serve requests through one session until interrupted or terminated.
+
+    The access token is refreshed in the background, ahead of its expiry.
+    Queued broadcasts from the outbox and scheduled jobs are sent through
+    the same session. If another process is already running the schedule,
+    the daemon runs without it and passes a message saying so to notify.
+    """
+    from ghome.assistant import AssistantSession
+
+    socket_path = socket_path or get_socket_path()
+    socket_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    session = AssistantSession(credentials, rate_limiter=rate_limiter)
+
+    outbox = Outbox(outbox_path or get_outbox_path())
+    store = ScheduleStore(get_schedule_path(), get_schedule_lock_path())
+
+    with CredentialsManager(credentials), DaemonServer(socket_path, session) as server, \
+            DrainWorker(outbox, server.send), ExitStack() as stack:
+        try:
+            stack.enter_context(
+                Scheduler(store, server.send, get_scheduler_lock_path(), warm_up=server.warm_up)
+            )
+        except OSError as e:
+            # Most likely a foreground `ghome schedule run`; forwarding and
+            # the outbox don't depend on the scheduler.
+            if notify is not None:
+                notify(f"{e}; running without the scheduler")
+        # shutdown() blocks until serve_forever() returns, so it must be
+        # called from another thread than the one serving.
+        signal.signal(
+            signal.SIGTERM,
+            lambda signum, frame: threading.Thread(target=server.shutdown).start(),
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
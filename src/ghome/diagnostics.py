@@ -0,0 +1,105 @@
+"""Startup measurements for `ghome debug startup`.
+
+Every measurement runs in a fresh interpreter, so modules this process has
+already imported don't hide their cost. The first request is timed by
+running `ghome command --no-daemon` with GHOME_TIMINGS_FILE set, which also
+breaks the time down into the stages the CLI records.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from ghome.timing import TIMINGS_FILE_ENV
+
+# Modules a message-sending command imports, cheapest dependencies first.
+STARTUP_MODULES = (
+    "click",
+    "google.protobuf",
+    "grpc",
+    "google.oauth2.credentials",
+    "google_auth_oauthlib",
+    "gassist_text",
+    "ghome.cli",
+    "ghome.assistant",
+)
+
+_IMPORT_SCRIPT = (
+    "import sys, time\n"
+    "started = time.perf_counter()\n"
+    "__import__(sys.argv[1])\n"
+    "print(time.perf_counter() - started)\n"
+)
+
+_CLI_SCRIPT = "import sys\nfrom ghome.cli import main\nmain(sys.argv[1:])\n"
+
+
+@dataclass
+class FirstRequest:
+    """How long a fresh `ghome command` took, from process start to exit."""
+
+    total: float
+    ok: bool
+    output: str
+    stages: list[tuple[str, float]] = field(default_factory=list)
+
+
+def measure_interpreter(repeat: int = 3) -> float:
+    """Return the fastest of `repeat` runs of an interpreter that does nothing."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        samples.append(time.perf_counter() - started)
+    return min(samples)
+
+
+def measure_import(module: str, repeat: int = 3) -> float | None:
+    """Return the fastest of `repeat` imports of module, with its dependencies.
+
+    Returns None if the module can't be imported.
+    """
+    samples = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", _IMPORT_SCRIPT, module],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            return None
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return min(samples)
+
+
+def measure_first_request(text: str, env: dict[str, str] | None = None) -> FirstRequest:
+    """Run `ghome command TEXT` in a fresh process and time it.
+
+    The command bypasses any running daemon, so this measures a cold
+    start. env is added to this process's environment, for example to select a
+    profile.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        timings_path = Path(tmp) / "timings.jsonl"
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", _CLI_SCRIPT, "command", "--no-daemon", text],
+            capture_output=True,
+            text=True,
+            env={**os.environ, **(env or {}), TIMINGS_FILE_ENV: str(timings_path)},
+        )
+        total = time.perf_counter() - started
+
+        stages = []
+        if timings_path.exists():
+            for line in timings_path.read_text().splitlines():
+                entry = json.loads(line)
+                stages.append((entry["stage"], entry["seconds"]))
+
+    output = (result.stdout if result.returncode == 0 else result.stderr).strip()
+    return FirstRequest(total, result.returncode == 0, output, stages)
@@ -0,0 +1,246 @@
+"""HTTP gateway sending broadcasts and commands through warm sessions.
+
+Endpoints:
+
+    POST /broadcast  {"text": "Dinner is ready"}
+    POST /command    {"text": "what time is it"}
+    GET  /healthz
+    GET  /metrics    (Prometheus text format)
+
+Replies use the daemon's JSON shapes, with an HTTP status to match:
+
+    200 {"ok": true, "response": "Broadcast sent"}
+    400 {"ok": false, "error": "validation", "message": "Message cannot be empty"}
+    429 {"ok": false, "error": "busy", "message": "Too many requests queued"}
+
+Each request checks a session out of an AssistantPool. At most `max_queue`
+requests wait for a session; beyond that the gateway answers 429 at once
+rather than letting latency grow without bound.
+"""
+
+import json
+import signal
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ghome.auth import CredentialsManager
+from ghome.messages import BroadcastError, CommandError
+
+ACTIONS = {"/broadcast": "broadcast", "/command": "command"}
+
+# Largest request body accepted, far above MAX_MESSAGE_LENGTH plus JSON.
+MAX_BODY = 16 * 1024
+
+# Seconds an idle keep-alive connection is held open.
+KEEPALIVE_TIMEOUT = 5
+
+# Seconds a 429 asks the client to wait before retrying.
+RETRY_AFTER = 1
+
+
+class _GatewayHandler(BaseHTTPRequestHandler):
+    """Route requests to the gateway; HTTP/1.1 keeps connections alive."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "ghome"
+    timeout = KEEPALIVE_TIMEOUT
+
+    def do_GET(self):
+        if self.path == "/healthz":
+            self._reply(200, {"ok": True})
+        elif self.path == "/metrics":
+            self._reply_text(200, self.server.metrics_text())
+        else:
+            self._reply(404, {"ok": False, "error": "protocol", "message": "Not found"})
+
+    def do_POST(self):
+        action = ACTIONS.get(self.path)
+        body = self._read_body()
+        if action is None:
+            self._reply(404, {"ok": False, "error": "protocol", "message": "Not found"})
+            return
+        if body is None:
+            return
+
+        started = time.monotonic()
+        status, reply = self.server.dispatch(action, body)
+        self.server.record(action, status, time.monotonic() - started)
+        headers = {"Retry-After": str(RETRY_AFTER)} if status == 429 else {}
+        self._reply(status, reply, headers)
+
+    def _read_body(self) -> bytes | None:
+        """Read the request body, replying with an error if it is unacceptable."""
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_BODY:
+            self.close_connection = True
+            self._reply(413, {"ok": False, "error": "protocol", "message": "Request body too large"})
+            return None
+        return self.rfile.read(length)
+
+    def _reply(self, status: int, reply: dict, headers: dict | None = None) -> None:
+        self._send(status, json.dumps(reply).encode(), "application/json", headers)
+
+    def _reply_text(self, status: int, text: str) -> None:
+        self._send(status, text.encode(), "text/plain; version=0.0.4", None)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: dict | None) -> None:
+        if self.server.stopping.is_set():
+            self.close_connection = True
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GatewayServer(ThreadingHTTPServer):
+    """HTTP server handing each request a session from the pool.
+
+    Handler threads are joined on close, so shutting down lets in-flight
+    requests finish before the sessions are closed.
+    """
+
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(self, address: tuple[str, int], pool, max_queue: int = 16):
+        super().__init__(address, _GatewayHandler)
+        self.pool = pool
+        self.stopping = threading.Event()
+        # Requests being sent plus those waiting for a session.
+        self._admission = threading.BoundedSemaphore(pool.max_size + max_queue)
+        self._metrics_lock = threading.Lock()
+        self._requests = Counter()
+        self._durations = Counter()
+        self._rejected = 0
+
+    def dispatch(self, action: str, body: bytes) -> tuple[int, dict]:
+        """Run one request body and return the HTTP status and reply."""
+        from ghome.assistant import QuotaExceededError
+        from ghome.retry import CircuitOpenError
+
+        try:
+            text = json.loads(body)["text"]
+        except (ValueError, KeyError, TypeError):
+            return 400, {"ok": False, "error": "protocol", "message": "Expected a JSON body with \"text\""}
+        if not isinstance(text, str):
+            return 400, {"ok": False, "error": "protocol", "message": "\"text\" must be a string"}
+
+        if not self._admission.acquire(blocking=False):
+            with self._metrics_lock:
+                self._rejected += 1
+            return 429, {"ok": False, "error": "busy", "message": "Too many requests queued"}
+
+        try:
+            with self.pool.session() as session:
+                session.new_conversation()  # Callers are unrelated
+                if action == "broadcast":
+                    response = session.broadcast(text)
+                else:
+                    response = session.send(text)
+        except (BroadcastError, CommandError) as e:
+            return 400, {"ok": False, "error": "validation", "message": str(e)}
+        except QuotaExceededError as e:
+            return 429, {"ok": False, "error": "quota", "message": str(e)}
+        except CircuitOpenError as e:
+            return 503, {"ok": False, "error": "backend", "message": str(e)}
+        except Exception as e:
+            return 502, {"ok": False, "error": "backend", "message": str(e)}
+        finally:
+            self._admission.release()
+
+        return 200, {"ok": True, "response": response}
+
+    def record(self, action: str, status: int, seconds: float) -> None:
+        with self._metrics_lock:
+            self._requests[action, status] += 1
+            self._durations[action] += seconds
+
+    def metrics_text(self) -> str:
+        """Render request counts, latency totals and pool usage for Prometheus."""
+        with self._metrics_lock:
+            requests = sorted(self._requests.items())
+            durations = sorted(self._durations.items())
+            rejected = self._rejected
+        pool = self.pool.stats()
+
+        lines = ["# TYPE ghome_requests_total counter"]
+        for (action, status), count in requests:
+            lines.append(f'ghome_requests_total{{action="{action}",status="{status}"}} {count}')
+        lines.append("# TYPE ghome_request_seconds_total counter")
+        for action, seconds in durations:
+            lines.append(f'ghome_request_seconds_total{{action="{action}"}} {seconds:.6f}')
+        lines += [
+            "# TYPE ghome_rejected_total counter",
+            f"ghome_rejected_total {rejected}",
+            "# TYPE ghome_pool_sessions gauge",
+            f"ghome_pool_sessions {pool['size']}",
+            "# TYPE ghome_pool_in_use gauge",
+            f"ghome_pool_in_use {pool['in_use']}",
+            "# TYPE ghome_pool_wait_seconds_total counter",
+            f"ghome_pool_wait_seconds_total {pool['wait_time']:.6f}",
+            "# TYPE ghome_pool_evictions_total counter",
+        ]
+        for reason in ("idle", "lifetime", "dead"):
+            lines.append(f'ghome_pool_evictions_total{{reason="{reason}"}} {pool["evicted_" + reason]}')
+        return "\n".join(lines) + "\n"
+
+    def shutdown(self):
+        self.stopping.set()
+        super().shutdown()
+
+    def server_close(self):
+        super().server_close()
+        self.pool.close()
+
+
+def run_gateway(
+    credentials,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    pool_size: int = 4,
+    pool_min: int = 1,
+    max_queue: int = 16,
+    rate_limiter=None,
+    ready=None,
+) -> None:
+    """Serve HTTP requests until interrupted or terminated.
+
+    ready, if given, is called with the bound (host, port) once listening.
+    The access token is refreshed in the background, ahead of its expiry.
+    """
+    from ghome.assistant import AssistantPool
+    from ghome.retry import CircuitBreaker
+
+    # Sessions share a breaker so an outage trips it once for the gateway.
+    pool = AssistantPool(
+        credentials,
+        min_size=min(pool_min, pool_size),
+        max_size=pool_size,
+        rate_limiter=rate_limiter,
+        breaker=CircuitBreaker(),
+    )
+
+    with CredentialsManager(credentials), GatewayServer((host, port), pool, max_queue) as server:
+        signal.signal(
+            signal.SIGTERM,
+            lambda signum, frame: threading.Thread(target=server.shutdown).start(),
+        )
+        if ready is not None:
+            ready(server.server_address[:2])
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,44 @@
+"""Validation of broadcast messages and commands.
+
+Kept free of the Google libraries so the CLI can reject invalid input
+before importing them or doing any network work. ghome.assistant
+re-exports the exceptions and MAX_MESSAGE_LENGTH.
+"""
+
+
+class BroadcastError(Exception):
+    """Raised when broadcast fails."""
+    pass
+
+
+class CommandError(Exception):
+    """Raised when a command fails."""
+    pass
+
+
+MAX_MESSAGE_LENGTH = 200
+
+
+def broadcast_command(message: str) -> str:
+    """Validate a broadcast message and return the command that sends it."""
+    message = message.strip()
+
+    if not message:
+        raise BroadcastError("Message cannot be empty")
+
+    if len(message) > MAX_MESSAGE_LENGTH:
+        raise BroadcastError(
+            f"Message exceeds maximum length of {MAX_MESSAGE_LENGTH} characters"
+        )
+
+    return f"broadcast {message}"
+
+
+def validate_command(command: str) -> str:
+    """Validate a command and return it stripped of surrounding whitespace."""
+    command = command.strip()
+
+    if not command:
+        raise CommandError("Command cannot be empty")
+
+    return command
@@ -0,0 +1,314 @@
+"""Durable outbox for fire-and-forget broadcasts.
+
+`ghome broadcast --queue` appends the message to a SQLite database in
+WAL mode and returns; a drain, run by the daemon or `ghome outbox drain`,
+sends queued messages later over one session. Delivery is at least once:
+an item is only marked sent after the Assistant answers, and an item
+claimed by a drain that died is claimed again once its lease runs out.
+
+Items move through these states:
+
+    pending -> sending -> sent
+                       -> pending (retry later, with backoff)
+                       -> failed  (invalid, or out of attempts)
+
+This module only uses the standard library, so queueing a message never
+imports the Google libraries.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from ghome.messages import BroadcastError, CommandError
+
+STATUSES = ("pending", "sending", "sent", "failed")
+
+# Seconds a drain may hold an item before another drain may claim it.
+CLAIM_LEASE = 300.0
+
+# Sent items are kept this many seconds for inspection, then deleted.
+SENT_RETENTION = 24 * 3600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    action TEXT NOT NULL,
+    text TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    claimed_at REAL,
+    sent_at REAL,
+    response TEXT,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+@dataclass
+class OutboxItem:
+    """One queued message."""
+
+    id: int
+    action: str
+    text: str
+    status: str
+    attempts: int
+    created_at: float
+    last_error: str | None = None
+
+
+@dataclass
+class DrainResult:
+    """What one drain did."""
+
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+class Outbox:
+    """Queue of messages stored in a SQLite database."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        # Autocommit mode; transactions are opened explicitly where needed.
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        self.path.chmod(0o600)  # Owner read/write only
+        return conn
+
+    def enqueue(self, text: str, action: str = "broadcast") -> int:
+        """Append a message and return its id once it is on disk."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "INSERT INTO outbox (action, text, created_at, next_attempt_at) VALUES (?, ?, ?, ?)",
+                (action, text, now, now),
+            )
+            return cursor.lastrowid
+
+    def claim(self, limit: int, lease: float = CLAIM_LEASE) -> list[OutboxItem]:
+        """Mark up to `limit` due items as sending and return them, oldest first.
+
+        Items left sending by a drain whose lease ran out are due again.
+        """
+        if not self.path.exists():
+            return []
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT * FROM outbox"
+                    " WHERE (status = 'pending' AND next_attempt_at <= ?)"
+                    " OR (status = 'sending' AND claimed_at <= ?)"
+                    " ORDER BY id LIMIT ?",
+                    (now, now - lease, limit),
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE outbox SET status = 'sending', claimed_at = ?, attempts = attempts + 1"
+                    " WHERE id = ?",
+                    [(now, row["id"]) for row in rows],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return [
+            OutboxItem(
+                row["id"], row["action"], row["text"], "sending",
+                row["attempts"] + 1, row["created_at"], row["last_error"],
+            )
+            for row in rows
+        ]
+
+    def mark_sent(self, item_id: int, response: str) -> None:
+        """Record that an item was delivered."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE outbox SET status = 'sent', sent_at = ?, response = ?, last_error = NULL"
+                " WHERE id = ?",
+                (time.time(), response, item_id),
+            )
+
+    def mark_failed(self, item_id: int, error: str, retry_at: float | None = None) -> None:
+        """Record a failed attempt; retry at retry_at, or give up if None."""
+        with closing(self._connect()) as conn:
+            if retry_at is None:
+                conn.execute(
+                    "UPDATE outbox SET status = 'failed', last_error = ? WHERE id = ?",
+                    (error, item_id),
+                )
+            else:
+                conn.execute(
+                    "UPDATE outbox SET status = 'pending', next_attempt_at = ?, last_error = ?"
+                    " WHERE id = ?",
+                    (retry_at, error, item_id),
+                )
+
+    def release(self, item_ids: list[int]) -> None:
+        """Return claimed items to the queue without counting the attempt."""
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                "UPDATE outbox SET status = 'pending', attempts = attempts - 1"
+                " WHERE id = ? AND status = 'sending'",
+                [(item_id,) for item_id in item_ids],
+            )
+
+    def prune(self, retention: float = SENT_RETENTION) -> int:
+        """Delete items sent more than `retention` seconds ago; return how many."""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "DELETE FROM outbox WHERE status = 'sent' AND sent_at < ?",
+                (time.time() - retention,),
+            )
+            return cursor.rowcount
+
+    def counts(self) -> dict[str, int]:
+        """Return the number of items in each status."""
+        counts = dict.fromkeys(STATUSES, 0)
+        if not self.path.exists():
+            return counts
+        with closing(self._connect()) as conn:
+            for row in conn.execute("SELECT status, COUNT(*) AS n FROM outbox GROUP BY status"):
+                counts[row["status"]] = row["n"]
+        return counts
+
+    def items(self, status: str | None = None, limit: int = 20) -> list[OutboxItem]:
+        """Return the most recent items, optionally only those in one status."""
+        if not self.path.exists():
+            return []
+        query = "SELECT * FROM outbox"
+        params: tuple = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY id DESC LIMIT ?"
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params + (limit,)).fetchall()
+        return [
+            OutboxItem(
+                row["id"], row["action"], row["text"], row["status"],
+                row["attempts"], row["created_at"], row["last_error"],
+            )
+            for row in rows
+        ]
+
+
+def retry_delay(attempts: int, initial: float = 5.0, maximum: float = 600.0) -> float:
+    """Return the seconds to wait before retrying an item after `attempts` failures."""
+    return min(maximum, initial * 2 ** (attempts - 1))
+
+
+def drain(
+    outbox: Outbox,
+    send: Callable[[str, str], str],
+    batch_size: int = 20,
+    max_attempts: int = 5,
+    stop: threading.Event | None = None,
+) -> DrainResult:
+    """Send due items until none are left, `batch_size` claimed at a time.
+
+    send(action, text) delivers one item and returns the response. Invalid
+    messages fail at once; other errors are retried with backoff by later
+    drains until an item has had max_attempts attempts. Setting `stop`
+    ends the drain after the current item and returns the rest of the
+    batch to the queue.
+    """
+    result = DrainResult()
+    while stop is None or not stop.is_set():
+        items = outbox.claim(batch_size)
+        if not items:
+            break
+        for index, item in enumerate(items):
+            if stop is not None and stop.is_set():
+                outbox.release([unsent.id for unsent in items[index:]])
+                return result
+            try:
+                response = send(item.action, item.text)
+            except (BroadcastError, CommandError) as e:
+                outbox.mark_failed(item.id, str(e))
+                result.failed += 1
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                if item.attempts >= max_attempts:
+                    outbox.mark_failed(item.id, error)
+                    result.failed += 1
+                else:
+                    outbox.mark_failed(item.id, error, time.time() + retry_delay(item.attempts))
+                    result.retried += 1
+            else:
+                outbox.mark_sent(item.id, response)
+                result.sent += 1
+    outbox.prune()
+    return result
+
+
+def session_sender(session) -> Callable[[str, str], str]:
+    """Return a send(action, text) function for drain() using an AssistantSession.
+
+    Queued and scheduled messages are unrelated, so each starts a new
+    conversation.
+    """
+
+    def send(action: str, text: str) -> str:
+        session.new_conversation()
+        if action == "broadcast":
+            return session.broadcast(text)
+        return session.send(text)
+
+    return send
+
+
+class DrainWorker:
+    """Drain the outbox every `interval` seconds on a background thread."""
+
+    def __init__(self, outbox: Outbox, send: Callable[[str, str], str], interval: float = 2.0):
+        self.outbox = outbox
+        self.send = send
+        self.interval = interval
+        self.last_error: Exception | None = None
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "DrainWorker":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start the drain thread."""
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="ghome-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop after the item being sent, if any; the rest stay queued."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            thread.join()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                drain(self.outbox, self.send, stop=self._stopping)
+            except sqlite3.Error as e:
+                self.last_error = e
+            self._stopping.wait(self.interval)
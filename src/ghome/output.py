@@ -0,0 +1,90 @@
+"""Machine-readable output for broadcast and command.
+
+With --output ndjson, each request prints one JSON object on its own line
+as soon as it completes:
+
+    {"action": "command", "input": "what time is it", "line": null,
+     "ok": true, "response": "It's 9:41.", "source": "assistant",
+     "attempts": 1, "latency": 0.412, "html": null, "audio_bytes": 0,
+     "error": null, "error_type": null, "message": null}
+
+`source` is where the response came from: "assistant", "daemon", "cache",
+or "coalesced" for a broadcast skipped as a duplicate. `error` is the kind
+of failure in the daemon's terms ("validation", "quota", "backend") or
+"auth"; `error_type` is the exception's class and `message` its text.
+`line` is the input line number in batch mode. `attempts` counts requests
+including retries, and is null when the daemon sent the message.
+"""
+
+import json
+
+from ghome.auth import CredentialsNotFoundError
+from ghome.daemon import DaemonError
+from ghome.messages import BroadcastError, CommandError
+
+OUTPUT_FORMATS = ("text", "ndjson")
+
+
+def error_kind(error: Exception) -> str:
+    """Classify an error as validation, auth, quota or backend."""
+    if isinstance(error, (BroadcastError, CommandError)):
+        return "validation"
+    if isinstance(error, CredentialsNotFoundError):
+        return "auth"
+    if isinstance(error, DaemonError):
+        return error.kind
+    # Only requests through a session raise this, so the import is free.
+    from ghome.assistant import QuotaExceededError
+
+    if isinstance(error, QuotaExceededError):
+        return "quota"
+    return "backend"
+
+
+def request_record(
+    action: str,
+    text: str,
+    *,
+    reply=None,
+    response: str | None = None,
+    error: Exception | None = None,
+    source: str = "assistant",
+    attempts: int | None = 0,
+    latency: float = 0.0,
+    line: int | None = None,
+) -> dict:
+    """Describe one request's outcome for --output ndjson.
+
+    Pass the session's Reply, or just the response for requests that
+    don't produce one, or the error it failed with.
+    """
+    html = None
+    audio_bytes = None
+    if reply is not None:
+        response = reply.response
+        html = reply.html.decode("utf-8", "replace") if reply.html else None
+        audio_bytes = len(reply.audio)
+        attempts = reply.attempts
+        if reply.cached:
+            source = "cache"
+
+    return {
+        "action": action,
+        "input": text.rstrip("\r\n"),  # Batch lines keep their newline
+        "line": line,
+        "ok": error is None,
+        "response": response,
+        "source": source,
+        "attempts": attempts,
+        "latency": round(latency, 6),
+        "html": html,
+        "audio_bytes": audio_bytes,
+        "error": error_kind(error) if error is not None else None,
+        "error_type": type(error).__name__ if error is not None else None,
+        "message": str(error) if error is not None else None,
+    }
+
+
+def format_ndjson(record: dict) -> str:
+    """Return a record as one line of JSON."""
+    return json.dumps(record, ensure_ascii=False)
@@ -0,0 +1,133 @@
+"""Client-side pacing of Assistant API requests.
+
+TokenBucket caps the request rate, across processes when given a state
+file. AdaptiveConcurrency caps requests in flight and adjusts the cap with
+AIMD: it grows by one slot per window of successes and halves when the
+backend reports overload, at most once per window of requests in flight.
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+
+from ghome.storage import file_lock, write_private_json
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` requests per second with bursts of `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None, state_path: Path | None = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.state_path = state_path
+        self._tokens = self.capacity
+        # Wall-clock time, so that processes sharing the state file agree.
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available. Return seconds waited."""
+        waited = 0.0
+        while True:
+            delay = self._try_take()
+            if delay <= 0:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def _try_take(self) -> float:
+        """Take a token if one is available, else return how long to wait."""
+        with self._lock:
+            if self.state_path is None:
+                return self._take()
+
+            with file_lock(self.state_path.with_suffix(".lock")):
+                self._load()
+                delay = self._take()
+                if delay <= 0:
+                    # Only a taken token changes the shared state; a caller
+                    # about to wait refills from the same point next time.
+                    write_private_json(self.state_path, {"tokens": self._tokens, "updated": self._updated})
+                return delay
+
+    def _take(self) -> float:
+        """Refill for the time elapsed, then take a token or return the wait."""
+        now = time.time()
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _load(self) -> None:
+        """Read the bucket shared with other processes, if there is one."""
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+            self._tokens, self._updated = state["tokens"], state["updated"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on the number of requests in flight."""
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 16,
+        decrease: float = 0.5,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self._limit = float(min(max(initial, minimum), maximum))
+        self._in_flight = 0
+        self._decreases = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Return the current number of requests allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of requests currently in flight."""
+        return self._in_flight
+
+    def acquire(self) -> int:
+        """Wait for a free slot and take it.
+
+        Returns a ticket to pass back to release(), recording how many times
+        the limit had shrunk when the request started.
+        """
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+            return self._decreases
+
+    def release(self, overloaded: bool = False, ticket: int | None = None) -> None:
+        """Free a slot, shrinking the limit if the request hit overload.
+
+        Requests that fail together in one burst shrink the limit once: an
+        overload from a request whose ticket predates the latest decrease
+        was sent under the old limit and is ignored.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if overloaded:
+                if ticket is None or ticket == self._decreases:
+                    self._limit = max(float(self.minimum), self._limit * self.decrease)
+                    self._decreases += 1
+            else:
+                self._limit = min(float(self.maximum), self._limit + 1 / self._limit)
+            self._condition.notify_all()
@@ -0,0 +1,207 @@
+"""Retries with exponential backoff, and a circuit breaker.
+
+call_with_retry() retries a call on retryable errors, sleeping a randomly
+jittered, exponentially growing backoff between attempts, until the attempts
+or the overall deadline run out. A CircuitBreaker shared between calls
+opens after repeated failures and makes calls fail fast until a cooldown
+has passed, then lets a single probe call through to test the backend.
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend the circuit breaker considers down."""
+    pass
+
+
+@dataclass
+class RetryPolicy:
+    """How often and how long to retry a call."""
+
+    max_attempts: int = 3
+    initial_backoff: float = 0.25
+    max_backoff: float = 4.0
+    multiplier: float = 2.0
+    # Overall budget in seconds for all attempts and backoffs of one call.
+    deadline: float | None = 30.0
+
+    def backoff(self, attempt: int) -> float:
+        """Return the delay after the given failed attempt, with full jitter."""
+        ceiling = min(self.max_backoff, self.initial_backoff * self.multiplier ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+
+@dataclass
+class RetryStats:
+    """Counters describing the calls made through call_with_retry."""
+
+    calls: int = 0
+    attempts: int = 0
+    retries: int = 0
+    failures: int = 0
+    last_attempts: int = 0
+
+
+class CircuitBreaker:
+    """Fail fast after `failure_threshold` consecutive failures, for `cooldown` seconds."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Return the breaker's state: closed, open or half_open."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._state = self.HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go to the backend now."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            remaining = max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+            raise CircuitOpenError(
+                f"Assistant API appears to be down; failing fast for {remaining:.0f}s"
+            )
+
+    def record_success(self) -> None:
+        """Close the breaker after a call reached a working backend."""
+        with self._lock:
+            self._state = self.CLOSED
+            self._probing = False
+            self.consecutive_failures = 0
+
+    def cancel_probe(self) -> None:
+        """Let another call probe after one that ended without an outcome."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a backend failure, opening the breaker past the threshold."""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self._state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def stats(self) -> dict:
+        """Return the breaker's state and counters."""
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self.consecutive_failures,
+                "times_opened": self.times_opened,
+            }
+
+
+def call_with_retry(
+    call: Callable[[float | None], T],
+    is_retryable: Callable[[Exception], bool],
+    policy: RetryPolicy,
+    breaker: CircuitBreaker | None = None,
+    stats: RetryStats | None = None,
+    on_retry: Callable[[Exception], None] | None = None,
+    is_backend_down: Callable[[Exception], bool] | None = None,
+) -> T:
+    """Call `call` until it succeeds, retrying errors `is_retryable` accepts.
+
+    `call` receives the seconds left before the policy's deadline (or None
+    without one) so it can bound each attempt. `on_retry` runs before each
+    retry's backoff, for example to reopen a dropped connection.
+
+    Errors `is_backend_down` accepts (by default, every retryable error)
+    count as failures for the breaker; other errors, such as quota errors,
+    mean the backend answered and count as successes. If the breaker opens
+    while a call is retrying, the call gives up with its last error rather
+    than CircuitOpenError.
+    """
+    stats = stats if stats is not None else RetryStats()
+    stats.calls += 1
+    stats.last_attempts = 0
+    started = time.monotonic()
+    is_backend_down = is_backend_down or is_retryable
+    last_error = None
+
+    while True:
+        if breaker is not None:
+            try:
+                breaker.before_call()
+            except CircuitOpenError:
+                if last_error is None:
+                    raise
+                stats.failures += 1
+                raise last_error
+
+        remaining = None
+        if policy.deadline is not None:
+            remaining = policy.deadline - (time.monotonic() - started)
+
+        stats.attempts += 1
+        stats.last_attempts += 1
+
+        try:
+            result = call(remaining)
+        except Exception as e:
+            retryable = is_retryable(e)
+            if breaker is not None:
+                if is_backend_down(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+
+            delay = policy.backoff(stats.last_attempts)
+            out_of_time = (
+                policy.deadline is not None
+                and time.monotonic() - started + delay >= policy.deadline
+            )
+            if not retryable or stats.last_attempts >= policy.max_attempts or out_of_time:
+                stats.failures += 1
+                raise
+
+            stats.retries += 1
+            last_error = e
+            if on_retry is not None:
+                on_retry(e)
+            time.sleep(delay)
+            continue
+        except BaseException:
+            # An interrupted probe would otherwise leave the breaker half
+            # open with every later call refused.
+            if breaker is not None:
+                breaker.cancel_probe()
+            raise
+
+        if breaker is not None:
+            breaker.record_success()
+        return result
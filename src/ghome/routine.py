@@ -0,0 +1,310 @@
+"""Routines: named steps run as a dependency graph.
+
+A routine file lists steps, each a command or a broadcast, optionally
+naming the steps it must wait for and a timeout in seconds:
+
+    name = "movie night"
+
+    [steps.lights]
+    command = "dim the living room lights to 20 percent"
+
+    [steps.blinds]
+    command = "close the living room blinds"
+
+    [steps.announce]
+    broadcast = "Movie night is starting"
+    after = ["lights", "blinds"]
+    timeout = 10
+
+Routines are TOML, or YAML with the same structure if PyYAML is
+installed. Steps whose dependencies are done run concurrently, so a run
+takes as long as its slowest chain of steps (the critical path) rather
+than the sum of every step.
+
+This module only uses the standard library; the caller supplies the
+function that sends a step.
+"""
+
+import concurrent.futures
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Callable
+
+from ghome.messages import BroadcastError, CommandError, broadcast_command, validate_command
+
+ACTIONS = ("command", "broadcast")
+
+SUFFIXES = (".toml", ".yaml", ".yml")
+
+_STEP_KEYS = {"command", "broadcast", "after", "timeout"}
+
+
+class RoutineError(Exception):
+    """Raised when a routine file can't be read or is invalid."""
+    pass
+
+
+@dataclass(frozen=True)
+class Step:
+    """One command or broadcast in a routine."""
+
+    name: str
+    action: str
+    text: str
+    after: tuple[str, ...] = ()
+    timeout: float | None = None
+
+
+@dataclass
+class Routine:
+    """Steps in the order the file defines them."""
+
+    name: str
+    steps: dict[str, Step]
+
+
+@dataclass
+class StepResult:
+    """How one step went; start and end are seconds since the run began."""
+
+    step: Step
+    start: float | None = None
+    end: float | None = None
+    response: str | None = None
+    error: Exception | None = None
+    # The failed dependency that kept the step from running.
+    blocked_by: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.end is not None and self.error is None
+
+    @property
+    def elapsed(self) -> float:
+        return self.end - self.start if self.end is not None else 0.0
+
+
+@dataclass
+class RunReport:
+    """Results of a routine run, in the routine's step order."""
+
+    routine: Routine
+    results: dict[str, StepResult]
+    elapsed: float
+    critical_path: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.results.values())
+
+
+def find_routine(name: str, routines_dir: Path) -> Path:
+    """Return the routine file `name` names: a path, or a routine in routines_dir."""
+    path = Path(name)
+    if path.is_file():
+        return path
+    for suffix in SUFFIXES:
+        candidate = routines_dir / f"{name}{suffix}"
+        if candidate.is_file():
+            return candidate
+    raise RoutineError(f"No routine file {name} or {name}.toml/.yaml in {routines_dir}")
+
+
+def load_routine(path: Path) -> Routine:
+    """Read and validate a routine file."""
+    if path.suffix in (".yaml", ".yml"):
+        data = _load_yaml(path)
+    else:
+        data = _load_toml(path)
+
+    if not isinstance(data, dict) or not isinstance(data.get("steps"), dict) or not data["steps"]:
+        raise RoutineError(f"{path}: a routine needs a 'steps' table with at least one step")
+
+    steps = {name: _parse_step(name, spec) for name, spec in data["steps"].items()}
+    for step in steps.values():
+        for dependency in step.after:
+            if dependency not in steps:
+                raise RoutineError(f"Step {step.name!r} runs after unknown step {dependency!r}")
+    _check_acyclic(steps)
+    return Routine(str(data.get("name", path.stem)), steps)
+
+
+def _load_toml(path: Path) -> dict:
+    try:
+        import tomllib
+    except ModuleNotFoundError:  # Python 3.10
+        import tomli as tomllib
+    try:
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    except OSError as e:
+        raise RoutineError(f"Can't read {path}: {e.strerror}")
+    except tomllib.TOMLDecodeError as e:
+        raise RoutineError(f"{path}: {e}")
+
+
+def _load_yaml(path: Path) -> dict:
+    try:
+        import yaml
+    except ModuleNotFoundError:
+        raise RoutineError("Reading YAML routines needs PyYAML: pip install pyyaml")
+    try:
+        with open(path) as f:
+            return yaml.safe_load(f)
+    except OSError as e:
+        raise RoutineError(f"Can't read {path}: {e.strerror}")
+    except yaml.YAMLError as e:
+        raise RoutineError(f"{path}: {e}")
+
+
+def _parse_step(name: str, spec) -> Step:
+    if not isinstance(spec, dict):
+        raise RoutineError(f"Step {name!r} must be a table")
+    unknown = set(spec) - _STEP_KEYS
+    if unknown:
+        raise RoutineError(f"Step {name!r} has unknown keys: {', '.join(sorted(unknown))}")
+
+    actions = [action for action in ACTIONS if action in spec]
+    if len(actions) != 1:
+        raise RoutineError(f"Step {name!r} needs exactly one of 'command' or 'broadcast'")
+    action = actions[0]
+    text = spec[action]
+    if not isinstance(text, str):
+        raise RoutineError(f"Step {name!r}: {action} must be a string")
+    try:
+        (broadcast_command if action == "broadcast" else validate_command)(text)
+    except (BroadcastError, CommandError) as e:
+        raise RoutineError(f"Step {name!r}: {e}")
+
+    after = spec.get("after", [])
+    if isinstance(after, str):
+        after = [after]
+    if not isinstance(after, list) or not all(isinstance(dependency, str) for dependency in after):
+        raise RoutineError(f"Step {name!r}: 'after' must be a step name or a list of them")
+
+    timeout = spec.get("timeout")
+    if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0):
+        raise RoutineError(f"Step {name!r}: timeout must be a positive number of seconds")
+
+    return Step(name, action, text, tuple(after), float(timeout) if timeout is not None else None)
+
+
+def _check_acyclic(steps: dict[str, Step]) -> None:
+    """Raise RoutineError if the steps' dependencies form a cycle."""
+    waiting = {name: len(step.after) for name, step in steps.items()}
+    dependents = _dependents(steps)
+    ready = [name for name, count in waiting.items() if count == 0]
+    visited = 0
+    while ready:
+        name = ready.pop()
+        visited += 1
+        for dependent in dependents[name]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                ready.append(dependent)
+    if visited < len(steps):
+        cycle = sorted(name for name, count in waiting.items() if count)
+        raise RoutineError(f"Steps depend on each other in a cycle: {', '.join(cycle)}")
+
+
+def _dependents(steps: dict[str, Step]) -> dict[str, list[str]]:
+    dependents = {name: [] for name in steps}
+    for step in steps.values():
+        for dependency in step.after:
+            dependents[dependency].append(step.name)
+    return dependents
+
+
+def run_routine(routine: Routine, run_step: Callable[[Step], str], max_parallel: int = 4) -> RunReport:
+    """Run every step once its dependencies have succeeded, up to max_parallel at once.
+
+    run_step(step) sends one step and returns the response. A step whose
+    dependency failed is not run.
+    """
+    steps = routine.steps
+    results = {name: StepResult(step) for name, step in steps.items()}
+    dependents = _dependents(steps)
+    waiting = {name: len(step.after) for name, step in steps.items()}
+    started = time.monotonic()
+
+    def run(step: Step) -> StepResult:
+        result = results[step.name]
+        result.start = time.monotonic() - started
+        try:
+            result.response = run_step(step)
+        except Exception as e:
+            result.error = e
+        result.end = time.monotonic() - started
+        return result
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        running = {
+            executor.submit(run, step) for name, step in steps.items() if waiting[name] == 0
+        }
+        while running:
+            done, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if not result.ok:
+                    _block_dependents(result.step.name, dependents, results)
+                    continue
+                for name in dependents[result.step.name]:
+                    waiting[name] -= 1
+                    if waiting[name] == 0 and results[name].blocked_by is None:
+                        running.add(executor.submit(run, steps[name]))
+
+    return RunReport(routine, results, time.monotonic() - started, _critical_path(results))
+
+
+def _block_dependents(failed: str, dependents: dict[str, list[str]], results: dict[str, StepResult]) -> None:
+    """Mark every step downstream of a failed step as blocked by it."""
+    pending = list(dependents[failed])
+    while pending:
+        name = pending.pop()
+        if results[name].blocked_by is None:
+            results[name].blocked_by = failed
+            pending.extend(dependents[name])
+
+
+def _critical_path(results: dict[str, StepResult]) -> list[str]:
+    """Return the chain of steps that determined when the run finished.
+
+    Starting from the step that ended last, follow each step back to the
+    dependency that ended last, since that is the one it waited for.
+    """
+    finished = [result for result in results.values() if result.end is not None]
+    if not finished:
+        return []
+    current = max(finished, key=lambda result: result.end)
+    path = [current.step.name]
+    while current.step.after:
+        current = max((results[name] for name in current.step.after), key=lambda result: result.end)
+        path.append(current.step.name)
+    return path[::-1]
+
+
+def pool_step_runner(pool) -> Callable[[Step], str]:
+    """Return a run_step function sending each step on a session from an AssistantPool.
+
+    A step's timeout covers waiting for a free session as well as all of
+    its attempts: the retry policy's deadline becomes whatever is left of
+    it once a session is checked out.
+    """
+
+    def run_step(step: Step) -> str:
+        started = time.monotonic()
+        with pool.session(timeout=step.timeout) as session:
+            session.new_conversation()
+            policy = session.retry_policy
+            if step.timeout is not None:
+                remaining = step.timeout - (time.monotonic() - started)
+                session.retry_policy = replace(policy, deadline=max(remaining, 0.001))
+            try:
+                if step.action == "broadcast":
+                    return session.broadcast(step.text)
+                return session.send(step.text)
+            finally:
+                session.retry_policy = policy
+
+    return run_step
@@ -0,0 +1,435 @@
+"""Scheduled broadcasts and commands.
+
+Jobs are kept in a JSON file in the profile directory and run by a
+Scheduler inside the daemon or `ghome schedule run`. A job runs either
+once, at a given time, or on a cron schedule:
+
+    ┌───────── minute (0-59)
+    │ ┌─────── hour (0-23)
+    │ │ ┌───── day of month (1-31)
+    │ │ │ ┌─── month (1-12)
+    │ │ │ │ ┌─ day of week (0-7, Sunday is 0 or 7)
+    55 9 * * 1-5
+
+Fields take `*`, numbers, ranges (`1-5`), lists (`1,3`) and steps
+(`*/15`). Cron times are local time.
+
+This module only uses the standard library, so managing the schedule
+never imports the Google libraries.
+"""
+
+import functools
+import heapq
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+from ghome.messages import broadcast_command, validate_command
+from ghome.storage import file_lock, try_file_lock, write_private_json
+
+ACTIONS = ("broadcast", "command")
+
+# Seconds before a job is due that the session is warmed up.
+WARM_UP_LEAD = 10.0
+
+# Seconds late a job may still run, e.g. after the scheduler was stopped.
+MISFIRE_GRACE = 60.0
+
+# Longest the scheduler sleeps before checking the store for changes.
+POLL_INTERVAL = 1.0
+
+_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+}
+
+# (low, high) for minute, hour, day of month, month and day of week.
+_FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+class ScheduleError(Exception):
+    """Raised when a schedule or job is invalid."""
+    pass
+
+
+class CronExpression:
+    """A parsed five-field cron expression."""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = _ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ScheduleError(f"Cron expression needs 5 fields: {expression!r}")
+
+        minutes, hours, days, months, weekdays = (
+            _parse_field(field, low, high) for field, (low, high) in zip(fields, _FIELD_RANGES)
+        )
+        self.minutes = sorted(minutes)
+        self.hours = sorted(hours)
+        self.days = days
+        self.months = months
+        self.weekdays = {day % 7 for day in weekdays}
+        # As in cron, if both day fields are restricted either may match.
+        self._any_day = fields[2] == "*" or fields[4] == "*"
+
+    def _day_matches(self, day: date) -> bool:
+        if day.month not in self.months:
+            return False
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        if self._any_day:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, after: datetime) -> datetime:
+        """Return the first matching minute strictly after `after`."""
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.date()
+        # Eight years covers every date, including 29 February.
+        for _ in range(8 * 366):
+            if self._day_matches(day):
+                for hour in self.hours:
+                    if day == start.date() and hour < start.hour:
+                        continue
+                    for minute in self.minutes:
+                        candidate = datetime(day.year, day.month, day.day, hour, minute)
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        raise ScheduleError(f"Cron expression never matches: {self.expression!r}")
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_cron(expression: str) -> CronExpression:
+    """Return the parsed expression; jobs often share one."""
+    return CronExpression(expression)
+
+
+def _parse_field(field: str, low: int, high: int) -> set[int]:
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = _parse_number(step_text, 1, high)
+        if part == "*":
+            first, last = low, high
+        elif "-" in part:
+            first_text, last_text = part.split("-", 1)
+            first, last = _parse_number(first_text, low, high), _parse_number(last_text, low, high)
+        else:
+            first = _parse_number(part, low, high)
+            last = high if step > 1 else first
+        if first > last:
+            raise ScheduleError(f"Invalid cron range: {part!r}")
+        values.update(range(first, last + 1, step))
+    return values
+
+
+def _parse_number(text: str, low: int, high: int) -> int:
+    if not text.isdigit() or not low <= int(text) <= high:
+        raise ScheduleError(f"Cron value {text!r} is not between {low} and {high}")
+    return int(text)
+
+
+def parse_time(text: str, now: datetime | None = None) -> datetime:
+    """Parse an ISO date and time, or HH:MM for its next occurrence, in local time."""
+    now = now or datetime.now()
+    try:
+        clock = datetime.strptime(text, "%H:%M")
+    except ValueError:
+        pass
+    else:
+        at = now.replace(hour=clock.hour, minute=clock.minute, second=0, microsecond=0)
+        return at if at > now else at + timedelta(days=1)
+
+    try:
+        at = datetime.fromisoformat(text)
+    except ValueError:
+        raise ScheduleError(f"Invalid time {text!r}: use HH:MM or YYYY-MM-DD HH:MM")
+    # Aware times are converted to local time, which cron times use too.
+    return at.astimezone().replace(tzinfo=None) if at.tzinfo else at
+
+
+@dataclass
+class Job:
+    """One scheduled broadcast or command."""
+
+    id: int
+    action: str
+    text: str
+    created_at: float
+    cron: str | None = None
+    at: float | None = None
+
+    @property
+    def recurring(self) -> bool:
+        return self.cron is not None
+
+    def describe(self) -> str:
+        """Return the schedule in words, e.g. 'cron 55 9 * * 1-5'."""
+        if self.cron is not None:
+            return f"cron {self.cron}"
+        return f"at {datetime.fromtimestamp(self.at):%Y-%m-%d %H:%M:%S}"
+
+    def next_run(self, after: float) -> float | None:
+        """Return when the job next runs after `after`, or None if it won't."""
+        if self.cron is not None:
+            return _parse_cron(self.cron).next_after(datetime.fromtimestamp(after)).timestamp()
+        return self.at if self.at > after else None
+
+
+class ScheduleStore:
+    """Jobs stored in a JSON file, shared by every ghome process."""
+
+    def __init__(self, path: Path, lock_path: Path):
+        self.path = path
+        self.lock_path = lock_path
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"next_id": 1, "jobs": []}
+        except json.JSONDecodeError:
+            raise ScheduleError(f"Schedule file is invalid JSON: {self.path}")
+
+    def jobs(self) -> list[Job]:
+        """Return every job, oldest first."""
+        return [Job(**job) for job in self._read()["jobs"]]
+
+    def version(self) -> tuple[int, int] | None:
+        """Return a value that changes whenever the store is written."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        # Every write replaces the file, so the inode changes too.
+        return stat.st_ino, stat.st_mtime_ns
+
+    def add(
+        self,
+        text: str,
+        action: str = "broadcast",
+        cron: str | None = None,
+        at: datetime | None = None,
+    ) -> Job:
+        """Validate and store a new job, returning it."""
+        if action not in ACTIONS:
+            raise ScheduleError(f"Unknown action: {action}")
+        if (cron is None) == (at is None):
+            raise ScheduleError("A job needs either a cron expression or a time")
+        (broadcast_command if action == "broadcast" else validate_command)(text)
+        now = time.time()
+        if cron is not None:
+            CronExpression(cron).next_after(datetime.now())
+        elif at.timestamp() <= now:
+            raise ScheduleError(f"{at:%Y-%m-%d %H:%M} is in the past")
+
+        with file_lock(self.lock_path):
+            data = self._read()
+            job = Job(
+                data["next_id"], action, text, now, cron,
+                at.timestamp() if at is not None else None,
+            )
+            data["next_id"] += 1
+            data["jobs"].append(asdict(job))
+            write_private_json(self.path, data)
+        return job
+
+    def remove(self, job_id: int) -> bool:
+        """Delete a job; return False if there was no such job."""
+        with file_lock(self.lock_path):
+            data = self._read()
+            jobs = [job for job in data["jobs"] if job["id"] != job_id]
+            if len(jobs) == len(data["jobs"]):
+                return False
+            data["jobs"] = jobs
+            write_private_json(self.path, data)
+        return True
+
+
+@dataclass
+class Firing:
+    """One run of a job, as reported by the scheduler."""
+
+    job: Job
+    due: float
+    lateness: float
+    response: str | None = None
+    error: Exception | None = None
+    missed: bool = False
+
+
+class Scheduler:
+    """Run due jobs on a background thread.
+
+    Upcoming runs are kept in a heap, so the scheduler sleeps until the
+    earliest one whatever the number of jobs. warm_up() is called
+    `warm_up_lead` seconds before each run, so the session's channel is
+    connected by the time the job is due, and send(action, text) is called
+    at the due time. One-shot jobs are removed from the store once run.
+
+    Only one process runs a profile's schedule at a time; start() raises
+    OSError if another already does.
+    """
+
+    def __init__(
+        self,
+        store: ScheduleStore,
+        send: Callable[[str, str], str],
+        lock_path: Path,
+        warm_up: Callable[[], None] | None = None,
+        report: Callable[[Firing], None] | None = None,
+        warm_up_lead: float = WARM_UP_LEAD,
+    ):
+        self.store = store
+        self.send = send
+        self.lock_path = lock_path
+        self.warm_up = warm_up
+        self.report = report
+        self.warm_up_lead = warm_up_lead
+        self.fired = 0
+        self.missed = 0
+        self.max_lateness = 0.0
+        self.last_error: Exception | None = None
+        self._heap: list[tuple[float, int]] = []
+        self._jobs: dict[int, Job] = {}
+        self._last_due: dict[int, float] = {}
+        self._version: tuple[int, int] | None = None
+        self._warmed_for: float | None = None
+        self._started_at = 0.0
+        self._lock_fd: int | None = None
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "Scheduler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start the scheduler thread."""
+        if self._thread is not None:
+            return
+        self._lock_fd = try_file_lock(self.lock_path)
+        if self._lock_fd is None:
+            raise OSError(f"Another process is already running the schedule ({self.lock_path})")
+        self._started_at = time.time()
+        self._version = None
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="ghome-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the scheduler, waiting for a job being sent."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            thread.join()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def next_due(self) -> float | None:
+        """Return when the earliest upcoming job is due, or None if none is."""
+        return self._heap[0][0] if self._heap else None
+
+    def _reload_if_changed(self) -> None:
+        version = self.store.version()
+        if version == self._version:
+            return
+        try:
+            jobs = self.store.jobs()
+        except ScheduleError as e:
+            # Keep running the jobs already loaded until the file is fixed.
+            self.last_error = e
+            return
+        self._version = version
+        scheduled = {job_id: due for due, job_id in self._heap}
+        previous, self._jobs = self._jobs, {job.id: job for job in jobs}
+        self._heap = []
+        for job in jobs:
+            if previous.get(job.id) == job and job.id in scheduled:
+                # Unchanged, so a write to the store doesn't cost a
+                # recalculation of every job.
+                due = scheduled[job.id]
+            else:
+                # Runs before the scheduler started or the job was added
+                # are not made up, but a one-shot job a little late is.
+                after = self._last_due.get(job.id, max(self._started_at, job.created_at))
+                if not job.recurring and job.id not in self._last_due:
+                    after = min(after, job.at - 1)
+                due = job.next_run(after)
+            if due is not None:
+                self._heap.append((due, job.id))
+        heapq.heapify(self._heap)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._reload_if_changed()
+            now = time.time()
+            if not self._heap:
+                self._stopping.wait(POLL_INTERVAL)
+                continue
+
+            due, job_id = self._heap[0]
+            if due <= now:
+                heapq.heappop(self._heap)
+                self._fire(self._jobs[job_id], due, now)
+                continue
+
+            if due - now <= self.warm_up_lead and self._warmed_for != due:
+                self._warmed_for = due
+                self._warm_up()
+                continue
+
+            wake = due if self._warmed_for == due else due - self.warm_up_lead
+            self._stopping.wait(min(wake - now, POLL_INTERVAL))
+
+    def _warm_up(self) -> None:
+        if self.warm_up is None:
+            return
+        try:
+            self.warm_up()
+        except Exception as e:
+            self.last_error = e
+
+    def _fire(self, job: Job, due: float, now: float) -> None:
+        self._last_due[job.id] = due
+        firing = Firing(job, due, now - due)
+        if firing.lateness > MISFIRE_GRACE:
+            firing.missed = True
+            self.missed += 1
+        else:
+            try:
+                firing.response = self.send(job.action, job.text)
+            except Exception as e:
+                firing.error = e
+                self.last_error = e
+            self.fired += 1
+            self.max_lateness = max(self.max_lateness, firing.lateness)
+
+        if job.recurring:
+            # After a missed run, carry on from now rather than catching up.
+            next_due = job.next_run(max(due, now) if firing.missed else due)
+            heapq.heappush(self._heap, (next_due, job.id))
+        else:
+            try:
+                self.store.remove(job.id)
+            except (OSError, ScheduleError) as e:
+                self.last_error = e
+
+        if self.report is not None:
+            self.report(firing)
@@ -0,0 +1,124 @@
+"""Background send queue for the interactive shells.
+
+The shells hand each line to a SendQueue and go straight back to the
+prompt. One worker thread sends the lines in the order they were typed,
+since a session carries conversation state, and reports each result
+tagged with its sequence number. The queue is bounded: once `max_pending`
+lines are waiting, submit() blocks until the backend catches up.
+"""
+
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable
+
+# Lines that may wait behind the one being sent before submit() blocks.
+MAX_PENDING = 8
+
+
+@dataclass
+class SendResult:
+    """Outcome of one queued send."""
+
+    seq: int
+    text: str
+    response: str | None = None
+    error: Exception | None = None
+    cancelled: bool = False
+
+
+class SendQueue:
+    """Send texts one at a time on a worker thread, reporting each result.
+
+    send(text) delivers one text and returns the response; report(result)
+    is called on the worker thread with each SendResult, in order.
+
+        with SendQueue(session.broadcast, print_result) as sends:
+            sends.submit("Dinner is ready")
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], str],
+        report: Callable[[SendResult], None],
+        max_pending: int = MAX_PENDING,
+    ):
+        self.send = send
+        self.report = report
+        self._queue: queue.Queue = queue.Queue(max_pending)
+        self._seq = 0
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ghome-send", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "SendQueue":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        """Return the number of texts submitted but not yet reported."""
+        with self._idle:
+            return self._pending
+
+    def full(self) -> bool:
+        """Return True if submit() would block."""
+        return self._queue.full()
+
+    def submit(self, text: str) -> int:
+        """Queue a text and return its sequence number, blocking while the queue is full."""
+        with self._idle:
+            self._pending += 1
+        try:
+            self._queue.put((self._seq + 1, text))
+        except BaseException:
+            # Interrupted while waiting for room; the text was never queued.
+            with self._idle:
+                self._pending -= 1
+            raise
+        self._seq += 1
+        return self._seq
+
+    def drain(self) -> None:
+        """Wait until every submitted text has been sent and reported."""
+        with self._idle:
+            # Wake up regularly so Ctrl-C can interrupt the wait.
+            while self._pending:
+                self._idle.wait(0.1)
+
+    def close(self, cancel: bool = False) -> None:
+        """Stop the worker after the texts already queued.
+
+        With cancel=True, queued texts are reported as cancelled instead of
+        being sent; a send already in progress still completes.
+        """
+        if cancel:
+            self._cancelled.set()
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            seq, text = item
+            result = SendResult(seq, text)
+            if self._cancelled.is_set():
+                result.cancelled = True
+            else:
+                try:
+                    result.response = self.send(text)
+                except Exception as e:
+                    result.error = e
+            try:
+                self.report(result)
+            finally:
+                with self._idle:
+                    self._pending -= 1
+                    self._idle.notify_all()
@@ -0,0 +1,79 @@
+"""Local stand-in for the Google Assistant embedded API.
+
+Implements the EmbeddedAssistant Assist streaming RPC on a plaintext gRPC
+port, answering each text query after a programmable latency and failing a
+programmable fraction of requests. Point sessions at it with
+GHOME_ASSISTANT_ENDPOINT=localhost:PORT and GHOME_ASSISTANT_INSECURE=1, or
+use it from ``ghome bench --local``.
+"""
+
+import random
+import threading
+import time
+from concurrent import futures
+
+import grpc
+from google.assistant.embedded.v1alpha2 import (
+    embedded_assistant_pb2,
+    embedded_assistant_pb2_grpc,
+)
+
+
+class StandinAssistant(embedded_assistant_pb2_grpc.EmbeddedAssistantServicer):
+    """Assist handler with injectable latency and errors."""
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_code: grpc.StatusCode = grpc.StatusCode.UNAVAILABLE,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.requests = 0
+        self.errors = 0
+        # Requests continuing an earlier conversation rather than starting one.
+        self.continued = 0
+        self._lock = threading.Lock()
+
+    def Assist(self, request_iterator, context):
+        text_query = ""
+        continued = False
+        for request in request_iterator:
+            if request.config.text_query:
+                text_query = request.config.text_query
+                continued = not request.config.dialog_state_in.is_new_conversation
+
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+
+        failed = random.random() < self.error_rate
+        with self._lock:
+            self.requests += 1
+            self.errors += failed
+            self.continued += continued
+        if failed:
+            context.abort(self.error_code, "Injected error")
+
+        yield embedded_assistant_pb2.AssistResponse(
+            dialog_state_out=embedded_assistant_pb2.DialogStateOut(
+                supplemental_display_text=f"Stand-in received: {text_query}",
+                conversation_state=b"standin",
+            )
+        )
+
+
+def start_server(
+    servicer: StandinAssistant,
+    host: str = "localhost",
+    port: int = 0,
+    max_workers: int = 64,
+) -> tuple[grpc.Server, int]:
+    """Start serving on host:port (0 picks a free port); return the server and port."""
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+    embedded_assistant_pb2_grpc.add_EmbeddedAssistantServicer_to_server(servicer, server)
+    bound_port = server.add_insecure_port(f"{host}:{port}")
+    server.start()
+    return server, bound_port
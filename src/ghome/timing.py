@@ -0,0 +1,117 @@
+"""Per-stage timing instrumentation.
+
+Code under measurement wraps each stage in ``with stage("name"):``. Stages
+are collected for records() once enable() is called, which the CLI does for
+--timings. With GHOME_TIMINGS_FILE set, the CLI adds a json_lines_hook()
+that appends each stage to the file as it finishes. Embedders forward timings to
+their own metrics with add_hook(); hooks alone don't collect anything, so a
+long-running process doesn't accumulate records. While neither is active,
+stage() returns a shared no-op context manager.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable
+
+TIMINGS_FILE_ENV = "GHOME_TIMINGS_FILE"
+
+Hook = Callable[[str, float], None]
+
+_NO_OP = nullcontext()
+_records: list[tuple[str, float]] | None = None
+_hooks: list[Hook] = []
+
+
+class _Stage:
+    """Context manager recording how long its block took."""
+
+    __slots__ = ("name", "_started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> None:
+        self._started = time.monotonic()
+
+    def __exit__(self, *exc_info) -> None:
+        record(self.name, time.monotonic() - self._started)
+
+
+def enable() -> None:
+    """Start collecting timings for records()."""
+    global _records
+    if _records is None:
+        _records = []
+
+
+def is_enabled() -> bool:
+    """Return True if timings are being collected or passed to hooks."""
+    return _records is not None or bool(_hooks)
+
+
+def stage(name: str):
+    """Return a context manager that times its block as the named stage."""
+    return _Stage(name) if is_enabled() else _NO_OP
+
+
+def record(name: str, seconds: float) -> None:
+    """Record a stage duration and pass it to every hook."""
+    if _records is not None:
+        _records.append((name, seconds))
+    for hook in _hooks:
+        hook(name, seconds)
+
+
+def add_hook(hook: Hook) -> None:
+    """Call hook(stage, seconds) for every stage recorded from now on."""
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    """Stop calling a hook added with add_hook()."""
+    _hooks.remove(hook)
+
+
+def records() -> list[tuple[str, float]]:
+    """Return the (stage, seconds) pairs recorded so far, oldest first."""
+    return list(_records or [])
+
+
+def reset() -> None:
+    """Stop recording, and forget recorded timings and hooks."""
+    global _records
+    _records = None
+    _hooks.clear()
+
+
+def format_records() -> str:
+    """Return the recorded timings as an aligned, human-readable table."""
+    entries = records()
+    width = max((len(name) for name, _ in entries), default=0)
+    return "\n".join(f"{name:<{width}}  {seconds * 1000:8.1f} ms" for name, seconds in entries)
+
+
+def json_lines_hook(path: Path, command: str | None) -> Hook:
+    """Return a hook appending one JSON object per stage to a file as it is recorded.
+
+    Writing each stage straight away keeps long-running processes such as
+    the daemon from buffering timings, and keeps them if it is killed.
+    """
+    lock = threading.Lock()
+
+    def hook(name: str, seconds: float) -> None:
+        line = json.dumps({
+            "time": time.time(),
+            "pid": os.getpid(),
+            "command": command,
+            "stage": name,
+            "seconds": seconds,
+        }) + "\n"
+        with lock, open(path, "a") as f:
+            f.write(line)
+
+    return hook
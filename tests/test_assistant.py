@@ -1,9 +1,22 @@
 # tests/test_assistant.py
-from unittest.mock import patch, MagicMock
+import asyncio
+import threading
+from unittest.mock import patch, AsyncMock, MagicMock
 
+import grpc
 import pytest
 
-from ghome.assistant import broadcast_message, BroadcastError, send_command, CommandError
+from ghome.assistant import (
+    AssistantSession,
+    AsyncAssistantSession,
+    async_broadcast_message,
+    send_commands,
+    broadcast_message,
+    BroadcastError,
+    send_command,
+    send_to_profiles,
+    CommandError,
+)
 
 
 def test_broadcast_message_sends_correct_command():
@@ -35,6 +48,36 @@ def test_broadcast_message_raises_on_too_long_message():
         broadcast_message(long_message, mock_creds)
 
 
+def test_broadcast_message_opens_channel_before_awaiting_credentials():
+    events = []
+    mock_assistant = MagicMock()
+    mock_assistant.assist.side_effect = lambda text: events.append("assist") or ("", None, None)
+    credentials_ready = MagicMock()
+    credentials_ready.result.side_effect = lambda: events.append("credentials")
+
+    with patch("ghome.assistant.TextAssistant") as MockTextAssistant, \
+            patch("ghome.assistant.grpc.channel_ready_future") as mock_ready:
+        MockTextAssistant.return_value.__enter__.return_value = mock_assistant
+        mock_ready.side_effect = lambda channel: events.append("connect") or MagicMock()
+
+        result = broadcast_message("Dinner is ready", MagicMock(), credentials_ready=credentials_ready)
+
+    assert events == ["connect", "credentials", "assist"]
+    mock_ready.assert_called_once_with(mock_assistant.channel)
+    assert result == "Broadcast sent"
+
+
+def test_broadcast_message_validates_before_awaiting_credentials():
+    credentials_ready = MagicMock()
+
+    with patch("ghome.assistant.TextAssistant") as MockTextAssistant:
+        with pytest.raises(BroadcastError):
+            broadcast_message("a" * 201, MagicMock(), credentials_ready=credentials_ready)
+
+    MockTextAssistant.assert_not_called()
+    credentials_ready.result.assert_not_called()
+
+
 def test_send_command_sends_correct_command():
     mock_assistant = MagicMock()
     mock_assistant.assist.return_value = ("The volume is now 10", None, None)
@@ -67,3 +110,309 @@ def test_send_command_returns_default_on_empty_response():
         result = send_command("turn off lights", mock_creds)
 
         assert result == "Command sent"
+
+
+class _Unavailable(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+
+def test_session_reuses_assistant_across_messages():
+    mock_assistant = MagicMock()
+    mock_assistant.assist.return_value = ("", None, None)
+
+    with patch("ghome.assistant.TextAssistant") as MockTextAssistant:
+        MockTextAssistant.return_value.__enter__.return_value = mock_assistant
+
+        with AssistantSession(MagicMock()) as session:
+            session.broadcast("Hello")
+            session.send("turn off lights")
+
+        MockTextAssistant.assert_called_once()
+        assert mock_assistant.assist.call_count == 2
+        MockTextAssistant.return_value.__exit__.assert_called_once()
+
+
+def test_session_request_returns_reply_details():
+    dropped = MagicMock()
+    dropped.assist.side_effect = _Unavailable()
+    fresh = MagicMock()
+    fresh.assist.return_value = ("It's 9:41", b"<p>9:41</p>", b"audio")
+
+    with patch("ghome.assistant.TextAssistant") as MockTextAssistant, patch("ghome.retry.time.sleep"):
+        MockTextAssistant.return_value.__enter__.side_effect = [dropped, fresh]
+
+        with AssistantSession(MagicMock()) as session:
+            reply = session.request("command", "what time is it")
+
+    assert reply.response == "It's 9:41"
+    assert reply.html == b"<p>9:41</p>"
+    assert reply.audio == b"audio"
+    assert reply.attempts == 2
+    assert not reply.cached
+
+
+def test_session_reconnects_when_channel_drops():
+    dropped = MagicMock()
+    dropped.assist.side_effect = _Unavailable()
+    fresh = MagicMock()
+    fresh.assist.return_value = ("Done", None, None)
+
+    with patch("ghome.assistant.TextAssistant") as MockTextAssistant:
+        MockTextAssistant.return_value.__enter__.side_effect = [dropped, fresh]
+
+        with AssistantSession(MagicMock()) as session:
+            result = session.send("turn off lights")
+
+        assert result == "Done"
+        assert MockTextAssistant.call_count == 2
+        fresh.assist.assert_called_once_with("turn off lights")
+
+
+def test_session_does_not_connect_for_invalid_message():
+    with patch("ghome.assistant.TextAssistant") as MockTextAssistant:
+        with AssistantSession(MagicMock()) as session:
+            with pytest.raises(BroadcastError):
+                session.broadcast("   ")
+
+        MockTextAssistant.assert_not_called()
+
+
+def test_send_commands_returns_results_in_input_order():
+    def assist(text):
+        if text == "fail":
+            raise RuntimeError("boom")
+        return (f"ok: {text}", None, None)
+
+    with patch("ghome.assistant.TextAssistant") as MockTextAssistant:
+        MockTextAssistant.return_value.__enter__.return_value.assist.side_effect = assist
+
+        results = list(send_commands(["a", "fail", "c"], MagicMock(), max_workers=2))
+
+    assert [r.index for r in results] == [0, 1, 2]
+    assert [r.response for r in results] == ["ok: a", None, "ok: c"]
+    assert not results[1].ok
+    assert isinstance(results[1].error, RuntimeError)
+    assert MockTextAssistant.call_count <= 2
+
+
+def test_send_commands_as_completed_yields_every_result():
+    with patch("ghome.assistant.TextAssistant") as MockTextAssistant:
+        MockTextAssistant.return_value.__enter__.return_value.assist.return_value = ("", None, None)
+
+        results = list(send_commands(["a", "b", "c"], MagicMock(), as_completed=True))
+
+    assert sorted(r.index for r in results) == [0, 1, 2]
+    assert all(r.response == "Command sent" for r in results)
+
+
+def test_async_broadcast_message_sends_correct_command():
+    with patch("ghome.assistant.TextAssistantAsync") as MockTextAssistantAsync:
+        mock_assistant = MockTextAssistantAsync.return_value
+        mock_assistant.assist = AsyncMock(return_value=("Broadcast sent", None, None))
+        mock_assistant.close = AsyncMock()
+
+        result = asyncio.run(async_broadcast_message("Dinner is ready", MagicMock()))
+
+    assert result == "Broadcast sent"
+    mock_assistant.assist.assert_awaited_once_with("broadcast Dinner is ready")
+    mock_assistant.close.assert_awaited_once()
+
+
+def test_async_session_shares_one_assistant_across_concurrent_calls():
+    async def run():
+        async with AsyncAssistantSession(MagicMock()) as session:
+            return await asyncio.gather(*(session.send(f"cmd {i}") for i in range(20)))
+
+    with patch("ghome.assistant.TextAssistantAsync") as MockTextAssistantAsync:
+        mock_assistant = MockTextAssistantAsync.return_value
+        mock_assistant.assist = AsyncMock(return_value=("", None, None))
+        mock_assistant.close = AsyncMock()
+
+        results = asyncio.run(run())
+
+    assert results == ["Command sent"] * 20
+    MockTextAssistantAsync.assert_called_once()
+
+
+def test_async_session_applies_per_call_timeout():
+    async def slow_assist(text):
+        await asyncio.sleep(10)
+
+    async def run():
+        async with AsyncAssistantSession(MagicMock()) as session:
+            await session.send("what time is it", timeout=0.01)
+
+    with patch("ghome.assistant.TextAssistantAsync") as MockTextAssistantAsync:
+        MockTextAssistantAsync.return_value.assist = slow_assist
+        MockTextAssistantAsync.return_value.close = AsyncMock()
+
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(run())
+
+
+def test_session_answers_cacheable_commands_from_cache():
+    from ghome.cache import ResponseCache
+
+    mock_assistant = MagicMock()
+    mock_assistant.assist.return_value = ("It's 21 degrees", None, None)
+
+    with patch("ghome.assistant.TextAssistant") as MockTextAssistant:
+        MockTextAssistant.return_value.__enter__.return_value = mock_assistant
+
+        with AssistantSession(MagicMock(), cache=ResponseCache()) as session:
+            first = session.send("what's the temperature")
+            second = session.send("What's the temperature?")
+            session.send("turn off lights")
+            session.send("turn off lights")
+
+    assert first == second == "It's 21 degrees"
+    assert mock_assistant.assist.call_count == 3
+
+
+class _ResourceExhausted(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.RESOURCE_EXHAUSTED
+
+
+def test_session_reports_quota_errors_and_backs_off_concurrency():
+    from ghome.assistant import QuotaExceededError
+    from ghome.ratelimit import AdaptiveConcurrency
+    from ghome.retry import RetryPolicy
+
+    concurrency = AdaptiveConcurrency(initial=4)
+
+    with patch("ghome.assistant.TextAssistant") as MockTextAssistant:
+        MockTextAssistant.return_value.__enter__.return_value.assist.side_effect = _ResourceExhausted()
+
+        with AssistantSession(
+            MagicMock(), concurrency=concurrency, retry_policy=RetryPolicy(max_attempts=1)
+        ) as session:
+            with pytest.raises(QuotaExceededError):
+                session.send("turn off lights")
+
+    assert concurrency.limit == 2
+    assert concurrency.in_flight == 0
+
+
+def test_session_takes_a_rate_limiter_token_per_request():
+    rate_limiter = MagicMock()
+
+    with patch("ghome.assistant.TextAssistant") as MockTextAssistant:
+        MockTextAssistant.return_value.__enter__.return_value.assist.return_value = ("", None, None)
+
+        with AssistantSession(MagicMock(), rate_limiter=rate_limiter) as session:
+            session.send("a")
+            session.send("b")
+
+    assert rate_limiter.acquire.call_count == 2
+
+
+def test_session_retries_retryable_errors_then_succeeds():
+    from ghome.retry import RetryPolicy
+
+    mock_assistant = MagicMock()
+    mock_assistant.assist.side_effect = [_ResourceExhausted(), _Unavailable(), ("Done", None, None)]
+
+    with patch("ghome.assistant.TextAssistant") as MockTextAssistant, \
+            patch("ghome.retry.time.sleep"):
+        MockTextAssistant.return_value.__enter__.return_value = mock_assistant
+
+        with AssistantSession(MagicMock(), retry_policy=RetryPolicy(max_attempts=3)) as session:
+            result = session.send("turn off lights")
+
+    assert result == "Done"
+    assert session.retry_stats.retries == 2
+    assert session.retry_stats.last_attempts == 3
+
+
+def test_session_does_not_retry_other_errors():
+    mock_assistant = MagicMock()
+    mock_assistant.assist.side_effect = RuntimeError("bad request")
+
+    with patch("ghome.assistant.TextAssistant") as MockTextAssistant:
+        MockTextAssistant.return_value.__enter__.return_value = mock_assistant
+
+        with AssistantSession(MagicMock()) as session:
+            with pytest.raises(RuntimeError):
+                session.send("turn off lights")
+
+    assert mock_assistant.assist.call_count == 1
+
+
+def test_shared_breaker_fails_fast_once_open():
+    from ghome.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+    mock_assistant = MagicMock()
+    mock_assistant.assist.side_effect = _Unavailable()
+
+    with patch("ghome.assistant.TextAssistant") as MockTextAssistant, \
+            patch("ghome.retry.time.sleep"):
+        MockTextAssistant.return_value.__enter__.return_value = mock_assistant
+
+        with AssistantSession(MagicMock(), retry_policy=RetryPolicy(max_attempts=5), breaker=breaker) as session:
+            # The call that opened the breaker reports what the backend said.
+            with pytest.raises(_Unavailable):
+                session.send("turn off lights")
+            with pytest.raises(CircuitOpenError):
+                session.send("turn off lights")
+
+    assert mock_assistant.assist.call_count == 2
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_quota_errors_do_not_open_the_breaker():
+    from ghome.assistant import QuotaExceededError
+    from ghome.retry import CircuitBreaker, RetryPolicy
+
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+    mock_assistant = MagicMock()
+    mock_assistant.assist.side_effect = _ResourceExhausted()
+
+    with patch("ghome.assistant.TextAssistant") as MockTextAssistant, \
+            patch("ghome.retry.time.sleep"):
+        MockTextAssistant.return_value.__enter__.return_value = mock_assistant
+
+        with AssistantSession(MagicMock(), retry_policy=RetryPolicy(max_attempts=3), breaker=breaker) as session:
+            for _ in range(3):
+                with pytest.raises(QuotaExceededError):
+                    session.send("turn off lights")
+
+    assert mock_assistant.assist.call_count == 9
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_send_to_profiles_sends_concurrently_with_each_profiles_credentials():
+    credentials = {"home": MagicMock(), "office": MagicMock()}
+    barrier = threading.Barrier(2, timeout=5)
+
+    def assistant_for(creds):
+        assistant = MagicMock()
+
+        def assist(text):
+            barrier.wait()  # Only returns once both profiles are sending at once
+            return (f"{text} via {'home' if creds is credentials['home'] else 'office'}", None, None)
+
+        assistant.assist.side_effect = assist
+        cm = MagicMock()
+        cm.__enter__.return_value = assistant
+        return cm
+
+    with patch("ghome.assistant.load_credentials", side_effect=lambda profile: credentials[profile]), \
+            patch("ghome.assistant.TextAssistant", side_effect=assistant_for):
+        results = send_to_profiles("broadcast", "Dinner is ready", ["home", "office", "cabin"])
+
+    assert [r.profile for r in results] == ["home", "office", "cabin"]
+    assert results[0].response == "broadcast Dinner is ready via home"
+    assert results[1].response == "broadcast Dinner is ready via office"
+    assert isinstance(results[2].error, KeyError)
+    assert results[0].elapsed > 0
+
+
+def test_send_to_profiles_validates_before_loading_credentials():
+    with patch("ghome.assistant.load_credentials") as mock_load:
+        with pytest.raises(BroadcastError):
+            send_to_profiles("broadcast", "", ["home"])
+
+    mock_load.assert_not_called()
@@ -1,10 +1,13 @@
 # tests/test_auth.py
 import json
-from unittest.mock import patch
+import stat
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
 
 import pytest
 
-from ghome.auth import load_credentials, CredentialsNotFoundError, init_client_secret, ClientSecretNotFoundError, run_oauth_flow
+from ghome.auth import load_credentials, CredentialsManager, CredentialsNotFoundError, init_client_secret, ClientSecretNotFoundError, run_oauth_flow, save_credentials
 
 
 def test_load_credentials_raises_when_file_missing(tmp_path):
@@ -21,6 +24,7 @@ def test_load_credentials_returns_credentials_object(tmp_path):
         "token_uri": "https://oauth2.googleapis.com/token",
         "client_id": "test_client_id",
         "client_secret": "test_client_secret",
+        "expiry": (datetime.utcnow() + timedelta(hours=1)).isoformat(),
     }
     creds_path.write_text(json.dumps(creds_data))
 
@@ -28,6 +32,7 @@ def test_load_credentials_returns_credentials_object(tmp_path):
         result = load_credentials()
         assert result is not None
         assert result.token == "test_token"
+        assert result.expiry is not None
 
 
 def test_init_client_secret_copies_file(tmp_path):
@@ -38,11 +43,10 @@ def test_init_client_secret_copies_file(tmp_path):
     dest_dir = tmp_path / "config"
     dest_file = dest_dir / "client_secret.json"
 
-    with patch("ghome.auth.get_config_dir", return_value=dest_dir):
-        with patch("ghome.auth.get_client_secret_path", return_value=dest_file):
-            init_client_secret(source)
-            assert dest_file.exists()
-            assert json.loads(dest_file.read_text()) == {"installed": {"client_id": "test"}}
+    with patch("ghome.auth.get_client_secret_path", return_value=dest_file):
+        init_client_secret(source)
+        assert dest_file.exists()
+        assert json.loads(dest_file.read_text()) == {"installed": {"client_id": "test"}}
 
 
 def test_init_client_secret_raises_when_source_missing(tmp_path):
@@ -54,3 +58,102 @@ def test_run_oauth_flow_raises_when_no_client_secret(tmp_path):
     with patch("ghome.auth.get_client_secret_path", return_value=tmp_path / "missing.json"):
         with pytest.raises(ClientSecretNotFoundError):
             run_oauth_flow()
+
+
+def _write_creds(path, expiry):
+    path.write_text(json.dumps({
+        "token": "old_token",
+        "refresh_token": "test_refresh",
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "client_id": "test_client_id",
+        "client_secret": "test_client_secret",
+        "expiry": expiry.isoformat() if expiry else None,
+    }))
+
+
+def _fake_refresh(credentials, request):
+    credentials.token = "new_token"
+    credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+
+def test_load_credentials_refreshes_and_saves_expired_token(tmp_path):
+    creds_path = tmp_path / "credentials.json"
+    _write_creds(creds_path, datetime.utcnow() - timedelta(minutes=1))
+
+    with patch("ghome.auth.get_credentials_path", return_value=creds_path), \
+            patch("ghome.auth.get_credentials_lock_path", return_value=tmp_path / "credentials.lock"), \
+            patch("google.oauth2.credentials.Credentials.refresh", autospec=True, side_effect=_fake_refresh) as mock_refresh:
+        first = load_credentials()
+        second = load_credentials()
+
+    assert first.token == "new_token"
+    assert second.token == "new_token"
+    mock_refresh.assert_called_once()
+    assert json.loads(creds_path.read_text())["token"] == "new_token"
+    assert stat.S_IMODE(creds_path.stat().st_mode) == 0o600
+
+
+def test_load_credentials_refreshes_when_expiry_unknown(tmp_path):
+    creds_path = tmp_path / "credentials.json"
+    _write_creds(creds_path, None)
+
+    with patch("ghome.auth.get_credentials_path", return_value=creds_path), \
+            patch("ghome.auth.get_credentials_lock_path", return_value=tmp_path / "credentials.lock"), \
+            patch("google.oauth2.credentials.Credentials.refresh", autospec=True, side_effect=_fake_refresh) as mock_refresh:
+        result = load_credentials()
+
+    mock_refresh.assert_called_once()
+    assert json.loads(creds_path.read_text())["expiry"] == result.expiry.isoformat()
+
+
+def test_save_credentials_leaves_no_temp_files(tmp_path):
+    creds_path = tmp_path / "credentials.json"
+    _write_creds(creds_path, datetime.utcnow() + timedelta(hours=1))
+
+    with patch("ghome.auth.get_credentials_path", return_value=creds_path):
+        save_credentials(load_credentials())
+
+    assert [p.name for p in tmp_path.iterdir()] == ["credentials.json"]
+
+
+def test_credentials_manager_refreshes_shared_credentials_before_expiry(tmp_path):
+    creds_path = tmp_path / "credentials.json"
+    # Still valid, but inside the manager's refresh margin.
+    _write_creds(creds_path, datetime.utcnow() + timedelta(minutes=5))
+
+    with patch("ghome.auth.get_credentials_path", return_value=creds_path), \
+         patch("ghome.auth.get_credentials_lock_path", return_value=tmp_path / "credentials.lock"), \
+         patch("google.oauth2.credentials.Credentials.refresh", _fake_refresh):
+        credentials = load_credentials()
+        assert credentials.token == "old_token"
+
+        with CredentialsManager(credentials) as manager:
+            deadline = time.monotonic() + 5
+            while manager.refreshes == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        assert credentials.token == "new_token"
+        assert manager.next_refresh_delay() > 2900
+        assert json.loads(creds_path.read_text())["token"] == "new_token"
+
+
+def test_credentials_manager_backs_off_after_failure(tmp_path):
+    credentials = MagicMock(refresh_token="test_refresh", expiry=None)
+    manager = CredentialsManager(credentials, min_backoff=0.05)
+
+    with patch("ghome.auth.refresh_credentials", side_effect=RuntimeError("offline")):
+        with manager:
+            time.sleep(0.12)
+
+    # Immediately, then after 0.05s, then 0.1s later.
+    assert 2 <= manager.failures <= 3
+    assert str(manager.last_error) == "offline"
+    assert manager.refreshes == 0
+
+
+def test_credentials_manager_idles_without_refresh_token():
+    manager = CredentialsManager(MagicMock(refresh_token=None))
+
+    assert manager.next_refresh_delay() is None
+    with manager:
+        pass
@@ -0,0 +1,68 @@
+from unittest.mock import patch
+
+from ghome.cache import ResponseCache, normalize_command
+
+
+def test_normalize_command_ignores_case_spacing_and_punctuation():
+    assert normalize_command("  What's the   Temperature? ") == "what's the temperature"
+
+
+def test_only_allow_listed_commands_are_cacheable():
+    cache = ResponseCache()
+    assert cache.is_cacheable("what's the temperature in the living room")
+    assert not cache.is_cacheable("turn off the lights")
+    assert not cache.is_cacheable("broadcast what is for dinner")
+
+
+def test_get_counts_hits_and_misses():
+    cache = ResponseCache()
+    assert cache.get("what time is it") is None
+
+    cache.put("What time is it?", "It's 5 PM")
+
+    assert cache.get("what time is it") == "It's 5 PM"
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_entries_expire_after_ttl():
+    cache = ResponseCache(ttl=10)
+    with patch("ghome.cache.time.time", return_value=1000.0):
+        cache.put("what time is it", "It's 5 PM")
+    with patch("ghome.cache.time.time", return_value=1011.0):
+        assert cache.get("what time is it") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put("what is a", "A")
+    cache.put("what is b", "B")
+    cache.get("what is a")
+    cache.put("what is c", "C")
+
+    assert cache.get("what is b") is None
+    assert cache.get("what is a") == "A"
+
+
+def test_file_backed_caches_share_entries(tmp_path):
+    path = tmp_path / "responses.json"
+    ResponseCache(path=path).put("what time is it", "It's 5 PM")
+
+    assert ResponseCache(path=path).get("what time is it") == "It's 5 PM"
+
+
+def test_shared_file_of_the_wrong_shape_is_ignored(tmp_path):
+    path = tmp_path / "responses.json"
+    path.write_text("[]")
+    assert ResponseCache(path=path).get("what time is it") is None
+
+    path.write_text('{"what time is it": "not an entry"}')
+    cache = ResponseCache(path=path)
+    assert cache.get("what time is it") is None
+    cache.put("what time is it", "It's 5 PM")
+    assert ResponseCache(path=path).get("what time is it") == "It's 5 PM"
+
+
+def test_custom_patterns_replace_defaults():
+    cache = ResponseCache(patterns=[r"^status\b"])
+    assert cache.is_cacheable("status of the garage")
+    assert not cache.is_cacheable("what time is it")
@@ -1,11 +1,17 @@
 # tests/test_cli.py
+import json
+import subprocess
+import sys
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 
+import pytest
+
 from click.testing import CliRunner
 
 from ghome.cli import main
 from ghome.auth import CredentialsNotFoundError
+from ghome.config import set_active_profile
 
 
 def test_main_shows_help():
@@ -71,7 +77,7 @@ def test_auth_logout_clears_credentials(tmp_path):
 def test_broadcast_sends_message():
     runner = CliRunner()
     with patch("ghome.cli.load_credentials") as mock_load:
-        with patch("ghome.cli.broadcast_message") as mock_broadcast:
+        with patch("ghome.assistant.broadcast_message") as mock_broadcast:
             mock_broadcast.return_value = "Broadcast sent"
             result = runner.invoke(main, ["broadcast", "Dinner is ready"])
             assert result.exit_code == 0
@@ -79,6 +85,42 @@ def test_broadcast_sends_message():
             assert "Broadcast sent" in result.output
 
 
+def test_broadcast_rejects_invalid_message_before_loading_credentials():
+    runner = CliRunner()
+    with patch("ghome.cli.load_credentials") as mock_load:
+        result = runner.invoke(main, ["broadcast", "a" * 201])
+
+    assert result.exit_code == 2
+    assert "exceeds maximum length" in result.output
+    mock_load.assert_not_called()
+
+
+def test_broadcast_refreshes_credentials_in_background():
+    runner = CliRunner()
+    with patch("ghome.cli.load_credentials") as mock_load, \
+            patch("ghome.cli.refresh_if_needed") as mock_refresh, \
+            patch("ghome.assistant.broadcast_message", return_value="Broadcast sent") as mock_broadcast:
+        result = runner.invoke(main, ["broadcast", "Dinner is ready"])
+
+    assert result.exit_code == 0
+    mock_load.assert_called_once_with(False)
+    ready = mock_broadcast.call_args.kwargs["credentials_ready"]
+    ready.result()
+    mock_refresh.assert_called_once_with(mock_load.return_value)
+
+
+def test_broadcast_reports_revoked_credentials_from_background_refresh():
+    runner = CliRunner()
+    with patch("ghome.cli.load_credentials"), \
+            patch("ghome.cli.refresh_if_needed", side_effect=CredentialsNotFoundError("revoked")), \
+            patch("ghome.cli.get_socket_path", return_value=Path("/nonexistent/daemon.sock")), \
+            patch("ghome.assistant.TextAssistant"):
+        result = runner.invoke(main, ["broadcast", "Dinner is ready"])
+
+    assert result.exit_code == 1
+    assert "ghome auth login" in result.output
+
+
 def test_broadcast_fails_without_auth():
     runner = CliRunner()
     with patch("ghome.cli.load_credentials") as mock_load:
@@ -88,23 +130,46 @@ def test_broadcast_fails_without_auth():
         assert "ghome auth login" in result.output.lower()
 
 
-def test_broadcast_interactive_mode():
+@patch("ghome.cli.CredentialsManager")
+def test_broadcast_interactive_mode(mock_manager):
     runner = CliRunner()
     with patch("ghome.cli.load_credentials"):
-        with patch("ghome.cli.broadcast_message") as mock_broadcast:
-            mock_broadcast.return_value = "Broadcast sent"
+        with patch("ghome.assistant.AssistantSession") as MockSession:
+            session = MockSession.return_value.__enter__.return_value
+            session.broadcast.return_value = "Broadcast sent"
             result = runner.invoke(
                 main,
                 ["broadcast", "--interactive"],
                 input="Hello\nWorld\nquit\n"
             )
-            assert mock_broadcast.call_count == 2
+            assert session.broadcast.call_count == 2
+            MockSession.assert_called_once()
+
+
+@patch("ghome.cli.CredentialsManager")
+def test_broadcast_interactive_mode_tags_responses_and_rejects_invalid_lines(mock_manager):
+    runner = CliRunner()
+    with patch("ghome.cli.load_credentials"):
+        with patch("ghome.assistant.AssistantSession") as MockSession:
+            session = MockSession.return_value.__enter__.return_value
+            session.broadcast.side_effect = lambda message: f"Sent {message}"
+            result = runner.invoke(
+                main,
+                ["broadcast", "--interactive"],
+                input="Hello\n" + "a" * 201 + "\nWorld\n",
+            )
+
+    assert result.exit_code == 0
+    assert "[1] Sent Hello" in result.output
+    assert "[2] Sent World" in result.output
+    assert "exceeds maximum length" in result.output
+    assert session.broadcast.call_count == 2
 
 
 def test_command_sends_command():
     runner = CliRunner()
     with patch("ghome.cli.load_credentials") as mock_load:
-        with patch("ghome.cli.send_command") as mock_cmd:
+        with patch("ghome.assistant.send_command") as mock_cmd:
             mock_cmd.return_value = "The volume is now 10"
             result = runner.invoke(main, ["command", "set kitchen display volume 10"])
             assert result.exit_code == 0
@@ -121,17 +186,20 @@ def test_command_fails_without_auth():
         assert "ghome auth login" in result.output.lower()
 
 
-def test_command_interactive_mode():
+@patch("ghome.cli.CredentialsManager")
+def test_command_interactive_mode(mock_manager):
     runner = CliRunner()
     with patch("ghome.cli.load_credentials"):
-        with patch("ghome.cli.send_command") as mock_cmd:
-            mock_cmd.return_value = "Done"
+        with patch("ghome.assistant.AssistantSession") as MockSession:
+            session = MockSession.return_value.__enter__.return_value
+            session.send.return_value = "Done"
             result = runner.invoke(
                 main,
                 ["command", "--interactive"],
                 input="set volume 5\nwhat time is it\nquit\n"
             )
-            assert mock_cmd.call_count == 2
+            assert session.send.call_count == 2
+            MockSession.assert_called_once()
 
 
 def test_command_requires_text_or_interactive():
@@ -140,3 +208,569 @@ def test_command_requires_text_or_interactive():
         result = runner.invoke(main, ["command"])
         assert result.exit_code == 2
         assert "Command text required" in result.output
+
+
+HEAVY_MODULES = (
+    "ghome.assistant",
+    "gassist_text",
+    "grpc",
+    "google.protobuf",
+    "google.oauth2",
+    "google_auth_oauthlib",
+)
+
+
+def _modules_imported_by(args, home):
+    """Run the CLI in a fresh interpreter and return the modules it imported."""
+    script = (
+        "import json, sys\n"
+        "from ghome.cli import main\n"
+        "try:\n"
+        "    main(sys.argv[1:])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script, *args],
+        capture_output=True,
+        text=True,
+        env={"HOME": str(home), "PATH": ""},
+        check=True,
+    )
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+@pytest.mark.parametrize(
+    "args",
+    [["--help"], ["auth", "status"], ["auth", "logout"], ["schedule", "add", "Standup", "--cron", "55 9 * * 1-5"]],
+)
+def test_light_commands_do_not_import_heavy_modules(args, tmp_path):
+    imported = _modules_imported_by(args, tmp_path)
+    assert imported.isdisjoint(HEAVY_MODULES)
+
+
+def test_broadcast_forwards_to_running_daemon(tmp_path):
+    socket_path = tmp_path / "daemon.sock"
+    socket_path.touch()
+
+    runner = CliRunner()
+    with patch("ghome.cli.get_socket_path", return_value=socket_path), \
+            patch("ghome.cli.send_request", return_value="Broadcast sent") as mock_send, \
+            patch("ghome.cli.load_credentials") as mock_load:
+        result = runner.invoke(main, ["broadcast", "Dinner is ready"])
+
+    assert result.exit_code == 0
+    assert "Broadcast sent" in result.output
+    mock_send.assert_called_once_with("broadcast", "Dinner is ready")
+    mock_load.assert_not_called()
+
+
+def test_cached_command_fills_cache_through_daemon(tmp_path):
+    socket_path = tmp_path / "daemon.sock"
+    socket_path.touch()
+
+    runner = CliRunner()
+    with patch.dict("os.environ", {"HOME": str(tmp_path)}), \
+            patch("ghome.cli.get_socket_path", return_value=socket_path), \
+            patch("ghome.cli.send_request", return_value="It's 5 PM") as mock_send:
+        first = runner.invoke(main, ["command", "--cache", "what time is it"])
+        second = runner.invoke(main, ["command", "--cache", "what time is it"])
+
+    assert first.output == second.output == "It's 5 PM\n"
+    mock_send.assert_called_once_with("command", "what time is it")
+
+
+def test_command_rejects_non_positive_cache_ttl():
+    runner = CliRunner()
+    result = runner.invoke(main, ["command", "--cache", "--cache-ttl", "-5", "what time is it"])
+
+    assert result.exit_code == 2
+    assert "--cache-ttl" in result.output
+
+
+def test_command_no_daemon_sends_directly(tmp_path):
+    socket_path = tmp_path / "daemon.sock"
+    socket_path.touch()
+
+    runner = CliRunner()
+    with patch("ghome.cli.get_socket_path", return_value=socket_path), \
+            patch("ghome.cli.send_request") as mock_send, \
+            patch("ghome.cli.load_credentials"), \
+            patch("ghome.assistant.send_command", return_value="It's 5 PM") as mock_command:
+        result = runner.invoke(main, ["command", "--no-daemon", "what time is it"])
+
+    assert result.exit_code == 0
+    assert "It's 5 PM" in result.output
+    mock_send.assert_not_called()
+    mock_command.assert_called_once()
+
+
+def test_broadcast_falls_back_when_daemon_not_running(tmp_path):
+    from ghome.daemon import DaemonUnavailable
+
+    socket_path = tmp_path / "daemon.sock"
+    socket_path.touch()
+
+    runner = CliRunner()
+    with patch("ghome.cli.get_socket_path", return_value=socket_path), \
+            patch("ghome.cli.send_request", side_effect=DaemonUnavailable("gone")), \
+            patch("ghome.cli.load_credentials"), \
+            patch("ghome.assistant.broadcast_message", return_value="Broadcast sent") as mock_broadcast:
+        result = runner.invoke(main, ["broadcast", "Dinner is ready"])
+
+    assert result.exit_code == 0
+    mock_broadcast.assert_called_once()
+
+
+def test_daemon_client_path_does_not_import_heavy_modules(tmp_path):
+    import threading
+    from ghome.daemon import DaemonServer
+
+    socket_path = tmp_path / ".config" / "ghome" / "daemon.sock"
+    socket_path.parent.mkdir(parents=True)
+    session = MagicMock()
+    session.broadcast.return_value = "Broadcast sent"
+    server = DaemonServer(socket_path, session)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        imported = _modules_imported_by(["broadcast", "Dinner is ready"], tmp_path)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    session.broadcast.assert_called_once_with("Dinner is ready")
+    assert imported.isdisjoint(HEAVY_MODULES)
+
+
+def test_command_batch_sends_each_line_over_one_session():
+    runner = CliRunner()
+    with patch("ghome.cli.load_credentials"):
+        with patch("ghome.assistant.AssistantSession") as MockSession:
+            session = MockSession.return_value.__enter__.return_value
+            session.send.side_effect = lambda text: f"ok: {text.strip()}"
+            result = runner.invoke(
+                main,
+                ["command", "--batch", "-"],
+                input="lights off\n\nvolume 5\n",
+            )
+
+    assert result.exit_code == 0
+    assert result.output == "ok: lights off\nok: volume 5\n"
+    MockSession.assert_called_once()
+
+
+def test_command_batch_continues_after_failure_by_default():
+    runner = CliRunner()
+    with patch("ghome.cli.load_credentials"):
+        with patch("ghome.assistant.AssistantSession") as MockSession:
+            session = MockSession.return_value.__enter__.return_value
+            session.send.side_effect = [RuntimeError("boom"), "Done"]
+            result = runner.invoke(main, ["command", "--batch", "-"], input="a\nb\n")
+
+    assert result.exit_code == 2
+    assert "line 1" in result.output
+    assert session.send.call_count == 2
+
+
+def test_broadcast_batch_aborts_on_first_failure():
+    from ghome.assistant import BroadcastError
+
+    runner = CliRunner()
+    with patch("ghome.cli.load_credentials"):
+        with patch("ghome.assistant.AssistantSession") as MockSession:
+            session = MockSession.return_value.__enter__.return_value
+            session.broadcast.side_effect = [BroadcastError("too long"), "Broadcast sent"]
+            result = runner.invoke(
+                main,
+                ["broadcast", "--batch", "-", "--on-error", "abort"],
+                input="a\nb\n",
+            )
+
+    assert result.exit_code == 2
+    assert "line 1: too long" in result.output
+    assert session.broadcast.call_count == 1
+
+
+def test_command_batch_parallel_uses_send_commands():
+    from ghome.assistant import CommandResult
+
+    runner = CliRunner()
+    with patch("ghome.cli.load_credentials"):
+        with patch("ghome.assistant.send_commands") as mock_send:
+            mock_send.return_value = (r for r in [
+                CommandResult(0, "a", response="Done a"),
+                CommandResult(1, "b", error=RuntimeError("boom")),
+            ])
+            result = runner.invoke(
+                main,
+                ["command", "--batch", "-", "--parallel", "4"],
+                input="a\n\nb\n",
+            )
+
+    assert result.exit_code == 2
+    assert "Done a" in result.output
+    assert "line 3" in result.output
+    assert mock_send.call_args.kwargs["max_workers"] == 4
+
+
+def test_command_cache_hit_skips_assistant(tmp_path):
+    from ghome.cache import ResponseCache
+
+    cache_path = tmp_path / "responses.json"
+    ResponseCache(path=cache_path).put("what's the temperature", "It's 21 degrees")
+
+    runner = CliRunner()
+    with patch("ghome.cli.get_cache_path", return_value=cache_path), \
+            patch("ghome.cli.load_credentials") as mock_load:
+        result = runner.invoke(main, ["command", "--cache", "What's the temperature?"])
+
+    assert result.exit_code == 0
+    assert "It's 21 degrees" in result.output
+    mock_load.assert_not_called()
+
+
+def test_broadcast_coalesce_window_suppresses_duplicates(tmp_path):
+    state_path = tmp_path / "broadcasts.json"
+
+    runner = CliRunner()
+    with patch("ghome.cli.get_coalesce_state_path", return_value=state_path), \
+            patch("ghome.cli.get_socket_path", return_value=tmp_path / "missing.sock"), \
+            patch("ghome.cli.load_credentials"), \
+            patch("ghome.assistant.broadcast_message", return_value="Broadcast sent") as mock_broadcast:
+        for _ in range(3):
+            result = runner.invoke(main, ["broadcast", "--coalesce-window", "60", "Garage door open"])
+            assert result.exit_code == 0
+
+    mock_broadcast.assert_called_once()
+    assert "suppressed" in result.output
+
+
+def test_broadcast_batch_merge_sends_one_broadcast(tmp_path):
+    runner = CliRunner()
+    with patch("ghome.cli.get_coalesce_state_path", return_value=tmp_path / "broadcasts.json"), \
+            patch("ghome.cli.load_credentials"), \
+            patch("ghome.assistant.AssistantSession") as MockSession:
+        session = MockSession.return_value.__enter__.return_value
+        session.broadcast.return_value = "Broadcast sent"
+        result = runner.invoke(
+            main,
+            ["broadcast", "--batch", "-", "--coalesce-window", "60", "--merge"],
+            input="Garage door open\nDryer is done\n",
+        )
+
+    assert result.exit_code == 0
+    session.broadcast.assert_called_once_with("Garage door open. Dryer is done")
+
+
+def test_broadcast_timings_are_printed_and_appended_to_file(tmp_path):
+    from datetime import datetime, timedelta
+    from ghome import timing
+
+    creds_path = tmp_path / "credentials.json"
+    creds_path.write_text(json.dumps({
+        "token": "t",
+        "refresh_token": "r",
+        "expiry": (datetime.utcnow() + timedelta(hours=1)).isoformat(),
+    }))
+    timings_path = tmp_path / "timings.jsonl"
+
+    runner = CliRunner()
+    try:
+        with patch("ghome.auth.get_credentials_path", return_value=creds_path), \
+                patch("ghome.cli.get_socket_path", return_value=tmp_path / "missing.sock"), \
+                patch("ghome.assistant.broadcast_message", return_value="Broadcast sent"):
+            result = runner.invoke(
+                main,
+                ["broadcast", "--timings", "Dinner is ready"],
+                env={"GHOME_TIMINGS_FILE": str(timings_path)},
+            )
+    finally:
+        timing.reset()
+
+    assert result.exit_code == 0
+    assert "load_credentials" in result.output
+    assert json.loads(timings_path.read_text().splitlines()[0])["stage"] == "load_credentials"
+
+
+def test_bench_local_runs_against_standin():
+    runner = CliRunner()
+    result = runner.invoke(main, ["bench", "--local", "--sessions", "2", "--commands", "3", "--latency", "0"])
+
+    assert result.exit_code == 0, result.output
+    assert "6/6 succeeded" in result.output
+    assert "p99" in result.output
+
+
+def test_bench_rejects_local_with_endpoint():
+    runner = CliRunner()
+    result = runner.invoke(main, ["bench", "--local", "--endpoint", "localhost:1"])
+
+    assert result.exit_code == 2
+    assert "mutually exclusive" in result.output
+
+
+@patch("ghome.gateway.run_gateway")
+@patch("ghome.cli.load_credentials")
+def test_serve_runs_gateway_with_options(mock_load, mock_run):
+    runner = CliRunner()
+    result = runner.invoke(main, ["serve", "--port", "9000", "--pool-size", "2", "--max-queue", "3"])
+
+    assert result.exit_code == 0, result.output
+    kwargs = mock_run.call_args.kwargs
+    assert (kwargs["port"], kwargs["pool_size"], kwargs["max_queue"]) == (9000, 2, 3)
+    assert mock_run.call_args.args == (mock_load.return_value,)
+
+
+def test_broadcast_queue_writes_to_outbox_without_sending(tmp_path):
+    from ghome.outbox import Outbox
+
+    outbox_path = tmp_path / "outbox.db"
+    runner = CliRunner()
+    with patch("ghome.cli.get_outbox_path", return_value=outbox_path), \
+            patch("ghome.cli.load_credentials") as mock_load, \
+            patch("ghome.assistant.broadcast_message") as mock_broadcast:
+        result = runner.invoke(main, ["broadcast", "--queue", "Dinner is ready"])
+
+    assert result.exit_code == 0
+    assert "Queued broadcast #1" in result.output
+    mock_load.assert_not_called()
+    mock_broadcast.assert_not_called()
+    assert [item.text for item in Outbox(outbox_path).items()] == ["Dinner is ready"]
+
+
+def test_broadcast_queue_rejects_invalid_message(tmp_path):
+    runner = CliRunner()
+    with patch("ghome.cli.get_outbox_path", return_value=tmp_path / "outbox.db"):
+        result = runner.invoke(main, ["broadcast", "--async", "x" * 201])
+
+    assert result.exit_code == 2
+    assert not (tmp_path / "outbox.db").exists()
+
+
+def test_outbox_drain_and_status(tmp_path):
+    from ghome.outbox import Outbox
+
+    outbox_path = tmp_path / "outbox.db"
+    Outbox(outbox_path).enqueue("Dinner is ready")
+
+    runner = CliRunner()
+    with patch("ghome.cli.get_outbox_path", return_value=outbox_path), \
+            patch("ghome.cli.load_credentials"), \
+            patch("ghome.assistant.AssistantSession") as MockSession:
+        MockSession.return_value.__enter__.return_value.broadcast.return_value = "Broadcast sent"
+        drained = runner.invoke(main, ["outbox", "drain"])
+        status = runner.invoke(main, ["outbox", "status"])
+
+    assert drained.exit_code == 0
+    assert "Sent 1, will retry 0, failed 0." in drained.output
+    assert "0 pending, 0 sending, 1 sent, 0 failed" in status.output
+    assert "#1 sent (1 attempts): Dinner is ready" in status.output
+
+
+def test_profile_option_selects_profile_credentials(tmp_path):
+    profile_dir = tmp_path / ".config/ghome/profiles/office"
+    profile_dir.mkdir(parents=True)
+    (profile_dir / "client_secret.json").write_text("{}")
+    (profile_dir / "credentials.json").write_text("{}")
+
+    runner = CliRunner()
+    with patch.dict("os.environ", {"HOME": str(tmp_path)}):
+        result = runner.invoke(main, ["auth", "status", "--profile", "office"])
+        default = runner.invoke(main, ["auth", "status"])
+
+    assert "Profile: office" in result.output
+    assert str(profile_dir / "credentials.json") in result.output
+    assert "not configured" in default.output.lower()
+
+
+def test_profile_option_rejects_invalid_name():
+    runner = CliRunner()
+    result = runner.invoke(main, ["broadcast", "hi", "--profile", "../other"])
+
+    assert result.exit_code == 2
+    assert "Invalid profile name" in result.output
+
+
+def test_broadcast_all_profiles_reports_each_profile():
+    from ghome.assistant import ProfileResult
+
+    results = [
+        ProfileResult("default", response="Broadcast sent", elapsed=0.4),
+        ProfileResult("office", error=CredentialsNotFoundError("missing"), elapsed=0.01),
+    ]
+    runner = CliRunner()
+    with patch("ghome.cli.list_profiles", return_value=["default", "office"]), \
+            patch("ghome.assistant.send_to_profiles", return_value=results) as mock_send:
+        result = runner.invoke(main, ["broadcast", "Dinner is ready", "--all-profiles"])
+
+    mock_send.assert_called_once_with("broadcast", "Dinner is ready", ["default", "office"], None)
+    assert result.exit_code == 2
+    assert "[default] Broadcast sent (0.40s)" in result.output
+    assert "[office] Error: Not authenticated." in result.output
+
+
+def test_schedule_add_list_and_remove(tmp_path):
+    runner = CliRunner()
+    with patch.dict("os.environ", {"HOME": str(tmp_path)}):
+        added = runner.invoke(main, ["schedule", "add", "Standup in 5 minutes", "--cron", "55 9 * * 1-5"])
+        listed = runner.invoke(main, ["schedule", "list"])
+        removed = runner.invoke(main, ["schedule", "remove", "1"])
+        empty = runner.invoke(main, ["schedule", "list"])
+
+    assert added.exit_code == 0
+    assert "Scheduled #1" in added.output
+    assert "#1 broadcast cron 55 9 * * 1-5" in listed.output
+    assert "Standup in 5 minutes" in listed.output
+    assert removed.exit_code == 0
+    assert "No jobs scheduled" in empty.output
+
+
+@pytest.mark.parametrize(
+    "args, error",
+    [
+        (["Standup"], "exactly one of --at or --cron"),
+        (["Standup", "--cron", "61 * * * *"], "not between 0 and 59"),
+        (["", "--at", "09:55"], "cannot be empty"),
+    ],
+)
+def test_schedule_add_rejects_invalid_jobs(args, error, tmp_path):
+    runner = CliRunner()
+    with patch.dict("os.environ", {"HOME": str(tmp_path)}):
+        result = runner.invoke(main, ["schedule", "add", *args])
+
+    assert result.exit_code == 2
+    assert error in result.output
+
+
+def test_run_reports_steps_and_critical_path(tmp_path):
+    routine = tmp_path / "movie.toml"
+    routine.write_text(
+        '[steps.lights]\ncommand = "dim the lights"\n'
+        '[steps.announce]\nbroadcast = "Movie night"\nafter = "lights"\n'
+    )
+
+    runner = CliRunner()
+    with patch("ghome.cli.load_credentials"), \
+            patch("ghome.assistant.AssistantPool"), \
+            patch("ghome.cli.pool_step_runner", return_value=lambda step: f"Done {step.name}"):
+        result = runner.invoke(main, ["run", str(routine)])
+
+    assert result.exit_code == 0
+    assert "Done lights" in result.output
+    assert "Done announce" in result.output
+    assert "Critical path: lights -> announce" in result.output
+
+
+def test_run_rejects_invalid_routine_before_loading_credentials(tmp_path):
+    routine = tmp_path / "broken.toml"
+    routine.write_text('[steps.a]\ncommand = "x"\nafter = "a"\n')
+
+    runner = CliRunner()
+    with patch("ghome.cli.load_credentials") as mock_load:
+        result = runner.invoke(main, ["run", str(routine)])
+
+    assert result.exit_code == 2
+    assert "cycle" in result.output
+    mock_load.assert_not_called()
+
+
+def _ndjson_records(output):
+    return [json.loads(line) for line in output.splitlines() if line.startswith("{")]
+
+
+def test_broadcast_ndjson_prints_reply_details(tmp_path):
+    from ghome.assistant import Reply
+
+    runner = CliRunner()
+    with patch("ghome.cli.get_socket_path", return_value=tmp_path / "missing.sock"), \
+            patch("ghome.cli.load_credentials"), \
+            patch("ghome.cli.refresh_if_needed"), \
+            patch("ghome.assistant.AssistantSession") as MockSession:
+        session = MockSession.return_value.__enter__.return_value
+        session.request.return_value = Reply("Broadcast sent", b"<p>sent</p>", b"", attempts=2)
+        result = runner.invoke(main, ["broadcast", "Dinner is ready", "--output", "ndjson"])
+
+    assert result.exit_code == 0
+    [record] = _ndjson_records(result.output)
+    assert record["input"] == "Dinner is ready"
+    assert record["ok"] is True
+    assert record["response"] == "Broadcast sent"
+    assert record["attempts"] == 2
+    assert record["html"] == "<p>sent</p>"
+    assert record["source"] == "assistant"
+
+
+def test_broadcast_ndjson_reports_validation_errors_as_records():
+    runner = CliRunner()
+    with patch("ghome.cli.load_credentials") as mock_load:
+        result = runner.invoke(main, ["broadcast", "a" * 201, "--output", "ndjson"])
+
+    assert result.exit_code == 2
+    [record] = _ndjson_records(result.output)
+    assert record["ok"] is False
+    assert record["error"] == "validation"
+    assert record["error_type"] == "BroadcastError"
+    mock_load.assert_not_called()
+
+
+def test_command_batch_ndjson_streams_one_record_per_line(tmp_path):
+    from ghome.assistant import Reply
+
+    batch = tmp_path / "commands.txt"
+    batch.write_text("set volume 5\n\nwhat time is it\n")
+
+    runner = CliRunner()
+    with patch("ghome.cli.load_credentials"), \
+            patch("ghome.assistant.AssistantSession") as MockSession:
+        session = MockSession.return_value.__enter__.return_value
+        session.request.side_effect = [Reply("Volume set", attempts=1), RuntimeError("backend down")]
+        session.retry_stats.last_attempts = 3
+        result = runner.invoke(main, ["command", "--batch", str(batch), "--output", "ndjson"])
+
+    assert result.exit_code == 2
+    first, second = _ndjson_records(result.output)
+    assert (first["line"], first["input"], first["response"]) == (1, "set volume 5", "Volume set")
+    assert (second["line"], second["error"], second["error_type"]) == (3, "backend", "RuntimeError")
+    assert second["attempts"] == 3
+
+
+def test_ndjson_output_rejects_interactive_mode():
+    runner = CliRunner()
+    result = runner.invoke(main, ["command", "--interactive", "--output", "ndjson"])
+
+    assert result.exit_code == 2
+    assert "--output ndjson" in result.output
+
+
+def test_cprofile_writes_pstats_file(tmp_path):
+    import pstats
+
+    stats_path = tmp_path / "ghome.pstats"
+    runner = CliRunner()
+    with patch.dict("os.environ", {"HOME": str(tmp_path)}):
+        result = runner.invoke(main, ["--cprofile", str(stats_path), "auth", "status"])
+
+    assert result.exit_code == 0
+    assert "Profile written to" in result.output
+    assert pstats.Stats(str(stats_path)).total_calls > 0
+
+
+def test_debug_startup_reports_imports_and_first_request():
+    from ghome.diagnostics import FirstRequest
+
+    first_request = FirstRequest(0.5, True, "It's 9:41", [("channel_setup", 0.1), ("assist", 0.2)])
+    runner = CliRunner()
+    with patch("ghome.diagnostics.measure_interpreter", return_value=0.02), \
+            patch("ghome.diagnostics.measure_import", side_effect=lambda module, repeat: None if module == "grpc" else 0.1), \
+            patch("ghome.diagnostics.measure_first_request", return_value=first_request) as mock_request:
+        result = runner.invoke(main, ["debug", "startup", "--profile", "office"])
+    set_active_profile(None)
+
+    assert result.exit_code == 0
+    assert "gassist_text" in result.output
+    assert "grpc" in result.output and "not installed" in result.output
+    assert "Time to first request ('what time is it'): 500.0 ms" in result.output
+    assert "assist" in result.output
+    mock_request.assert_called_once_with("what time is it", {"GHOME_PROFILE": "office"})
@@ -0,0 +1,97 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from ghome.coalesce import BroadcastCoalescer, BroadcastMerger, merge_stream
+
+
+def test_identical_message_within_window_is_suppressed():
+    coalescer = BroadcastCoalescer(window=10)
+
+    with coalescer.claim("Garage door open") as first:
+        pass
+    with coalescer.claim("garage  door open") as second:
+        pass
+    with coalescer.claim("Dryer is done") as other:
+        pass
+
+    assert first is True
+    assert second is False
+    assert other is True
+
+
+def test_message_can_be_sent_again_after_window():
+    coalescer = BroadcastCoalescer(window=10)
+
+    with patch("ghome.coalesce.time.time", return_value=1000.0):
+        with coalescer.claim("Garage door open"):
+            pass
+    with patch("ghome.coalesce.time.time", return_value=1010.0):
+        with coalescer.claim("Garage door open") as fresh:
+            assert fresh
+
+
+def test_failed_send_releases_claim():
+    coalescer = BroadcastCoalescer(window=10)
+
+    with pytest.raises(RuntimeError):
+        with coalescer.claim("Garage door open"):
+            raise RuntimeError("network down")
+
+    with coalescer.claim("Garage door open") as fresh:
+        assert fresh
+
+
+def test_state_file_is_shared_between_coalescers(tmp_path):
+    state_path = tmp_path / "broadcasts.json"
+
+    with BroadcastCoalescer(10, state_path).claim("Garage door open"):
+        pass
+    with BroadcastCoalescer(10, state_path).claim("Garage door open") as fresh:
+        assert not fresh
+
+
+def test_state_file_of_the_wrong_shape_is_ignored(tmp_path):
+    state_path = tmp_path / "broadcasts.json"
+    state_path.write_text("[]")
+
+    with BroadcastCoalescer(10, state_path).claim("Garage door open") as fresh:
+        assert fresh
+
+
+def test_merger_combines_messages_within_window():
+    merger = BroadcastMerger(window=5, max_length=200)
+
+    assert merger.add("Garage door open", 1) == []
+    assert merger.add("Dryer is done!", 2) == []
+    assert merger.add("garage door open", 3) == []
+
+    assert merger.flush() == [(1, "Garage door open. Dryer is done!")]
+
+
+def test_merger_starts_new_message_at_max_length():
+    merger = BroadcastMerger(window=5, max_length=20)
+
+    merger.add("Garage door open", 1)
+    ready = merger.add("Dryer is done", 2)
+
+    assert ready == [(1, "Garage door open")]
+    assert merger.flush() == [(2, "Dryer is done")]
+
+
+def test_merge_stream_flushes_when_the_window_closes():
+    more_input = threading.Event()
+
+    def alerts():
+        yield 1, "Garage door open"
+        more_input.wait()  # Input stays open with nothing more to read
+
+    merged = merge_stream(alerts(), BroadcastMerger(window=0.05, max_length=200))
+    started = time.monotonic()
+
+    assert next(merged) == (1, "Garage door open")
+    assert time.monotonic() - started < 2
+    more_input.set()
+    assert list(merged) == []
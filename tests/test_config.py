@@ -5,7 +5,15 @@ from unittest.mock import patch
 
 import pytest
 
-from ghome.config import get_config_dir, get_client_secret_path, get_credentials_path
+from ghome.config import (
+    InvalidProfileError,
+    get_active_profile,
+    get_config_dir,
+    get_client_secret_path,
+    get_credentials_path,
+    list_profiles,
+    set_active_profile,
+)
 
 
 def test_get_config_dir_returns_path():
@@ -24,3 +32,38 @@ def test_get_credentials_path():
     with patch.dict(os.environ, {"HOME": "/home/testuser"}):
         result = get_credentials_path()
         assert result == Path("/home/testuser/.config/ghome/credentials.json")
+
+
+@pytest.fixture
+def home(tmp_path):
+    with patch.dict(os.environ, {"HOME": str(tmp_path)}):
+        os.environ.pop("GHOME_PROFILE", None)
+        yield tmp_path
+    set_active_profile(None)
+
+
+def test_named_profiles_live_under_profiles_dir(home):
+    assert get_credentials_path("office") == home / ".config/ghome/profiles/office/credentials.json"
+    assert get_credentials_path("default") == home / ".config/ghome/credentials.json"
+
+
+def test_active_profile_comes_from_setting_then_environment(home):
+    with patch.dict(os.environ, {"GHOME_PROFILE": "cabin"}):
+        assert get_active_profile() == "cabin"
+        set_active_profile("office")
+        assert get_credentials_path() == home / ".config/ghome/profiles/office/credentials.json"
+
+
+def test_invalid_profile_names_are_rejected(home):
+    with pytest.raises(InvalidProfileError):
+        get_credentials_path("../elsewhere")
+
+
+def test_list_profiles_returns_configured_accounts(home):
+    config_dir = home / ".config/ghome"
+    for profile_dir in (config_dir, config_dir / "profiles/office", config_dir / "profiles/cabin"):
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        (profile_dir / "credentials.json").write_text("{}")
+    (config_dir / "profiles/empty").mkdir()
+
+    assert list_profiles() == ["default", "cabin", "office"]
@@ -0,0 +1,144 @@
+import os
+import signal
+import socket
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ghome.assistant import BroadcastError
+from ghome.config import get_scheduler_lock_path
+from ghome.daemon import DaemonError, DaemonServer, DaemonUnavailable, run_daemon, send_request
+from ghome.storage import try_file_lock
+
+
+@pytest.fixture
+def running_daemon(tmp_path):
+    socket_path = tmp_path / "d.sock"
+    session = MagicMock()
+    server = DaemonServer(socket_path, session)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path, session
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_send_request_returns_response(running_daemon):
+    socket_path, session = running_daemon
+    session.broadcast.return_value = "Broadcast sent"
+
+    result = send_request("broadcast", "Dinner is ready", socket_path)
+
+    assert result == "Broadcast sent"
+    session.broadcast.assert_called_once_with("Dinner is ready")
+
+
+def test_send_request_reports_validation_errors(running_daemon):
+    socket_path, session = running_daemon
+    session.broadcast.side_effect = BroadcastError("Message cannot be empty")
+
+    with pytest.raises(DaemonError, match="cannot be empty") as excinfo:
+        send_request("broadcast", "", socket_path)
+
+    assert excinfo.value.kind == "validation"
+
+
+def test_send_request_reports_backend_errors(running_daemon):
+    socket_path, session = running_daemon
+    session.send.side_effect = RuntimeError("boom")
+
+    with pytest.raises(DaemonError) as excinfo:
+        send_request("command", "turn off lights", socket_path)
+
+    assert excinfo.value.kind == "backend"
+
+
+def test_send_request_raises_when_no_daemon(tmp_path):
+    with pytest.raises(DaemonUnavailable):
+        send_request("broadcast", "hello", tmp_path / "missing.sock")
+
+
+
+def _serve_once(socket_path, reply: bytes | None):
+    """Accept one connection, answer it with reply (or nothing), and hang up."""
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(socket_path))
+    listener.listen(1)
+
+    def serve():
+        conn, _ = listener.accept()
+        with conn:
+            conn.recv(4096)
+            if reply is not None:
+                conn.sendall(reply)
+        listener.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_send_request_reports_daemon_hanging_up(tmp_path):
+    thread = _serve_once(tmp_path / "d.sock", None)
+
+    with pytest.raises(DaemonError) as excinfo:
+        send_request("broadcast", "hello", tmp_path / "d.sock")
+
+    assert excinfo.value.kind == "backend"
+    thread.join()
+
+
+def test_send_request_reports_malformed_replies(tmp_path):
+    thread = _serve_once(tmp_path / "d.sock", b"not json\n")
+
+    with pytest.raises(DaemonError, match="Malformed") as excinfo:
+        send_request("broadcast", "hello", tmp_path / "d.sock")
+
+    assert excinfo.value.kind == "backend"
+    thread.join()
+
+
+def test_send_request_treats_unusable_socket_path_as_no_daemon(tmp_path):
+    with pytest.raises(DaemonUnavailable):
+        send_request("broadcast", "hello", tmp_path / ("x" * 200) / "d.sock")
+
+def test_server_close_removes_socket(tmp_path):
+    socket_path = tmp_path / "d.sock"
+    server = DaemonServer(socket_path, MagicMock())
+    assert socket_path.exists()
+
+    server.server_close()
+
+    assert not socket_path.exists()
+
+
+def test_daemon_runs_without_scheduler_when_schedule_is_locked(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv("GHOME_PROFILE", raising=False)
+    socket_path = tmp_path / "d.sock"
+    lock_fd = try_file_lock(get_scheduler_lock_path())  # As `ghome schedule run` does
+    handlers = {}
+    notes = []
+
+    def terminate_once_listening():
+        while not socket_path.exists() or signal.SIGTERM not in handlers:
+            time.sleep(0.01)
+        handlers[signal.SIGTERM](signal.SIGTERM, None)
+
+    threading.Thread(target=terminate_once_listening, daemon=True).start()
+    try:
+        with patch("ghome.daemon.signal.signal", side_effect=handlers.__setitem__):
+            run_daemon(
+                MagicMock(refresh_token=None),
+                socket_path,
+                outbox_path=tmp_path / "outbox.db",
+                notify=notes.append,
+            )
+    finally:
+        os.close(lock_fd)
+
+    assert len(notes) == 1
+    assert "running without the scheduler" in notes[0]
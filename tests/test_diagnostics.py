@@ -0,0 +1,72 @@
+# tests/test_diagnostics.py
+import json
+import threading
+from unittest.mock import MagicMock
+
+from ghome.daemon import DaemonServer
+from ghome.diagnostics import measure_first_request, measure_import
+from ghome.standin import StandinAssistant, start_server
+
+
+def test_measure_import_times_a_fresh_import():
+    seconds = measure_import("json", repeat=1)
+
+    assert seconds is not None
+    assert 0 < seconds < 5
+
+
+def test_measure_import_reports_missing_modules():
+    assert measure_import("ghome_no_such_module", repeat=1) is None
+
+
+def test_measure_first_request_breaks_down_stages(tmp_path):
+    config_dir = tmp_path / ".config" / "ghome"
+    config_dir.mkdir(parents=True)
+    (config_dir / "credentials.json").write_text(json.dumps({"token": "standin"}))
+    server, port = start_server(StandinAssistant(latency=0.0))
+
+    try:
+        result = measure_first_request(
+            "what time is it",
+            {
+                "HOME": str(tmp_path),
+                "GHOME_ASSISTANT_ENDPOINT": f"localhost:{port}",
+                "GHOME_ASSISTANT_INSECURE": "1",
+            },
+        )
+    finally:
+        server.stop(None)
+
+    assert result.ok, result.output
+    assert result.output == "Stand-in received: what time is it"
+    stages = [name for name, _ in result.stages]
+    assert "assist" in stages
+    assert result.total >= sum(seconds for _, seconds in result.stages)
+
+
+def test_measure_first_request_bypasses_a_running_daemon(tmp_path):
+    config_dir = tmp_path / ".config" / "ghome"
+    config_dir.mkdir(parents=True)
+    (config_dir / "credentials.json").write_text(json.dumps({"token": "standin"}))
+    session = MagicMock()
+    daemon = DaemonServer(config_dir / "daemon.sock", session)
+    threading.Thread(target=daemon.serve_forever, daemon=True).start()
+    server, port = start_server(StandinAssistant(latency=0.0))
+
+    try:
+        result = measure_first_request(
+            "what time is it",
+            {
+                "HOME": str(tmp_path),
+                "GHOME_ASSISTANT_ENDPOINT": f"localhost:{port}",
+                "GHOME_ASSISTANT_INSECURE": "1",
+            },
+        )
+    finally:
+        server.stop(None)
+        daemon.shutdown()
+        daemon.server_close()
+
+    assert result.ok, result.output
+    assert result.output == "Stand-in received: what time is it"
+    session.send.assert_not_called()
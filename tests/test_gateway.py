@@ -0,0 +1,138 @@
+import http.client
+import json
+import threading
+
+import google.oauth2.credentials
+import pytest
+
+from ghome.assistant import AssistantPool
+from ghome.gateway import GatewayServer
+from ghome.standin import StandinAssistant, start_server
+
+
+def _serve(pool, max_queue=16):
+    server = GatewayServer(("127.0.0.1", 0), pool, max_queue)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
+
+def _stop(server, thread):
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _standin_pool(port, **options):
+    credentials = google.oauth2.credentials.Credentials(token="standin")
+    return AssistantPool(credentials, endpoint=f"localhost:{port}", insecure=True, **options)
+
+
+@pytest.fixture
+def standin():
+    servicer = StandinAssistant(latency=0)
+    server, port = start_server(servicer)
+    yield servicer, port
+    server.stop(None)
+
+
+@pytest.fixture
+def gateway(standin):
+    _, port = standin
+    server, thread = _serve(_standin_pool(port, min_size=2, max_size=2))
+    yield server
+    _stop(server, thread)
+
+
+def _post(conn, path, payload):
+    conn.request("POST", path, body=json.dumps(payload), headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_broadcast_and_command_share_a_keepalive_connection(gateway):
+    conn = http.client.HTTPConnection(*gateway.server_address)
+
+    assert _post(conn, "/broadcast", {"text": "Dinner is ready"}) == (
+        200,
+        {"ok": True, "response": "Stand-in received: broadcast Dinner is ready"},
+    )
+    sock = conn.sock
+    assert _post(conn, "/command", {"text": "what time is it"})[0] == 200
+    assert conn.sock is sock
+    conn.close()
+
+
+def test_requests_from_different_callers_start_new_conversations(standin):
+    servicer, port = standin
+    server, thread = _serve(_standin_pool(port, max_size=1))
+    try:
+        for text in ("turn on the kitchen lights", "turn it off"):
+            conn = http.client.HTTPConnection(*server.server_address)
+            assert _post(conn, "/command", {"text": text})[0] == 200
+            conn.close()
+    finally:
+        _stop(server, thread)
+
+    assert servicer.requests == 2
+    assert servicer.continued == 0
+
+
+def test_broadcast_validation_matches_cli(gateway):
+    conn = http.client.HTTPConnection(*gateway.server_address)
+
+    status, reply = _post(conn, "/broadcast", {"text": "x" * 201})
+
+    assert status == 400
+    assert reply["error"] == "validation"
+    assert "maximum length" in reply["message"]
+    conn.close()
+
+
+def test_malformed_body_is_rejected(gateway):
+    conn = http.client.HTTPConnection(*gateway.server_address)
+
+    status, reply = _post(conn, "/command", {"message": "hi"})
+
+    assert status == 400
+    assert reply["error"] == "protocol"
+    conn.close()
+
+
+def test_healthz_and_metrics(gateway):
+    conn = http.client.HTTPConnection(*gateway.server_address)
+    _post(conn, "/command", {"text": "hello"})
+
+    conn.request("GET", "/healthz")
+    assert conn.getresponse().read() == b'{"ok": true}'
+    conn.request("GET", "/metrics")
+    metrics = conn.getresponse().read().decode()
+
+    assert 'ghome_requests_total{action="command",status="200"} 1' in metrics
+    assert "ghome_pool_sessions 2" in metrics
+    conn.close()
+
+
+def test_full_queue_answers_429(standin):
+    servicer, port = standin
+    servicer.latency = 0.5
+    server, thread = _serve(_standin_pool(port, max_size=1), max_queue=0)
+
+    busy = http.client.HTTPConnection(*server.server_address)
+    busy.request("POST", "/broadcast", body=b'{"text": "one"}')
+    while server.pool.stats()["in_use"] == 0:
+        pass
+
+    conn = http.client.HTTPConnection(*server.server_address)
+    conn.request("POST", "/broadcast", body=b'{"text": "two"}')
+    response = conn.getresponse()
+
+    assert response.status == 429
+    assert response.getheader("Retry-After") == "1"
+    assert json.loads(response.read())["error"] == "busy"
+
+    assert busy.getresponse().status == 200
+    busy.close()
+    conn.close()
+    _stop(server, thread)
+    assert len(server.pool) == 0
@@ -0,0 +1,111 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ghome.messages import BroadcastError
+from ghome.outbox import DrainWorker, Outbox, drain
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return Outbox(tmp_path / "outbox.db")
+
+
+def test_enqueue_persists_pending_items(outbox, tmp_path):
+    first = outbox.enqueue("Dinner is ready")
+    second = outbox.enqueue("Garage door open")
+
+    reopened = Outbox(tmp_path / "outbox.db")
+    assert reopened.counts()["pending"] == 2
+    assert [item.id for item in reopened.items()] == [second, first]
+
+
+def test_drain_sends_items_in_order_and_marks_them_sent(outbox):
+    outbox.enqueue("one")
+    outbox.enqueue("two")
+    send = MagicMock(side_effect=lambda action, text: f"sent {text}")
+
+    result = drain(outbox, send)
+
+    assert [c.args for c in send.call_args_list] == [("broadcast", "one"), ("broadcast", "two")]
+    assert result.sent == 2
+    assert outbox.counts()["sent"] == 2
+
+
+def test_drain_retries_transient_errors_with_backoff(outbox):
+    item_id = outbox.enqueue("one")
+    send = MagicMock(side_effect=RuntimeError("unavailable"))
+
+    result = drain(outbox, send)
+
+    assert result.retried == 1
+    assert send.call_count == 1  # Not due again until its backoff passes
+    [item] = outbox.items()
+    assert (item.id, item.status, item.attempts, item.last_error) == (item_id, "pending", 1, "unavailable")
+
+
+def test_drain_gives_up_after_max_attempts(outbox):
+    outbox.enqueue("one")
+    send = MagicMock(side_effect=RuntimeError("unavailable"))
+
+    with patch("ghome.outbox.retry_delay", return_value=0):
+        result = drain(outbox, send, max_attempts=3)
+
+    assert send.call_count == 3
+    assert result.failed == 1
+    assert outbox.counts()["failed"] == 1
+
+
+def test_drain_fails_invalid_messages_at_once(outbox):
+    outbox.enqueue("x" * 500)
+    send = MagicMock(side_effect=BroadcastError("Message exceeds maximum length of 200 characters"))
+
+    result = drain(outbox, send)
+
+    assert result.failed == 1
+    assert outbox.items()[0].status == "failed"
+
+
+def test_items_claimed_by_a_dead_drain_are_reclaimed_after_lease(outbox):
+    outbox.enqueue("one")
+    assert len(outbox.claim(10)) == 1
+
+    assert outbox.claim(10) == []
+    [item] = outbox.claim(10, lease=0)
+    assert item.attempts == 2
+
+
+def test_stopped_drain_returns_unsent_items_to_queue(outbox):
+    for text in ("one", "two", "three"):
+        outbox.enqueue(text)
+    stop = threading.Event()
+
+    def send(action, text):
+        stop.set()
+        return "ok"
+
+    result = drain(outbox, send, stop=stop)
+
+    assert result.sent == 1
+    counts = outbox.counts()
+    assert (counts["sent"], counts["pending"], counts["sending"]) == (1, 2, 0)
+    assert [item.attempts for item in outbox.items("pending")] == [0, 0]
+
+
+def test_drain_worker_sends_items_queued_while_running(outbox):
+    sent = threading.Event()
+
+    with DrainWorker(outbox, lambda action, text: sent.set() or "ok", interval=0.01):
+        outbox.enqueue("Dinner is ready")
+        assert sent.wait(5)
+
+    assert outbox.counts()["sent"] == 1
+
+
+def test_missing_database_is_not_created_by_readers(tmp_path):
+    outbox = Outbox(tmp_path / "outbox.db")
+
+    assert outbox.counts()["pending"] == 0
+    assert outbox.claim(10) == []
+    assert not (tmp_path / "outbox.db").exists()
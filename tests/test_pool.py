@@ -0,0 +1,118 @@
+import threading
+import time
+
+import google.oauth2.credentials
+import grpc
+import pytest
+
+from ghome.assistant import AssistantPool, PoolTimeoutError
+from ghome.standin import StandinAssistant, start_server
+
+
+@pytest.fixture
+def endpoint():
+    server, port = start_server(StandinAssistant(latency=0))
+    yield f"localhost:{port}"
+    server.stop(None)
+
+
+def _pool(endpoint, **options):
+    credentials = google.oauth2.credentials.Credentials(token="standin")
+    return AssistantPool(credentials, endpoint=endpoint, insecure=True, **options)
+
+
+def test_checkout_reuses_warm_session(endpoint):
+    with _pool(endpoint, min_size=1, max_size=2) as pool:
+        with pool.session() as session:
+            assert session.send("hello") == "Stand-in received: hello"
+        with pool.session() as again:
+            assert again is session
+
+        stats = pool.stats()
+        assert stats["created"] == 1
+        assert stats["checkouts"] == 2
+        assert stats["in_use"] == 0
+
+
+def test_checkout_grows_to_max_size_then_waits(endpoint):
+    with _pool(endpoint, min_size=0, max_size=2) as pool:
+        first = pool.checkout()
+        second = pool.checkout()
+        assert first is not second
+
+        with pytest.raises(PoolTimeoutError):
+            pool.checkout(timeout=0.05)
+
+        threading.Timer(0.05, pool.checkin, [first]).start()
+        assert pool.checkout(timeout=1) is first
+        assert pool.stats()["max_wait"] > 0
+
+
+def test_idle_sessions_beyond_min_size_are_evicted(endpoint):
+    with _pool(endpoint, min_size=1, max_size=3, idle_timeout=0.05) as pool:
+        sessions = [pool.checkout() for _ in range(3)]
+        for session in sessions:
+            pool.checkin(session)
+        time.sleep(0.1)
+
+        pool.checkin(pool.checkout())
+
+        stats = pool.stats()
+        assert stats["size"] == 1
+        assert stats["evicted_idle"] == 2
+
+
+def test_sessions_are_recycled_after_max_lifetime(endpoint):
+    with _pool(endpoint, max_lifetime=0.05) as pool:
+        session = pool.checkout()
+        time.sleep(0.1)
+        pool.checkin(session)
+
+        assert pool.checkout() is not session
+        assert pool.stats()["evicted_lifetime"] == 1
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_min_size_sessions_connect_before_first_use(endpoint):
+    with _pool(endpoint, min_size=1) as pool:
+        session = pool.checkout()
+
+        assert _wait_for(lambda: session._channel_state == grpc.ChannelConnectivity.READY)
+        pool.checkin(session)
+
+
+def test_reaper_evicts_idle_sessions_without_requests(endpoint):
+    with _pool(endpoint, min_size=1, max_size=3, idle_timeout=0.05, reap_interval=0.02) as pool:
+        sessions = [pool.checkout() for _ in range(3)]
+        for session in sessions:
+            pool.checkin(session)
+
+        assert _wait_for(lambda: pool.stats()["size"] == 1)
+        assert pool.stats()["evicted_idle"] == 2
+
+
+def test_reaper_replaces_recycled_sessions(endpoint):
+    with _pool(endpoint, min_size=1, max_lifetime=0.05, reap_interval=0.02) as pool:
+        assert _wait_for(lambda: pool.stats()["evicted_lifetime"] >= 1)
+        assert _wait_for(lambda: pool.stats()["idle"] == 1)
+
+
+def test_dead_sessions_are_discarded_on_checkout(endpoint):
+    with _pool(endpoint, min_size=0) as pool:
+        with pool.session() as session:
+            session.send("hello")
+        session._on_channel_state(grpc.ChannelConnectivity.TRANSIENT_FAILURE)
+
+        assert pool.checkout() is not session
+        assert pool.stats()["evicted_dead"] == 1
+
+
+def test_pool_rejects_inconsistent_sizes():
+    with pytest.raises(ValueError):
+        AssistantPool(None, min_size=3, max_size=2)
@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+from ghome.ratelimit import AdaptiveConcurrency, TokenBucket
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_then_paces():
+    clock = _Clock()
+    with patch("ghome.ratelimit.time", clock):
+        bucket = TokenBucket(rate=2, capacity=2)
+
+        waits = [bucket.acquire() for _ in range(4)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == 0.5
+    assert clock.now == 1001.0
+
+
+def test_token_bucket_state_is_shared_through_file(tmp_path):
+    clock = _Clock()
+    state_path = tmp_path / "ratelimit.json"
+    with patch("ghome.ratelimit.time", clock):
+        TokenBucket(rate=1, capacity=1, state_path=state_path).acquire()
+
+        waited = TokenBucket(rate=1, capacity=1, state_path=state_path).acquire()
+
+    assert waited == 1.0
+
+
+def test_adaptive_concurrency_halves_on_overload_and_grows_back():
+    controller = AdaptiveConcurrency(initial=8, maximum=8)
+
+    controller.acquire()
+    controller.release(overloaded=True)
+    assert controller.limit == 4
+
+    for _ in range(30):
+        controller.acquire()
+        controller.release()
+    assert controller.limit == 8
+
+
+def test_adaptive_concurrency_never_drops_below_minimum():
+    controller = AdaptiveConcurrency(initial=2, minimum=1)
+
+    for _ in range(5):
+        controller.acquire()
+        controller.release(overloaded=True)
+
+    assert controller.limit == 1
+    assert controller.in_flight == 0
+
+
+def test_adaptive_concurrency_shrinks_once_per_burst_of_overloads():
+    controller = AdaptiveConcurrency(initial=8, maximum=8)
+
+    tickets = [controller.acquire() for _ in range(8)]
+    for ticket in tickets:
+        controller.release(overloaded=True, ticket=ticket)
+    assert controller.limit == 4
+
+    # A request started after the decrease still shrinks it again.
+    controller.release(overloaded=True, ticket=controller.acquire())
+    assert controller.limit == 2
+
+
+def test_token_bucket_only_writes_state_when_a_token_is_taken(tmp_path):
+    clock = _Clock()
+    state_path = tmp_path / "ratelimit.json"
+    with patch("ghome.ratelimit.time", clock), \
+            patch("ghome.ratelimit.write_private_json") as mock_write:
+        bucket = TokenBucket(rate=1, capacity=1, state_path=state_path)
+        bucket.acquire()
+        bucket.acquire()  # Waits once before taking its token
+
+    assert mock_write.call_count == 2
@@ -0,0 +1,115 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ghome.retry import CircuitBreaker, CircuitOpenError, RetryPolicy, RetryStats, call_with_retry
+
+
+class _Flaky(Exception):
+    pass
+
+
+def test_backoff_grows_exponentially_and_is_capped():
+    policy = RetryPolicy(initial_backoff=1, multiplier=2, max_backoff=5)
+    with patch("ghome.retry.random.uniform", side_effect=lambda low, high: high):
+        assert [policy.backoff(n) for n in range(1, 5)] == [1, 2, 4, 5]
+
+
+def test_call_with_retry_gives_up_after_max_attempts():
+    call = MagicMock(side_effect=_Flaky())
+    stats = RetryStats()
+
+    with patch("ghome.retry.time.sleep"):
+        with pytest.raises(_Flaky):
+            call_with_retry(call, lambda e: True, RetryPolicy(max_attempts=3), stats=stats)
+
+    assert call.call_count == 3
+    assert stats.retries == 2
+    assert stats.failures == 1
+
+
+def test_call_with_retry_stops_at_deadline():
+    call = MagicMock(side_effect=_Flaky())
+    policy = RetryPolicy(max_attempts=10, initial_backoff=1, max_backoff=1, deadline=0.5)
+
+    with patch("ghome.retry.random.uniform", return_value=1.0), patch("ghome.retry.time.sleep"):
+        with pytest.raises(_Flaky):
+            call_with_retry(call, lambda e: True, policy)
+
+    assert call.call_count == 1
+
+
+def test_call_with_retry_passes_remaining_deadline():
+    call = MagicMock(return_value="ok")
+
+    assert call_with_retry(call, lambda e: True, RetryPolicy(deadline=10)) == "ok"
+
+    (remaining,), _ = call.call_args
+    assert 9 < remaining <= 10
+
+
+def test_only_backend_down_errors_count_towards_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1)
+    call = MagicMock(side_effect=_Flaky())
+
+    with patch("ghome.retry.time.sleep"), pytest.raises(_Flaky):
+        call_with_retry(call, lambda e: True, RetryPolicy(max_attempts=3), breaker, is_backend_down=lambda e: False)
+
+    assert call.call_count == 3
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opening_mid_call_reports_the_last_error():
+    breaker = CircuitBreaker(failure_threshold=2)
+    call = MagicMock(side_effect=_Flaky("down"))
+
+    with patch("ghome.retry.time.sleep"), pytest.raises(_Flaky, match="down"):
+        call_with_retry(call, lambda e: True, RetryPolicy(max_attempts=5), breaker)
+
+    assert call.call_count == 2
+    with pytest.raises(CircuitOpenError):
+        call_with_retry(call, lambda e: True, RetryPolicy(max_attempts=5), breaker)
+
+
+def test_breaker_lets_one_probe_through_after_cooldown():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10)
+
+    with patch("ghome.retry.time.monotonic", return_value=100.0):
+        breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    with patch("ghome.retry.time.monotonic", return_value=111.0):
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+
+    assert breaker.stats() == {"state": "closed", "consecutive_failures": 0, "times_opened": 1}
+
+
+def test_interrupted_probe_lets_the_next_call_probe():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10)
+
+    with patch("ghome.retry.time.monotonic", return_value=100.0):
+        breaker.record_failure()
+    with patch("ghome.retry.time.monotonic", return_value=111.0):
+        with pytest.raises(KeyboardInterrupt):
+            call_with_retry(MagicMock(side_effect=KeyboardInterrupt), lambda e: True, RetryPolicy(), breaker)
+
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=10)
+
+    with patch("ghome.retry.time.monotonic", return_value=100.0):
+        for _ in range(3):
+            breaker.record_failure()
+    with patch("ghome.retry.time.monotonic", return_value=111.0):
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,130 @@
+# tests/test_routine.py
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from ghome.retry import RetryPolicy
+from ghome.routine import RoutineError, Step, find_routine, load_routine, pool_step_runner, run_routine
+
+MOVIE_NIGHT = """
+name = "movie night"
+
+[steps.lights]
+command = "dim the living room lights"
+
+[steps.blinds]
+command = "close the blinds"
+timeout = 5
+
+[steps.announce]
+broadcast = "Movie night is starting"
+after = ["lights", "blinds"]
+"""
+
+
+def _write(tmp_path, text, name="movie.toml"):
+    path = tmp_path / name
+    path.write_text(text)
+    return path
+
+
+def test_load_routine_reads_steps(tmp_path):
+    routine = load_routine(_write(tmp_path, MOVIE_NIGHT))
+
+    assert routine.name == "movie night"
+    assert list(routine.steps) == ["lights", "blinds", "announce"]
+    assert routine.steps["blinds"].timeout == 5.0
+    assert routine.steps["announce"] == Step(
+        "announce", "broadcast", "Movie night is starting", ("lights", "blinds")
+    )
+
+
+def test_load_routine_reads_yaml(tmp_path):
+    pytest.importorskip("yaml")
+    path = _write(
+        tmp_path,
+        "steps:\n  lights:\n    command: dim the lights\n  announce:\n    broadcast: Ready\n    after: lights\n",
+        "movie.yaml",
+    )
+
+    routine = load_routine(path)
+
+    assert routine.name == "movie"
+    assert routine.steps["announce"].after == ("lights",)
+
+
+@pytest.mark.parametrize(
+    "text, error",
+    [
+        ('[steps.a]\ncommand = "x"\nafter = ["b"]\n', "unknown step 'b'"),
+        ('[steps.a]\ncommand = "x"\nafter = "b"\n[steps.b]\ncommand = "y"\nafter = "a"\n', "cycle: a, b"),
+        ('[steps.a]\ncommand = "x"\nbroadcast = "y"\n', "exactly one of"),
+        ('[steps.a]\ncommand = ""\n', "cannot be empty"),
+        ('[steps.a]\ncommand = "x"\ntimeout = 0\n', "positive number"),
+        ('[steps.a]\ncommand = "x"\ndelay = 1\n', "unknown keys: delay"),
+        ('name = "empty"\n', "at least one step"),
+    ],
+)
+def test_load_routine_rejects_invalid_routines(tmp_path, text, error):
+    with pytest.raises(RoutineError, match=error):
+        load_routine(_write(tmp_path, text))
+
+
+def test_find_routine_looks_in_routines_dir(tmp_path):
+    path = _write(tmp_path, MOVIE_NIGHT)
+
+    assert find_routine("movie", tmp_path) == path
+    assert find_routine(str(path), tmp_path / "elsewhere") == path
+    with pytest.raises(RoutineError):
+        find_routine("missing", tmp_path)
+
+
+def test_run_routine_runs_independent_steps_concurrently(tmp_path):
+    routine = load_routine(_write(tmp_path, MOVIE_NIGHT))
+    durations = {"lights": 0.2, "blinds": 0.1, "announce": 0.1}
+
+    def run_step(step):
+        time.sleep(durations[step.name])
+        return f"{step.action} {step.text}"
+
+    report = run_routine(routine, run_step)
+
+    assert report.ok
+    assert report.elapsed < 0.38  # 0.5s if the steps ran one after another
+    assert report.results["announce"].start >= report.results["lights"].end
+    assert report.results["blinds"].start < report.results["lights"].end
+    assert report.critical_path == ["lights", "announce"]
+
+
+def test_run_routine_skips_steps_after_a_failure(tmp_path):
+    routine = load_routine(_write(tmp_path, MOVIE_NIGHT))
+
+    def run_step(step):
+        if step.name == "blinds":
+            raise RuntimeError("blinds are stuck")
+        return "ok"
+
+    report = run_routine(routine, run_step)
+
+    assert not report.ok
+    assert report.results["lights"].ok
+    assert str(report.results["blinds"].error) == "blinds are stuck"
+    assert report.results["announce"].blocked_by == "blinds"
+    assert report.results["announce"].start is None
+
+
+def test_pool_step_runner_bounds_session_wait_and_attempts_by_step_timeout():
+    session = MagicMock(retry_policy=RetryPolicy(deadline=30))
+    deadlines = []
+    session.send.side_effect = lambda text: deadlines.append(session.retry_policy.deadline) or "Done"
+    pool = MagicMock()
+    pool.session.return_value.__enter__.return_value = session
+
+    run_step = pool_step_runner(pool)
+    assert run_step(Step("lights", "command", "dim the lights", timeout=5)) == "Done"
+
+    pool.session.assert_called_once_with(timeout=5)
+    assert 0 < deadlines[0] <= 5
+    assert session.retry_policy.deadline == 30
+    session.new_conversation.assert_called_once()
@@ -0,0 +1,133 @@
+# tests/test_schedule.py
+import json
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from ghome.schedule import (
+    MISFIRE_GRACE,
+    CronExpression,
+    ScheduleError,
+    Scheduler,
+    ScheduleStore,
+    parse_time,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ScheduleStore(tmp_path / "schedule.json", tmp_path / "schedule.lock")
+
+
+@pytest.mark.parametrize(
+    "expression, after, expected",
+    [
+        ("55 9 * * 1-5", datetime(2026, 10, 17, 12, 0), datetime(2026, 10, 19, 9, 55)),  # Saturday
+        ("*/15 * * * *", datetime(2026, 10, 17, 12, 7, 30), datetime(2026, 10, 17, 12, 15)),
+        ("0 12 * * *", datetime(2026, 10, 17, 12, 0), datetime(2026, 10, 18, 12, 0)),
+        ("0 0 29 2 *", datetime(2026, 10, 17), datetime(2028, 2, 29)),
+        ("0 8 1 * 0", datetime(2026, 10, 17), datetime(2026, 10, 18, 8, 0)),  # Sunday or the 1st
+        ("@hourly", datetime(2026, 10, 17, 12, 0), datetime(2026, 10, 17, 13, 0)),
+    ],
+)
+def test_cron_next_after(expression, after, expected):
+    assert CronExpression(expression).next_after(after) == expected
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "5-1 * * * *", "a * * * *", "0 0 31 2 *"])
+def test_cron_rejects_invalid_expressions(expression):
+    with pytest.raises(ScheduleError):
+        CronExpression(expression).next_after(datetime(2026, 10, 17))
+
+
+def test_parse_time_uses_next_occurrence_of_clock_time():
+    now = datetime(2026, 10, 17, 12, 0)
+    assert parse_time("13:30", now) == datetime(2026, 10, 17, 13, 30)
+    assert parse_time("09:55", now) == datetime(2026, 10, 18, 9, 55)
+    assert parse_time("2026-12-24 18:00", now) == datetime(2026, 12, 24, 18, 0)
+
+
+def test_store_adds_and_removes_jobs(store):
+    first = store.add("Standup in 5 minutes", cron="55 9 * * 1-5")
+    second = store.add("what time is it", "command", at=datetime(2099, 1, 1))
+
+    assert [job.id for job in store.jobs()] == [first.id, second.id]
+    assert store.remove(first.id)
+    assert not store.remove(first.id)
+    assert [job.text for job in store.jobs()] == ["what time is it"]
+
+
+def test_store_rejects_times_in_the_past(store):
+    with pytest.raises(ScheduleError):
+        store.add("Too late", at=datetime(2000, 1, 1))
+
+
+def _run_scheduler(store, tmp_path, until, **options):
+    calls, firings = [], []
+    done = threading.Event()
+
+    def send(action, text):
+        calls.append(("send", time.time(), text))
+        return f"Sent {text}"
+
+    def report(firing):
+        firings.append(firing)
+        if until(firings):
+            done.set()
+
+    scheduler = Scheduler(
+        store, send, tmp_path / "scheduler.lock",
+        warm_up=lambda: calls.append(("warm_up", time.time(), None)),
+        report=report,
+        **options,
+    )
+    with scheduler:
+        assert done.wait(5)
+    return scheduler, calls, firings
+
+
+def test_scheduler_warms_up_then_runs_one_shot_job_on_time(store, tmp_path):
+    due = time.time() + 0.5
+    job = store.add("Dinner is ready", at=datetime.fromtimestamp(due))
+
+    scheduler, calls, firings = _run_scheduler(store, tmp_path, lambda firings: firings, warm_up_lead=0.3)
+
+    assert [kind for kind, _, _ in calls] == ["warm_up", "send"]
+    assert calls[0][1] <= due - 0.2
+    assert firings[0].job.id == job.id
+    assert firings[0].response == "Sent Dinner is ready"
+    assert 0 <= firings[0].lateness < 0.1
+    assert store.jobs() == []
+    assert scheduler.fired == 1
+
+
+def test_scheduler_reports_missed_one_shot_jobs(store, tmp_path):
+    store.add("Long gone", at=datetime.fromtimestamp(time.time() + 60))
+    data = json.loads(store.path.read_text())
+    data["jobs"][0]["at"] = time.time() - MISFIRE_GRACE - 10
+    store.path.write_text(json.dumps(data))
+
+    scheduler, calls, firings = _run_scheduler(store, tmp_path, lambda firings: firings)
+
+    assert firings[0].missed
+    assert [kind for kind, _, _ in calls if kind == "send"] == []
+    assert store.jobs() == []
+
+
+def test_scheduler_picks_up_jobs_added_while_running(store, tmp_path):
+    fired = threading.Event()
+    scheduler = Scheduler(
+        store, lambda action, text: text, tmp_path / "scheduler.lock",
+        report=lambda firing: fired.set(),
+    )
+    with scheduler:
+        store.add("Added later", at=datetime.fromtimestamp(time.time() + 0.3))
+        assert fired.wait(5)
+
+
+def test_only_one_scheduler_runs_a_schedule(store, tmp_path):
+    with Scheduler(store, lambda action, text: text, tmp_path / "scheduler.lock"):
+        with pytest.raises(OSError):
+            Scheduler(store, lambda action, text: text, tmp_path / "scheduler.lock").start()
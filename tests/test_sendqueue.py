@@ -0,0 +1,85 @@
+# tests/test_sendqueue.py
+import threading
+
+from ghome.sendqueue import SendQueue
+
+
+def test_sends_in_order_and_reports_each_result():
+    sent, results = [], []
+
+    def send(text):
+        if text == "bad":
+            raise RuntimeError("backend down")
+        sent.append(text)
+        return f"sent {text}"
+
+    with SendQueue(send, results.append) as sends:
+        assert [sends.submit(text) for text in ("one", "bad", "three")] == [1, 2, 3]
+        sends.drain()
+
+    assert sent == ["one", "three"]
+    assert [(r.seq, r.response) for r in results] == [(1, "sent one"), (2, None), (3, "sent three")]
+    assert str(results[1].error) == "backend down"
+
+
+def test_submit_returns_before_send_completes():
+    release = threading.Event()
+    results = []
+
+    sends = SendQueue(lambda text: release.wait(5) and "ok", results.append)
+    sends.submit("slow")
+    assert sends.pending == 1
+    assert results == []
+
+    release.set()
+    sends.drain()
+    sends.close()
+    assert results[0].response == "ok"
+
+
+def test_submit_blocks_when_queue_is_full():
+    release = threading.Event()
+    started = threading.Event()
+
+    def send(text):
+        started.set()
+        release.wait(5)
+        return text
+
+    sends = SendQueue(send, lambda result: None, max_pending=1)
+    sends.submit("in flight")
+    started.wait(5)
+    sends.submit("waiting")
+    assert sends.full()
+
+    blocked = threading.Thread(target=sends.submit, args=("blocked",))
+    blocked.start()
+    blocked.join(0.2)
+    assert blocked.is_alive()
+
+    release.set()
+    blocked.join(5)
+    assert not blocked.is_alive()
+    sends.close()
+
+
+def test_close_with_cancel_skips_queued_texts():
+    release = threading.Event()
+    started = threading.Event()
+    sent, results = [], []
+
+    def send(text):
+        started.set()
+        release.wait(5)
+        sent.append(text)
+        return text
+
+    sends = SendQueue(send, results.append)
+    sends.submit("in flight")
+    started.wait(5)
+    sends.submit("queued")
+    release.set()
+    sends.close(cancel=True)
+
+    assert sent == ["in flight"]
+    assert [(r.seq, r.cancelled) for r in results] == [(1, False), (2, True)]
@@ -0,0 +1,115 @@
+from unittest.mock import patch
+
+import google.oauth2.credentials
+import grpc
+import pytest
+
+from ghome.assistant import AssistantSession
+from ghome.bench import BenchError, BenchReport, run_bench
+from ghome.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+from ghome.standin import StandinAssistant, start_server
+
+
+@pytest.fixture
+def standin():
+    servicer = StandinAssistant(latency=0)
+    server, port = start_server(servicer)
+    yield servicer, f"localhost:{port}"
+    server.stop(None)
+
+
+def _credentials():
+    return google.oauth2.credentials.Credentials(token="standin")
+
+
+def test_session_talks_to_standin_over_insecure_channel(standin):
+    servicer, endpoint = standin
+
+    with AssistantSession(_credentials(), endpoint=endpoint, insecure=True) as session:
+        assert session.send("what time is it") == "Stand-in received: what time is it"
+        assert session.broadcast("Dinner is ready") == "Stand-in received: broadcast Dinner is ready"
+
+    assert servicer.requests == 2
+    assert servicer.continued == 1
+
+
+def test_new_conversation_forgets_earlier_requests(standin):
+    servicer, endpoint = standin
+
+    with AssistantSession(_credentials(), endpoint=endpoint, insecure=True) as session:
+        session.send("turn on the kitchen lights")
+        session.new_conversation()
+        session.send("turn it off")
+
+    assert servicer.continued == 0
+
+
+def test_standin_injects_errors(standin):
+    servicer, endpoint = standin
+    servicer.error_rate = 1.0
+    servicer.error_code = grpc.StatusCode.INTERNAL
+
+    with AssistantSession(
+        _credentials(), endpoint=endpoint, insecure=True, retry_policy=RetryPolicy(max_attempts=1)
+    ) as session:
+        with pytest.raises(grpc.RpcError):
+            session.send("what time is it")
+
+    assert servicer.errors == 1
+
+
+def test_session_reads_endpoint_from_environment(standin, monkeypatch):
+    _, endpoint = standin
+    monkeypatch.setenv("GHOME_ASSISTANT_ENDPOINT", endpoint)
+    monkeypatch.setenv("GHOME_ASSISTANT_INSECURE", "1")
+
+    with AssistantSession(_credentials()) as session:
+        assert session.send("hello") == "Stand-in received: hello"
+
+
+def test_unanswered_requests_open_the_breaker(standin):
+    servicer, endpoint = standin
+    servicer.latency = 1.0  # Far past each request's deadline
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+
+    with AssistantSession(
+        _credentials(), endpoint=endpoint, insecure=True, breaker=breaker, retry_policy=RetryPolicy(deadline=0.2)
+    ) as session:
+        for _ in range(2):
+            with pytest.raises(grpc.RpcError) as excinfo:
+                session.send("what time is it")
+            assert excinfo.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+        with pytest.raises(CircuitOpenError):
+            session.send("what time is it")
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_bench_reports_latency_percentiles(standin):
+    servicer, endpoint = standin
+
+    report = run_bench(_credentials(), sessions=3, commands=4, text="hi", endpoint=endpoint, insecure=True)
+
+    assert report.completed == 12
+    assert report.errors == 0
+    assert servicer.requests == 12
+    assert 0 < report.percentile(50) <= report.percentile(99)
+    assert "Throughput" in report.format()
+
+
+def test_bench_reports_session_setup_failures(standin):
+    servicer, endpoint = standin
+
+    with patch.object(AssistantSession, "warm_up", side_effect=[None, RuntimeError("no route"), None]):
+        with pytest.raises(BenchError, match="no route"):
+            run_bench(_credentials(), sessions=3, commands=4, text="hi", endpoint=endpoint, insecure=True)
+
+    assert servicer.requests == 0
+
+
+def test_bench_report_percentile_nearest_rank():
+    report = BenchReport(sessions=1, commands=4, elapsed=2.0, latencies=[0.4, 0.1, 0.3, 0.2])
+
+    assert report.percentile(50) == 0.2
+    assert report.percentile(99) == 0.4
+    assert report.throughput == 2.0
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from ghome import timing
+
+
+@pytest.fixture(autouse=True)
+def reset_timing():
+    timing.reset()
+    yield
+    timing.reset()
+
+
+def test_stage_records_nothing_when_disabled():
+    with timing.stage("assist"):
+        pass
+
+    assert not timing.is_enabled()
+    assert timing.records() == []
+
+
+def test_stage_records_duration_when_enabled():
+    timing.enable()
+
+    with timing.stage("assist"):
+        pass
+
+    [(name, seconds)] = timing.records()
+    assert name == "assist"
+    assert seconds >= 0
+
+
+def test_hooks_receive_each_stage():
+    seen = []
+    timing.add_hook(lambda name, seconds: seen.append(name))
+
+    with timing.stage("load_credentials"):
+        pass
+    timing.record("assist", 0.1)
+
+    assert seen == ["load_credentials", "assist"]
+    assert timing.records() == []  # Hooks alone don't accumulate records
+
+
+def test_json_lines_hook_appends_each_stage_as_it_is_recorded(tmp_path):
+    path = tmp_path / "timings.jsonl"
+    timing.add_hook(timing.json_lines_hook(path, "daemon"))
+
+    timing.record("channel_setup", 0.02)
+    assert json.loads(path.read_text())["stage"] == "channel_setup"
+    timing.record("assist", 0.3)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(line["stage"], line["command"]) for line in lines] == [
+        ("channel_setup", "daemon"),
+        ("assist", "daemon"),
+    ]
+    assert timing.records() == []
+
+
+def test_format_records_aligns_stage_names():
+    timing.enable()
+    timing.record("assist", 0.25)
+    timing.record("channel_setup", 0.0125)
+
+    assert timing.format_records().splitlines() == [
+        "assist            250.0 ms",
+        "channel_setup      12.5 ms",
+    ]